@@ -17,8 +17,16 @@
 #
 #  Author(s):  Vendula Poncova <vponcova@redhat.com>
 #
+from blivet.size import Size
+
+from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.base import Section
-from pyanaconda.core.constants import SOURCE_TYPE_CLOSEST_MIRROR, SOURCE_TYPE_CDN
+from pyanaconda.core.constants import SOURCE_TYPE_CLOSEST_MIRROR, SOURCE_TYPE_CDN, \
+    DNF_DEFAULT_PARALLEL_DOWNLOADS, DNF_ADAPTIVE_PARALLEL_DOWNLOADS, DNF_MAX_PARALLEL_DOWNLOADS, \
+    DNF_TRANSACTION_FORK, DNF_TRANSACTION_SPAWN, DNF_TRANSACTION_FORKSERVER, IMAGE_COPY_RSYNC, \
+    IMAGE_COPY_PARALLEL
+
+log = get_module_logger(__name__)
 
 
 class PayloadSection(Section):
@@ -138,6 +146,192 @@ class PayloadSection(Section):
         """
         return self._get_option("verify_ssl", bool)
 
+    @property
+    def fastest_mirror(self):
+        """Rank mirrors of repositories by their latency.
+
+        If enabled, mirrors of repositories with a mirror list or
+        a metalink are probed in parallel and used in the order of
+        their connection latency instead of the order of the list.
+        The ranking is cached in the DNF cache directory, so it is
+        reused during the installation.
+        """
+        return self._get_option("fastest_mirror", bool)
+
+    @property
+    def max_parallel_downloads(self):
+        """The maximum number of parallel downloads of packages.
+
+        Return a number of packages downloaded at the same time,
+        DNF_ADAPTIVE_PARALLEL_DOWNLOADS for the adaptive mode or
+        DNF_DEFAULT_PARALLEL_DOWNLOADS for the default of DNF.
+        The number is limited to DNF_MAX_PARALLEL_DOWNLOADS.
+
+        :return: a number
+        """
+        return self._get_option("max_parallel_downloads", self._convert_parallel_downloads)
+
+    @classmethod
+    def _convert_parallel_downloads(cls, value):
+        """Convert the max_parallel_downloads option."""
+        if not value:
+            return DNF_DEFAULT_PARALLEL_DOWNLOADS
+
+        if value == "adaptive":
+            return DNF_ADAPTIVE_PARALLEL_DOWNLOADS
+
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError("Invalid value: {}".format(value))
+
+        if int(value) > DNF_MAX_PARALLEL_DOWNLOADS:
+            log.warning(
+                "The number of parallel downloads %s is limited to %s.",
+                value, DNF_MAX_PARALLEL_DOWNLOADS
+            )
+            return DNF_MAX_PARALLEL_DOWNLOADS
+
+        return int(value)
+
+    @property
+    def download_throttle(self):
+        """The bandwidth limit of the package downloads.
+
+        For example: 500k, 10M or 50%. Return an empty
+        string if the downloads shouldn't be throttled.
+        """
+        return self._get_option("download_throttle", str)
+
+    @property
+    def installation_chunk_size(self):
+        """The size of chunks of the package installation.
+
+        If set, the packages are downloaded and installed in
+        chunks of the specified size, so there has to be space
+        only for two chunks of packages instead of all of them.
+
+        :return: an instance of Size or None
+        """
+        return self._get_option("installation_chunk_size", self._convert_chunk_size)
+
+    @classmethod
+    def _convert_chunk_size(cls, value):
+        """Convert the installation_chunk_size option."""
+        if not value:
+            return None
+
+        return Size(value)
+
+    @property
+    def transaction_start_method(self):
+        """The start method of the DNF transaction process.
+
+        Valid values:
+
+        fork        Fork the payload module with the loaded DNF base.
+        spawn       Start a new process with a minimal DNF base.
+        forkserver  Fork a new process with a minimal DNF base from a server.
+
+        The minimal DNF base is created from a description of the
+        transaction and the cached metadata of the repositories, so
+        the transaction process doesn't share the memory of the
+        payload module.
+        """
+        value = self._get_option("transaction_start_method", str)
+
+        if value not in (DNF_TRANSACTION_FORK, DNF_TRANSACTION_SPAWN, DNF_TRANSACTION_FORKSERVER):
+            raise ValueError("Invalid value: {}".format(value))
+
+        return value
+
+    @property
+    def image_download_segments(self):
+        """The number of segments of a live image download.
+
+        If the number is bigger than 1 and the server supports
+        ranged requests, a remote live image is downloaded in
+        the specified number of segments at once.
+
+        :return: a positive number
+        """
+        return self._get_option("image_download_segments", self._convert_download_segments)
+
+    @classmethod
+    def _convert_download_segments(cls, value):
+        """Convert the image_download_segments option."""
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError("Invalid value: {}".format(value))
+
+        return int(value)
+
+    @property
+    def image_copy_method(self):
+        """The method of the live image installation.
+
+        Valid values:
+
+        rsync     Copy the content of the image with rsync.
+        parallel  Copy the content of the image with multiple threads.
+
+        :return: a name of the method
+        """
+        value = self._get_option("image_copy_method", str)
+
+        if value not in (IMAGE_COPY_RSYNC, IMAGE_COPY_PARALLEL):
+            raise ValueError("Invalid value: {}".format(value))
+
+        return value
+
+    @property
+    def image_block_deployment(self):
+        """Deploy a live file system image at the block level.
+
+        If the live image is a file system image of the same type
+        as the root file system of the target system, write only
+        the allocated blocks of the image to the root device.
+        Otherwise, copy the content of the image.
+
+        :return: True or False
+        """
+        return self._get_option("image_block_deployment", bool)
+
+    @property
+    def stream_remote_tarballs(self):
+        """Extract remote live tarballs while they are downloaded.
+
+        A streamed tarball is not stored on the target system,
+        but its download cannot be resumed if it fails.
+
+        :return: True or False
+        """
+        return self._get_option("stream_remote_tarballs", bool)
+
+    @property
+    def metadata_cache(self):
+        """Path to a persistent cache of repository metadata.
+
+        The cache keeps downloaded and processed metadata of repositories
+        across installations. The cached metadata are identified by a hash
+        of the repomd.xml file, so they are reused only by installations
+        from the same snapshot of the repository. The path can point to
+        a local disk or a mounted network share.
+
+        The cache is disabled if the path is not specified.
+        """
+        return self._get_option("metadata_cache", str)
+
+    @property
+    def package_pools(self):
+        """List of paths to local directories with packages.
+
+        The directories are searched for packages before the packages
+        are downloaded, for example a mounted ISO, an NFS export or a
+        package cache of a previous installation. A package is used
+        only if it has the same checksum as the package from the
+        repository. Matching packages are hard linked, reflinked or
+        copied to the download location instead of downloading them.
+        """
+        return self._get_option("package_pools", str).split()
+
     @property
     def default_rpm_gpg_keys(self):
         """List of GPG keys to import into RPM database at end of installation."""
@@ -115,7 +115,6 @@ THREAD_WAIT_FOR_CONNECTING_NM = "AnaWaitForConnectingNMThread"
 THREAD_PAYLOAD = "AnaPayloadThread"
 THREAD_PAYLOAD_RESTART = "AnaPayloadRestartThread"
 THREAD_EXCEPTION_HANDLING_TEST = "AnaExceptionHandlingTest"
-THREAD_LIVE_PROGRESS = "AnaLiveProgressThread"
 THREAD_SOFTWARE_WATCHER = "AnaSoftwareWatcher"
 THREAD_CHECK_SOFTWARE = "AnaCheckSoftwareThread"
 THREAD_SOURCE_WATCHER = "AnaSourceWatcher"
@@ -449,6 +448,18 @@ REPO_ORIGIN_TREEINFO = "TREEINFO"
 DNF_DEFAULT_REPO_COST = 1000
 DNF_DEFAULT_TIMEOUT = -1
 DNF_DEFAULT_RETRIES = -1
+DNF_DEFAULT_PARALLEL_DOWNLOADS = -1
+DNF_ADAPTIVE_PARALLEL_DOWNLOADS = 0
+DNF_MAX_PARALLEL_DOWNLOADS = 20
+
+# Start methods of the DNF transaction process.
+DNF_TRANSACTION_FORK = "fork"
+DNF_TRANSACTION_SPAWN = "spawn"
+DNF_TRANSACTION_FORKSERVER = "forkserver"
+
+# Methods of the live image installation.
+IMAGE_COPY_RSYNC = "rsync"
+IMAGE_COPY_PARALLEL = "parallel"
 
 # Group package types.
 GROUP_PACKAGE_TYPE_MANDATORY = "mandatory"
@@ -14,9 +14,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import fcntl
 import os
+import shutil
 from pyanaconda.core.configuration.anaconda import conf
 
+# The ioctl request for cloning a file (see ioctl_ficlone(2)).
+FICLONE = 0x40049409
+
 
 def set_system_root(path):
     """Change the OS root path.
@@ -141,3 +146,33 @@ def set_mode(file_path, perm=0o600):
     if not os.path.exists(file_path):
         touch(file_path)
     os.chmod(file_path, perm)
+
+
+def clone_file(source, target, hardlink=True):
+    """Create a copy of a file with as little I/O as possible.
+
+    Create a hard link if allowed and possible. Otherwise, try to create
+    a reflink that shares data blocks with the source file. Copy the data
+    if the file system doesn't support it.
+
+    :param str source: a path to the source file
+    :param str target: a path to the target file
+    :param bool hardlink: should we try to create a hard link?
+    :return str: a used method ("hardlink", "reflink" or "copy")
+    """
+    if hardlink:
+        try:
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            pass
+
+    shutil.copyfile(source, target)
+    return "copy"
@@ -88,6 +88,7 @@ class CopyLogsTask(Task):
             "ifcfg.log",
             "lvm.log",
             "dnf.librepo.log",
+            "dnf.timing.jsonl",
             "hawkey.log",
             "dbus.log",
         ]
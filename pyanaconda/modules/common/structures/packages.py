@@ -21,7 +21,7 @@ from dasbus.structure import DBusData
 from dasbus.typing import *  # pylint: disable=wildcard-import
 
 from pyanaconda.core.constants import MULTILIB_POLICY_BEST, RPM_LANGUAGES_ALL, \
-    DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES
+    DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES, DNF_DEFAULT_PARALLEL_DOWNLOADS
 
 __all__ = ["PackagesSelectionData", "PackagesConfigurationData"]
 
@@ -221,6 +221,8 @@ class PackagesConfigurationData(DBusData):
         self._multilib_policy = MULTILIB_POLICY_BEST
         self._timeout = DNF_DEFAULT_TIMEOUT
         self._retries = DNF_DEFAULT_RETRIES
+        self._max_parallel_downloads = DNF_DEFAULT_PARALLEL_DOWNLOADS
+        self._download_throttle = ""
 
     @property
     def docs_excluded(self) -> Bool:
@@ -347,3 +349,36 @@ class PackagesConfigurationData(DBusData):
     @retries.setter
     def retries(self, value: Int):
         self._retries = value
+
+    @property
+    def max_parallel_downloads(self) -> Int:
+        """How many packages to download at the same time.
+
+        The value 0 enables the adaptive mode. The number of
+        parallel downloads is raised while the measured throughput
+        keeps growing and lowered on failures.
+
+        :return: a number of parallel downloads (or -1 by default)
+        :rtype: int
+        """
+        return self._max_parallel_downloads
+
+    @max_parallel_downloads.setter
+    def max_parallel_downloads(self, value: Int):
+        self._max_parallel_downloads = value
+
+    @property
+    def download_throttle(self) -> Str:
+        """The bandwidth limit of the package downloads.
+
+        For example: 500k, 10M or 50%. The percentage is
+        relative to the bandwidth configured in DNF.
+
+        :return: a limit or an empty string for no limit
+        :rtype: str
+        """
+        return self._download_throttle
+
+    @download_throttle.setter
+    def download_throttle(self, value: Str):
+        self._download_throttle = value
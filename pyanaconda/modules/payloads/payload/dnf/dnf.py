@@ -38,7 +38,8 @@ from pyanaconda.modules.payloads.payload.dnf.installation import SetRPMMacrosTas
     ResolvePackagesTask, PrepareDownloadLocationTask, DownloadPackagesTask, InstallPackagesTask, \
     CleanUpDownloadLocationTask, WriteRepositoriesTask, ImportRPMKeysTask, \
     UpdateDNFConfigurationTask
-from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask
+from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask, \
+    CompactDNFManagerTask
 from pyanaconda.modules.payloads.payload.dnf.utils import calculate_required_space
 from pyanaconda.modules.payloads.payload.payload_base import PayloadBase
 from pyanaconda.modules.payloads.payload.dnf.dnf_interface import DNFInterface
@@ -319,6 +320,13 @@ class DNFModule(PayloadBase):
         """
         return self.dnf_manager.get_environment_data(environment_spec)
 
+    def get_environments_data(self):
+        """Get data about all environments.
+
+        :return [CompsEnvironmentData]: a list of environment data
+        """
+        return self.dnf_manager.get_environments_data()
+
     def resolve_group(self, group_spec):
         """Translate the given specification into a group identifier.
 
@@ -336,6 +344,13 @@ class DNFModule(PayloadBase):
         """
         return self.dnf_manager.get_group_data(group_spec)
 
+    def get_groups_data(self):
+        """Get data about all groups.
+
+        :return [CompsGroupData]: a list of group data
+        """
+        return self.dnf_manager.get_groups_data()
+
     def verify_repomd_hashes_with_task(self):
         """Verify a hash of the repomd.xml file for each enabled repository with a task.
 
@@ -388,6 +403,7 @@ class DNFModule(PayloadBase):
             sources=self.sources,
             repositories=self.repositories,
             configuration=self.packages_configuration,
+            dnf_manager=self.dnf_manager,
         )
         task.succeeded_signal.connect(
             lambda: self._set_up_sources_on_success(task.get_result())
@@ -432,6 +448,9 @@ class DNFModule(PayloadBase):
             CleanUpDownloadLocationTask(
                 dnf_manager=self.dnf_manager,
             ),
+            CompactDNFManagerTask(
+                dnf_manager=self.dnf_manager,
+            ),
         ]
 
         self._collect_kernels_on_success(InstallPackagesTask, tasks)
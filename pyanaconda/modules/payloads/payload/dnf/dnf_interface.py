@@ -172,6 +172,15 @@ class DNFInterface(PayloadBaseInterface):
             self.implementation.get_environment_data(environment_spec)
         )
 
+    def GetEnvironmentsData(self) -> List[Structure]:
+        """Get data about all environments defined in comps.xml files.
+
+        :return: a list of data structures defined by CompsEnvironmentData
+        """
+        return CompsEnvironmentData.to_structure_list(
+            self.implementation.get_environments_data()
+        )
+
     def ResolveGroup(self, group_spec: Str) -> Str:
         """Translate the given specification into a group identifier.
 
@@ -191,6 +200,15 @@ class DNFInterface(PayloadBaseInterface):
             self.implementation.get_group_data(group_spec)
         )
 
+    def GetGroupsData(self) -> List[Structure]:
+        """Get data about all groups defined in comps.xml files.
+
+        :return: a list of data structures defined by CompsGroupData
+        """
+        return CompsGroupData.to_structure_list(
+            self.implementation.get_groups_data()
+        )
+
     def VerifyRepomdHashesWithTask(self) -> ObjPath:
         """Verify a hash of the repomd.xml file for each enabled repository with a task.
 
@@ -18,10 +18,15 @@
 # Red Hat, Inc.
 #
 import multiprocessing
+import os
 import shutil
 import threading
+import time
 import traceback
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import dnf
 import dnf.exceptions
 import dnf.module.module_base
@@ -34,8 +39,10 @@ from blivet.size import Size
 from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.constants import DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES, URL_TYPE_BASEURL, \
-    URL_TYPE_MIRRORLIST, URL_TYPE_METALINK, DNF_DEFAULT_REPO_COST
+    URL_TYPE_MIRRORLIST, URL_TYPE_METALINK, DNF_DEFAULT_REPO_COST, \
+    DNF_DEFAULT_PARALLEL_DOWNLOADS, DNF_ADAPTIVE_PARALLEL_DOWNLOADS, DNF_TRANSACTION_FORK
 from pyanaconda.core.i18n import _
+from pyanaconda.core.path import join_paths
 from pyanaconda.core.payload import ProxyString, ProxyStringError
 from pyanaconda.core.util import get_os_release_value
 from pyanaconda.modules.common.errors.installation import PayloadInstallationError
@@ -46,16 +53,27 @@ from pyanaconda.modules.common.structures.packages import PackagesConfigurationD
 from pyanaconda.modules.common.structures.payload import RepoConfigurationData
 from pyanaconda.modules.payloads.constants import DNF_REPO_DIRS
 from pyanaconda.modules.payloads.payload.dnf.download_progress import DownloadProgress
+from pyanaconda.modules.payloads.payload.dnf.installation_chunks import split_into_chunks
+from pyanaconda.modules.payloads.payload.dnf.metadata_cache import MetadataCache
+from pyanaconda.modules.payloads.payload.dnf.package_index import PackageNameIndex
+from pyanaconda.modules.payloads.payload.dnf.package_pool import PackagePool
+from pyanaconda.modules.payloads.payload.dnf.parallel_downloads import AdaptiveParallelDownloads
+from pyanaconda.modules.payloads.payload.dnf.timing_report import TimingReport
 from pyanaconda.modules.payloads.payload.dnf.transaction_progress import TransactionProgress, \
     process_transaction_progress
+from pyanaconda.modules.payloads.payload.dnf.transaction_worker import describe_transaction, \
+    run_transaction_worker, get_peak_memory_message, get_package_key, find_packages
 from pyanaconda.modules.payloads.payload.dnf.utils import get_product_release_version, \
-    calculate_hash, transaction_has_errors
+    calculate_hash, transaction_has_errors, get_memory_usage, release_memory
 
 log = get_module_logger(__name__)
 
 DNF_CACHE_DIR = '/tmp/dnf.cache'
 DNF_PLUGINCONF_DIR = '/tmp/dnf.pluginconf'
 
+# The maximal number of repositories that are loaded at the same time.
+DNF_REPO_LOADING_WORKERS = 8
+
 # Bonus to required free space which depends on block size and
 # rpm database size estimation. Every file could be aligned to
 # fragment size so 4KiB * number_of_files should be a worst case
@@ -67,6 +85,17 @@ DNF_PLUGINCONF_DIR = '/tmp/dnf.pluginconf'
 #
 DNF_EXTRA_SIZE_PER_FILE = Size("6 KiB")
 
+# The metadata loaded by a DNF manager. The repositories and
+# the comps_repositories are dictionaries of repo ids and keys
+# of the loaded metadata. The comps are the loaded DNF comps.
+LoadedMetadata = namedtuple(
+    "LoadedMetadata", [
+        "repositories",
+        "comps_repositories",
+        "comps",
+    ]
+)
+
 
 class DNFManagerError(Exception):
     """General error for the DNF manager."""
@@ -103,6 +132,21 @@ class DNFManager(object):
         self._download_location = None
         self._md_hashes = {}
         self._enabled_system_repositories = []
+        self._metadata_cache = MetadataCache(conf.payload.metadata_cache)
+        self._package_pool = PackagePool(conf.payload.package_pools)
+        self._files_numbers = {}
+        self._prefetched_packages = set()
+        self._installation_size = (None, None)
+        self._comps_data = None
+        self._package_names = None
+        self._resolved_selection = None
+        self._enabled_modules = []
+        self._disabled_modules = []
+        self._excluded_specs = []
+        self._adaptive_downloads = \
+            conf.payload.max_parallel_downloads == DNF_ADAPTIVE_PARALLEL_DOWNLOADS
+        self._loaded_metadata = None
+        self._reusable_metadata = None
 
     @property
     def _base(self):
@@ -125,6 +169,16 @@ class DNFManager(object):
         base.conf.gpgcheck = False
         base.conf.skip_if_unavailable = False
 
+        # Prefer mirrors with the lowest latency.
+        base.conf.fastestmirror = conf.payload.fastest_mirror
+
+        # Set the download parallelism and throttling.
+        if conf.payload.max_parallel_downloads > 0:
+            base.conf.max_parallel_downloads = conf.payload.max_parallel_downloads
+
+        if conf.payload.download_throttle:
+            base.conf.throttle = conf.payload.download_throttle
+
         # Set the default release version.
         base.conf.releasever = get_product_release_version()
 
@@ -158,6 +212,9 @@ class DNFManager(object):
         * Close the current DNF base if any.
         * Reset all attributes of the DNF manager.
         * The new DNF base will be created on demand.
+
+        The description of the loaded metadata is kept, so another
+        DNF manager can reuse the metadata. See reuse_metadata.
         """
         base = self.__base
         self.__base = None
@@ -170,6 +227,18 @@ class DNFManager(object):
         self._download_location = None
         self._md_hashes = {}
         self._enabled_system_repositories = []
+        self._files_numbers = {}
+        self._prefetched_packages = set()
+        self._installation_size = (None, None)
+        self._comps_data = None
+        self._package_names = None
+        self._resolved_selection = None
+        self._enabled_modules = []
+        self._disabled_modules = []
+        self._excluded_specs = []
+        self._adaptive_downloads = \
+            conf.payload.max_parallel_downloads == DNF_ADAPTIVE_PARALLEL_DOWNLOADS
+        self._reusable_metadata = None
 
         log.debug("The DNF base has been reset.")
 
@@ -187,6 +256,15 @@ class DNFManager(object):
         if data.retries != DNF_DEFAULT_RETRIES:
             base.conf.retries = data.retries
 
+        if data.max_parallel_downloads == DNF_ADAPTIVE_PARALLEL_DOWNLOADS:
+            self._adaptive_downloads = True
+        elif data.max_parallel_downloads != DNF_DEFAULT_PARALLEL_DOWNLOADS:
+            self._adaptive_downloads = False
+            base.conf.max_parallel_downloads = data.max_parallel_downloads
+
+        if data.download_throttle:
+            base.conf.throttle = data.download_throttle
+
         self._ignore_missing_packages = data.missing_ignored
         self._ignore_broken_packages = data.broken_ignored
 
@@ -292,6 +370,39 @@ class DNFManager(object):
 
         return data
 
+    def get_environments_data(self):
+        """Get the data of all environments.
+
+        The result is cached until the comps metadata change.
+
+        :return: a list of CompsEnvironmentData
+        """
+        environments, _groups = self._get_comps_data()
+        return environments
+
+    def get_groups_data(self):
+        """Get the data of all groups.
+
+        The result is cached until the comps metadata change.
+
+        :return: a list of CompsGroupData
+        """
+        _environments, groups = self._get_comps_data()
+        return groups
+
+    def _get_comps_data(self):
+        """Get the data of all environments and groups.
+
+        :return: a tuple of lists of CompsEnvironmentData and CompsGroupData
+        """
+        if self._comps_data is None:
+            self._comps_data = (
+                list(map(self._get_environment_data, self._base.comps.environments)),
+                list(map(self._get_group_data, self._base.comps.groups)),
+            )
+
+        return self._comps_data
+
     @property
     def groups(self):
         """Groups defined in comps.xml file.
@@ -427,20 +538,29 @@ class DNFManager(object):
     def get_installation_size(self):
         """Calculate the installation size.
 
+        The result is cached for the current transaction.
+
         :return: a space required by packages
         :rtype: an instance of Size
         """
-        packages_size = Size(0)
-        files_number = 0
+        transaction = self._base.transaction
 
-        if self._base.transaction is None:
+        if transaction is None:
             return Size("3000 MiB")
 
-        for tsi in self._base.transaction:
+        cached_transaction, cached_size = self._installation_size
+
+        if cached_transaction is transaction:
+            return cached_size
+
+        packages_size = Size(0)
+        files_number = 0
+
+        for tsi in transaction:
             # Space taken by all files installed by the packages.
             packages_size += tsi.pkg.installsize
             # Number of files installed on the system.
-            files_number += len(tsi.pkg.files)
+            files_number += self._get_files_number(tsi.pkg)
 
         # Calculate the files size depending on number of files.
         files_size = Size(files_number * DNF_EXTRA_SIZE_PER_FILE)
@@ -449,8 +569,26 @@ class DNFManager(object):
         total_space = Size((packages_size + files_size) * 1.1)
 
         log.info("Total install size: %s", total_space)
+        self._installation_size = (transaction, total_space)
         return total_space
 
+    def _get_files_number(self, package):
+        """Get the number of files installed by the specified package.
+
+        The DNF API provides only the complete list of files, so
+        the list is created only once for every package and only
+        the number of files is kept.
+
+        :param package: a DNF package
+        :return: a number of files
+        """
+        key = (str(package), package.reponame)
+
+        if key not in self._files_numbers:
+            self._files_numbers[key] = len(package.files)
+
+        return self._files_numbers[key]
+
     def get_download_size(self):
         """Calculate the download size.
 
@@ -472,10 +610,42 @@ class DNFManager(object):
         log.info("Total download size: %s", total_space)
         return total_space
 
-    def clear_cache(self):
-        """Clear the DNF cache."""
+    def get_chunked_download_size(self, chunk_size):
+        """Calculate the download size of the installation in chunks.
+
+        The packages of the current chunk and of the next chunk are
+        downloaded at the same time. A chunk can be bigger than the
+        chunk size if it contains a big group of cyclic dependencies.
+
+        :param chunk_size: a maximal download size of a chunk
+        :return: a space required for packages
+        :rtype: an instance of Size
+        """
+        if self._base.transaction is None:
+            return Size(0)
+
+        sizes = [
+            Size(sum(p.downloadsize for p in chunk))
+            for chunk in self.get_installation_chunks(chunk_size)
+        ]
+
+        # Get the biggest size of two subsequent chunks. Reserve extra space.
+        download_size = max(map(sum, zip(sizes, sizes[1:] + [Size(0)])), default=Size(0))
+        total_space = download_size + Size("150 MiB")
+
+        log.info("Total download size of two chunks: %s", total_space)
+        return total_space
+
+    def clear_cache(self, keep_metadata=False):
+        """Clear the DNF cache.
+
+        :param keep_metadata: should we keep the metadata of repositories?
+        """
         self._enabled_system_repositories = []
-        shutil.rmtree(DNF_CACHE_DIR, ignore_errors=True)
+
+        if not keep_metadata:
+            shutil.rmtree(DNF_CACHE_DIR, ignore_errors=True)
+
         shutil.rmtree(DNF_PLUGINCONF_DIR, ignore_errors=True)
         self._base.reset(sack=True, repos=True, goal=True)
         log.debug("The DNF cache has been cleared.")
@@ -490,6 +660,10 @@ class DNFManager(object):
             log.warning("There is no metadata about packages!")
             return False
 
+        # Most of the specs are plain package names.
+        if package_spec in self._get_package_names():
+            return True
+
         subject = dnf.subject.Subject(package_spec)
         return bool(subject.get_best_query(self._base.sack))
 
@@ -503,8 +677,23 @@ class DNFManager(object):
             log.warning("There is no metadata about packages!")
             return []
 
-        packages = self._base.sack.query().available().filter(name__glob=pattern)
-        return [p.name for p in packages]
+        return self._get_package_names().match(pattern)
+
+    def _get_package_names(self):
+        """Get the index of names of available packages.
+
+        The index is created on demand and dropped when
+        the package metadata are loaded again or when some
+        packages are excluded.
+
+        :return: an instance of PackageNameIndex
+        """
+        if self._package_names is None:
+            packages = self._base.sack.query().available()
+            self._package_names = PackageNameIndex(p.name for p in packages)
+            log.debug("Created an index of %d package names.", len(self._package_names))
+
+        return self._package_names
 
     def enable_modules(self, module_specs):
         """Mark module streams for enabling.
@@ -518,6 +707,7 @@ class DNFManager(object):
         :raise BrokenSpecsError: if there are broken specs
         """
         log.debug("Enabling modules: %s", module_specs)
+        self._enabled_modules.extend(module_specs)
 
         try:
             module_base = dnf.module.module_base.ModuleBase(self._base)
@@ -537,6 +727,8 @@ class DNFManager(object):
         :raise BrokenSpecsError: if there are broken specs
         """
         log.debug("Disabling modules: %s", module_specs)
+        self._disabled_modules.extend(module_specs)
+
         try:
             module_base = dnf.module.module_base.ModuleBase(self._base)
             module_base.disable(module_specs)
@@ -554,6 +746,10 @@ class DNFManager(object):
         """
         log.info("Including specs: %s", include_list)
         log.info("Excluding specs: %s", exclude_list)
+        self._excluded_specs = list(exclude_list)
+
+        if exclude_list:
+            self._package_names = None
 
         try:
             self._base.install_specs(
@@ -623,8 +819,56 @@ class DNFManager(object):
     def clear_selection(self):
         """Clear the software selection."""
         self._base.reset(goal=True)
+        self._resolved_selection = None
+        self._enabled_modules = []
+        self._disabled_modules = []
+        self._excluded_specs = []
         log.debug("The software selection has been cleared.")
 
+    def get_selection_key(self, include_list, exclude_list, enabled_modules, disabled_modules):
+        """Get a key of the software selection.
+
+        The key identifies the specified software selection together
+        with the configuration of the DNF base and the metadata of
+        the enabled repositories.
+
+        :param include_list: a list of specs for inclusion
+        :param exclude_list: a list of specs for exclusion
+        :param enabled_modules: a list of module specs to enable
+        :param disabled_modules: a list of module specs to disable
+        :return: a hashable key
+        """
+        return (
+            tuple(self.enabled_repositories),
+            tuple(sorted(self._md_hashes.items())),
+            tuple(include_list),
+            tuple(exclude_list),
+            tuple(enabled_modules),
+            tuple(disabled_modules),
+            self._ignore_missing_packages,
+            self._ignore_broken_packages,
+            self._base.conf.multilib_policy,
+            self._base.conf.install_weak_deps,
+        )
+
+    @property
+    def resolved_selection(self):
+        """The key of the resolved software selection.
+
+        The DNF base keeps the resolved transaction of this
+        selection until the selection is cleared.
+
+        :return: a key returned by get_selection_key or None
+        """
+        return self._resolved_selection
+
+    def set_resolved_selection(self, key):
+        """Remember the key of the resolved software selection.
+
+        :param key: a key returned by get_selection_key
+        """
+        self._resolved_selection = key
+
     @property
     def download_location(self):
         """The location for the package download."""
@@ -647,17 +891,103 @@ class DNFManager(object):
         :raise PayloadInstallationError: if the download fails
         """
         packages = self._base.transaction.install_set  # pylint: disable=no-member
-        progress = DownloadProgress(callback=callback)
+        report = TimingReport()
+        progress = DownloadProgress(callback=callback, report=report)
+
+        # The prefetched packages are not found locally.
+        progress.downloaded_packages.update(self._prefetched_packages)
+        self._prefetched_packages = set()
+
+        # Use packages from the package pools if possible.
+        self._import_pool_packages(packages)
 
         log.info("Downloading packages to %s.", self.download_location)
 
         try:
-            self._base.download_packages(packages, progress)
+            if self._adaptive_downloads:
+                self._download_packages_adaptively(packages, progress)
+            else:
+                self._base.download_packages(packages, progress)
         except dnf.exceptions.DownloadError as e:
             msg = "Failed to download the following packages: " + str(e)
             raise PayloadInstallationError(msg) from None
+        finally:
+            report.write()
+
+        progress.log_summary()
+
+    def _download_packages_adaptively(self, packages, progress):
+        """Download the packages with an adaptive parallelism.
+
+        The packages are downloaded in batches. The number of parallel
+        downloads is adjusted after every batch based on its measured
+        throughput. A failed batch is downloaded again with a lower
+        number of parallel downloads if possible.
+
+        :param packages: a list of DNF packages
+        :param progress: an instance of DownloadProgress
+        :raise DownloadError: if the download fails
+        """
+        parallelism = AdaptiveParallelDownloads()
+
+        for batch in parallelism.get_batches(list(packages)):
+            state = progress.get_state()
+
+            while True:
+                progress.restore_state(state)
+                self._base.conf.max_parallel_downloads = parallelism.value
+                downloaded_size = self._get_downloaded_size(progress)
+                start = time.monotonic()
 
-    def install_packages(self, callback, timeout=20):
+                try:
+                    self._base.download_packages(batch, progress)
+                except dnf.exceptions.DownloadError as e:
+                    if not parallelism.failed():
+                        raise
+
+                    log.warning("Failed to download a batch of packages: %s", e)
+                    continue
+
+                parallelism.succeeded(
+                    size=self._get_downloaded_size(progress) - downloaded_size,
+                    duration=time.monotonic() - start,
+                )
+                break
+
+    @staticmethod
+    def _get_downloaded_size(progress):
+        """Get a number of bytes downloaded from the network."""
+        return int(sum(progress.downloads.values()) - progress.local_size)
+
+    def _import_pool_packages(self, packages):
+        """Import the specified packages from the package pools.
+
+        The imported packages are placed into the download location,
+        so DNF will find them there and skip their download.
+
+        :param packages: a list of DNF packages
+        """
+        if not self._package_pool.enabled:
+            return
+
+        imported = 0
+
+        for package in packages:
+            target_path = package.localPkg()
+
+            # Skip local or already downloaded packages.
+            if os.path.exists(target_path):
+                continue
+
+            checksum_type, checksum = package.returnIdSum()
+
+            if self._package_pool.import_package(
+                    os.path.basename(package.location), checksum_type, checksum, target_path):
+                imported += 1
+
+        log.info("Imported %d of %d packages from the package pools.", imported, len(packages))
+
+    def install_packages(self, callback, timeout=20, prefetch=None):
         """Install the packages.
 
         Run the DNF transaction in a separate sub-process to isolate
@@ -665,22 +995,36 @@ class DNFManager(object):
 
         :param callback: a callback for progress reporting
         :param timeout: a time out of a failed process in seconds
+        :param prefetch: a list of packages to download during the transaction
         :raise PayloadInstallationError: if the installation fails
         """
-        queue = multiprocessing.Queue()
-        display = TransactionProgress(queue)
-        process = multiprocessing.Process(
-            target=self._run_transaction,
-            args=(self._base, display)
-        )
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = self._create_transaction_process(sender)
 
         # Start the transaction.
         log.debug("Starting the transaction process...")
         process.start()
 
+        # Close our copy of the sending end, so we can
+        # detect the end of the transaction process.
+        sender.close()
+
+        # Download the next packages during the transaction. Start
+        # the thread after the fork, so the sub-process doesn't
+        # inherit any locks held by the thread.
+        downloader = None
+
+        if prefetch:
+            downloader = threading.Thread(
+                name="AnaDNFPrefetchThread",
+                target=self._prefetch_packages,
+                args=(prefetch, )
+            )
+            downloader.start()
+
         try:
             # Report the progress.
-            process_transaction_progress(queue, callback)
+            process_transaction_progress(receiver, callback)
 
             # Wait for the transaction to end.
             process.join()
@@ -688,8 +1032,275 @@ class DNFManager(object):
             # Kill the transaction after the timeout.
             process.join(timeout)
             process.kill()
+            receiver.close()
             log.debug("The transaction process exited with %s.", process.exitcode)
 
+            if downloader:
+                downloader.join()
+
+    def _create_transaction_process(self, sender):
+        """Create a process for the DNF transaction.
+
+        By default, the payload module is forked with the loaded DNF
+        base. Otherwise, a new process is started with the configured
+        start method and it runs the transaction with a minimal DNF
+        base created from a description of the transaction.
+
+        :param sender: a sending end of a pipe
+        :return: a new process
+        """
+        method = conf.payload.transaction_start_method
+        description = None
+
+        if method != DNF_TRANSACTION_FORK:
+            description = describe_transaction(self._base)
+
+        if not description:
+            log.debug("The transaction process will be forked.")
+            display = TransactionProgress(sender, TimingReport())
+            return multiprocessing.Process(
+                target=self._run_transaction,
+                args=(self._base, display)
+            )
+
+        log.debug("The transaction process will be started by %s.", method)
+        context = multiprocessing.get_context(method)
+        return context.Process(
+            target=run_transaction_worker,
+            args=(description, sender)
+        )
+
+    def compact(self):
+        """Release data that are not needed after the installation.
+
+        Drop the package sack, the goal, the transaction and the comps
+        data of the DNF base. The configuration of the repositories
+        is kept, so the repo files can still be generated.
+        """
+        rss_before = get_memory_usage()
+
+        self._base.reset(sack=True, goal=True)
+        self._base._comps = None  # pylint: disable=protected-access
+        self._comps_data = None
+        self._package_names = None
+        self._resolved_selection = None
+        self._files_numbers = {}
+        self._installation_size = (None, None)
+        self._loaded_metadata = None
+        self._reusable_metadata = None
+
+        release_memory()
+        rss_after = get_memory_usage()
+
+        log.info("Released memory of the DNF base: %s before, %s after.", rss_before, rss_after)
+
+    def _prefetch_packages(self, packages):
+        """Download the specified packages in advance.
+
+        Failures are only logged. The packages will be downloaded
+        again when they are needed.
+
+        :param packages: a list of DNF packages
+        """
+        log.debug("Prefetching %d packages.", len(packages))
+
+        progress = DownloadProgress(callback=log.debug)
+
+        try:
+            self._base.download_packages(packages, progress)
+        except dnf.exceptions.DownloadError as e:
+            log.warning("Failed to prefetch packages: %s", e)
+        finally:
+            self._prefetched_packages = progress.downloaded_packages
+
+    def install_packages_in_chunks(self, callback, chunk_size):
+        """Download and install the packages in chunks.
+
+        The resolved transaction is split into dependency-ordered
+        chunks. Every chunk is resolved and installed by a separate
+        transaction. The packages of the next chunk are downloaded
+        while the current chunk is installed and the packages of
+        the current chunk are removed right after the installation.
+
+        Weak dependencies are not installed by the transactions of
+        the chunks. The weak dependencies selected by the complete
+        transaction are already members of the chunks, and others
+        would only break the size limit of the chunks.
+
+        :param callback: a callback for progress reporting
+        :param chunk_size: a maximal download size of a chunk
+        :raise PayloadInstallationError: if the installation fails
+        """
+        chunks = [
+            [self._get_package_key(p) for p in chunk]
+            for chunk in self.get_installation_chunks(chunk_size)
+        ]
+
+        log.info("Installing packages in %d chunks of %s.", len(chunks), chunk_size)
+        install_weak_deps = self._base.conf.install_weak_deps
+        self._base.conf.install_weak_deps = False
+
+        try:
+            self._install_chunks(callback, chunks)
+        finally:
+            self._base.conf.install_weak_deps = install_weak_deps
+
+    def _install_chunks(self, callback, chunks):
+        """Download and install the chunks of packages.
+
+        :param callback: a callback for progress reporting
+        :param chunks: a list of lists of package keys
+        :raise PayloadInstallationError: if the installation fails
+        """
+        for index, chunk in enumerate(chunks):
+            callback(_("Installing packages (chunk {current} of {total})").format(
+                current=index + 1,
+                total=len(chunks)
+            ))
+
+            self._select_packages(chunk)
+
+            if not self._base.transaction:
+                log.debug("The chunk %d is already installed.", index + 1)
+                continue
+
+            self.download_packages(callback)
+
+            prefetch = None
+
+            if index + 1 < len(chunks):
+                prefetch = self._find_packages(chunks[index + 1])
+
+            self.install_packages(callback, prefetch=prefetch)
+            self._remove_downloaded_packages()
+            self._load_installed_packages()
+
+    def get_installation_chunks(self, chunk_size):
+        """Split the resolved transaction into chunks.
+
+        Dependencies of a package are placed into the same
+        or an earlier chunk of packages. The dependencies on
+        files are resolved by the file lists of the packages.
+
+        :param chunk_size: a maximal download size of a chunk
+        :return: a list of lists of DNF packages
+        """
+        packages = sorted(self._base.transaction.install_set)  # pylint: disable=no-member
+        query = self._base.sack.query().filterm(pkg=packages)
+
+        def get_dependencies(package):
+            requires = package.requires
+
+            if not requires:
+                return []
+
+            files = [str(r) for r in requires if str(r).startswith("/")]
+            dependencies = query.filter(provides=requires)
+
+            if files:
+                dependencies = dependencies.union(query.filter(file=files))
+
+            return dependencies
+
+        return split_into_chunks(
+            packages,
+            get_dependencies=get_dependencies,
+            get_size=lambda p: p.downloadsize,
+            chunk_size=chunk_size,
+        )
+
+    @staticmethod
+    def _get_package_key(package):
+        """Get a key that identifies the package in any sack."""
+        return get_package_key(package)
+
+    def _find_packages(self, keys, strict=False):
+        """Find available packages with the specified keys.
+
+        :param keys: a list of package keys
+        :param strict: raise an error if some packages are missing
+        :return: a list of DNF packages
+        :raise RuntimeError: if some packages are missing in the strict mode
+        """
+        return find_packages(self._base, keys, strict=strict)
+
+    def _select_packages(self, keys):
+        """Resolve a transaction with the specified packages.
+
+        The settings of the software selection are applied again,
+        because they are dropped by the reset of the goal and sack.
+
+        :param keys: a list of package keys
+        :raise InvalidSelectionError: if the selection cannot be resolved
+        :raise PayloadInstallationError: if some packages are missing
+        """
+        self.clear_selection()
+        self._restore_selection_settings()
+
+        try:
+            packages = self._find_packages(keys, strict=True)
+        except RuntimeError as e:
+            raise PayloadInstallationError(str(e)) from None
+
+        for package in packages:
+            self._base.package_install(package, strict=not self._ignore_broken_packages)
+
+        self.resolve_selection()
+
+    def _restore_selection_settings(self):
+        """Apply the module settings and the excluded specs again.
+
+        The package specs are excluded from the sack by their names
+        the same way as DNF does it in the install_specs method.
+        """
+        try:
+            module_base = dnf.module.module_base.ModuleBase(self._base)
+
+            if self._disabled_modules:
+                module_base.disable(self._disabled_modules)
+
+            if self._enabled_modules:
+                module_base.enable(self._enabled_modules)
+
+        except dnf.exceptions.MarkingErrors as e:
+            log.error("Failed to restore modules!\n%s", str(e))
+            self._handle_marking_errors(e)
+
+        names = [spec for spec in self._excluded_specs if not spec.startswith("@")]
+
+        if names:
+            query = self._base.sack.query().filterm(name__glob=names)
+            self._base.sack.add_excludes(query)
+            self._package_names = None
+
+    def _remove_downloaded_packages(self):
+        """Remove downloaded packages of the current transaction.
+
+        Packages from local repositories are never removed.
+        """
+        for package in self._base.transaction.install_set:  # pylint: disable=no-member
+            path = package.localPkg()
+
+            if os.path.dirname(path) != self._download_location:
+                continue
+
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_installed_packages(self):
+        """Load the installed packages into the package sack.
+
+        The next transaction will take the installed packages
+        into account, so they will not be installed again.
+        """
+        self._base.reset(sack=True, goal=True)
+        self._base.fill_sack(
+            load_system_repo=True,
+            load_available_repos=True,
+        )
+        self._package_names = None
+        self._resolved_selection = None
+
     @staticmethod
     def _run_transaction(base, display):
         """Run the DNF transaction.
@@ -711,6 +1322,7 @@ class DNFManager(object):
         finally:
             log.debug("The transaction has ended.")
             base.close()  # Always close this base.
+            display.log(get_peak_memory_message())
             display.quit("DNF quit")
 
     @property
@@ -959,23 +1571,134 @@ class DNFManager(object):
         :param str repo_id: an identifier of a repository
         :raise: MetadataError if the metadata cannot be loaded
         """
-        log.debug("Load metadata for the '%s' repository.", repo_id)
-
-        repo = self._get_repository(repo_id)
-        url = repo.baseurl or repo.mirrorlist or repo.metalink
+        with self._lock:
+            repo = self._prepare_repository(repo_id)
 
-        if not repo.enabled:
-            log.debug("Don't load metadata from a disabled repository.")
+        if not repo:
             return
 
+        # Reuse metadata from the persistent cache if possible.
+        self._restore_cached_metadata(repo)
+
         try:
             repo.load()
         except dnf.exceptions.RepoError as e:
-            log.debug("Failed to load metadata from '%s': %s", url, str(e))
-            repo.disable()
+            with self._lock:
+                self._disable_invalid_repository(repo, e)
+
             raise MetadataError(str(e)) from None
 
-        log.info("Loaded metadata from '%s'.", url)
+        log.info("Loaded metadata from '%s'.", self._get_repository_url(repo))
+
+    def _prepare_repository(self, repo_id):
+        """Prepare the repository for loading of its metadata.
+
+        The caller is expected to hold the lock.
+
+        :param str repo_id: an identifier of a repository
+        :return: a DNF repo or None if the repo shouldn't be loaded
+        :raise: UnknownRepositoryError if no repo is found
+        """
+        log.debug("Load metadata for the '%s' repository.", repo_id)
+        repo = self._get_repository(repo_id)
+
+        if not repo.enabled:
+            log.debug("Don't load metadata from a disabled repository.")
+            return None
+
+        return repo
+
+    def _disable_invalid_repository(self, repo, error):
+        """Disable a repository with invalid metadata.
+
+        The caller is expected to hold the lock.
+
+        :param repo: a DNF repo
+        :param error: an error raised by loading of the metadata
+        """
+        url = self._get_repository_url(repo)
+        log.debug("Failed to load metadata from '%s': %s", url, str(error))
+        repo.disable()
+
+    @staticmethod
+    def _get_repository_url(repo):
+        """Get a URL of the repository for logging.
+
+        :param repo: a DNF repo
+        :return: a list of URLs or a URL
+        """
+        return repo.baseurl or repo.mirrorlist or repo.metalink
+
+    def load_repositories(self, repo_ids, callback=None):
+        """Download metadata of the specified repositories.
+
+        The repositories are loaded concurrently by a bounded pool
+        of worker threads. Every repository is processed the same
+        way as by the load_repository method, so an invalid repo
+        will be disabled.
+
+        Only the download of the metadata runs concurrently. Every
+        repo is loaded by its own libdnf repo object with its own
+        librepo handle and cache directory, and the loading doesn't
+        touch the shared sack. The sack is filled later from all
+        repos by the load_packages_metadata method. Everything that
+        accesses the shared DNF base is serialized by the lock.
+
+        :param [str] repo_ids: a list of repository identifiers
+        :param callback: a function called with an id and an error of every processed repository
+        :return: a dictionary of repo ids and errors (None if the repo is valid)
+        :raise: UnknownRepositoryError if no repo is found
+        """
+        repo_ids = list(dict.fromkeys(repo_ids))
+        errors = {}
+        timings = {}
+
+        def _load_repository(repo_id):
+            repo_start = time.perf_counter()
+
+            try:
+                self.load_repository(repo_id)
+            except MetadataError as e:
+                return e
+            finally:
+                timings[repo_id] = time.perf_counter() - repo_start
+
+            return None
+
+        start = time.perf_counter()
+        workers = max(min(DNF_REPO_LOADING_WORKERS, len(repo_ids)), 1)
+
+        with ThreadPoolExecutor(workers, thread_name_prefix="AnaDNFLoadRepo") as executor:
+            futures = {executor.submit(_load_repository, r): r for r in repo_ids}
+
+            for future in as_completed(futures):
+                repo_id = futures[future]
+                errors[repo_id] = future.result()
+
+                if callback:
+                    callback(repo_id, errors[repo_id])
+
+        self._log_loading_summary(repo_ids, errors, timings, time.perf_counter() - start)
+        return {r: errors[r] for r in repo_ids}
+
+    @staticmethod
+    def _log_loading_summary(repo_ids, errors, timings, total_time):
+        """Log the time spent by loading of the repositories.
+
+        :param [str] repo_ids: a list of repository identifiers
+        :param errors: a dictionary of repo ids and errors
+        :param timings: a dictionary of repo ids and durations in seconds
+        :param total_time: the total duration in seconds
+        """
+        lines = [
+            "{} {:.2f}s{}".format(r, timings[r], " (failed)" if errors[r] else "")
+            for r in sorted(repo_ids, key=lambda r: timings[r], reverse=True)
+        ]
+
+        log.info(
+            "Loaded metadata of %d repositories in %.2fs:\n%s",
+            len(repo_ids), total_time, "\n".join(lines)
+        )
 
     def load_packages_metadata(self):
         """Load metadata about packages in available repositories.
@@ -991,15 +1714,196 @@ class DNFManager(object):
             load_available_repos=True,
         )
         # Load the comps metadata.
+        self._load_comps()
+        self._comps_data = None
+        self._package_names = None
+        self._resolved_selection = None
+
+        log.info("Loaded packages and group metadata.")
+
+        # Update the persistent cache.
+        self._store_cached_metadata()
+
+    def _load_comps(self):
+        """Load the comps metadata of enabled repositories.
+
+        Reuse the comps loaded by another DNF manager if they were
+        loaded from the same repositories. See reuse_metadata.
+
+        The comps object can be shared with the previous DNF base.
+        It is created only from the comps files of the repositories
+        and the architecture of the system, and it doesn't refer to
+        the base. The reset of the previous base only drops its
+        reference and nothing modifies the comps after they are read.
+        """
+        metadata = self._reusable_metadata
+
+        if metadata and metadata.comps \
+                and metadata.comps_repositories == self._get_comps_repositories():
+            log.debug("Reusing the loaded comps metadata.")
+            self._base._comps = metadata.comps  # pylint: disable=protected-access
+            return
+
         self._base.read_comps(
             arch_filter=True
         )
 
-        log.info("Loaded packages and group metadata.")
+    @property
+    def loaded_metadata(self):
+        """The description of the loaded metadata.
+
+        It is available after the repomd.xml hashes are loaded
+        and it survives the reset of the DNF base.
+
+        :return: an instance of LoadedMetadata or None
+        """
+        return self._loaded_metadata
+
+    def reuse_metadata(self, metadata):
+        """Reuse the metadata loaded by another DNF manager.
+
+        Call this method before the enabled repositories are loaded.
+        Metadata of a repository are kept in the DNF cache if they
+        were loaded from the same cache directory and the repomd.xml
+        file has the same hash. Otherwise, they are removed from the
+        cache and DNF will load them again. Metadata of repositories
+        that are not enabled anymore are removed from the cache too.
+        The comps metadata are reused if the repositories with comps
+        haven't changed.
+
+        :param LoadedMetadata metadata: the loaded metadata or None
+        """
+        if not metadata:
+            return
+
+        repos = self._get_enabled_repos()
+        self._md_hashes = dict(self._iterate_repomd_hashes(repos))
+        self._reusable_metadata = metadata
+        reused = []
+
+        for repo in repos:
+            key = self._get_metadata_key(repo)
+
+            if key[1] and metadata.repositories.get(repo.id) == key:
+                reused.append(repo.id)
+                continue
+
+            self._remove_cached_metadata(repo)
+
+        log.info("Reusing loaded metadata of repositories: %s", ", ".join(reused) or "none")
+
+        # Remove metadata of dropped repositories.
+        repo_dirs = {repo._repo.getCachedir() for repo in repos}
+
+        for repo_id, (repo_dir, _md_hash) in metadata.repositories.items():
+            if repo_dir in repo_dirs:
+                continue
+
+            log.debug("Removing metadata of the dropped repository %s.", repo_id)
+            self._remove_metadata_files(repo_id, repo_dir)
+
+    def _get_metadata_key(self, repo):
+        """Get a key of the loaded metadata of the specified repository.
+
+        :param repo: a DNF repo
+        :return: a tuple with a cache directory and a repomd.xml hash
+        """
+        return repo._repo.getCachedir(), self._md_hashes.get(repo.id)
+
+    def _get_comps_repositories(self):
+        """Get keys of the loaded metadata of repositories with comps.
+
+        :return: a dictionary of repo ids and keys
+        """
+        return {
+            repo.id: self._get_metadata_key(repo)
+            for repo in self._get_enabled_repos()
+            if repo._repo.getCompsFn()
+        }
+
+    def _remove_cached_metadata(self, repo):
+        """Remove metadata of the specified repository from the DNF cache.
+
+        :param repo: a DNF repo
+        """
+        self._remove_metadata_files(repo.id, repo._repo.getCachedir())
+
+    def _remove_metadata_files(self, repo_id, repo_dir):
+        """Remove the repodata and solv files of a repository from the DNF cache.
+
+        :param repo_id: an id of the repository
+        :param repo_dir: a cache directory of the repository
+        """
+        shutil.rmtree(repo_dir, ignore_errors=True)
+
+        for suffix in MetadataCache.SOLV_SUFFIXES:
+            solv_path = join_paths(self._base.conf.cachedir, repo_id + suffix)
+
+            if os.path.exists(solv_path):
+                os.remove(solv_path)
+
+    def _restore_cached_metadata(self, repo):
+        """Restore metadata of the repository from the persistent cache.
+
+        The cached metadata are used only if the hash of the current
+        repomd.xml file matches. DNF will reuse the restored repodata
+        and solv files instead of downloading and processing them.
+
+        The repomd.xml file is downloaded without holding the lock,
+        so the repositories can be still loaded concurrently.
+
+        :param repo: a DNF repo
+        """
+        if not self._metadata_cache.enabled:
+            return
+
+        # Local repositories are never downloaded.
+        if repo.baseurl and all(url.startswith("file:") for url in repo.baseurl):
+            return
+
+        # The metadata are already downloaded.
+        repo_dir = repo._repo.getCachedir()
+
+        if os.path.exists(join_paths(repo_dir, "repodata")):
+            return
+
+        content = self._get_repomd_content(repo)
+        md_hash = calculate_hash(content) if content else None
+
+        with self._lock:
+            self._metadata_cache.restore(repo.id, md_hash, repo_dir, self._base.conf.cachedir)
+
+    def _store_cached_metadata(self):
+        """Store metadata of enabled repositories in the persistent cache."""
+        if not self._metadata_cache.enabled:
+            return
+
+        with self._lock:
+            repositories = list(self._base.repos.iter_enabled())
+
+        for repo in repositories:
+            repo_dir = repo._repo.getCachedir()
+            md_path = join_paths(repo_dir, "repodata", "repomd.xml")
+
+            if not os.path.exists(md_path):
+                continue
+
+            with open(md_path, "r") as f:
+                md_hash = calculate_hash(f.read())
+
+            self._metadata_cache.store(repo.id, md_hash, repo_dir, self._base.conf.cachedir)
 
     def load_repomd_hashes(self):
         """Load a hash of the repomd.xml file for each enabled repository."""
         self._md_hashes = self._get_repomd_hashes()
+        self._loaded_metadata = LoadedMetadata(
+            repositories={
+                repo.id: self._get_metadata_key(repo)
+                for repo in self._get_enabled_repos()
+            },
+            comps_repositories=self._get_comps_repositories(),
+            comps=self._base.comps,
+        )
 
     def verify_repomd_hashes(self):
         """Verify a hash of the repomd.xml file for each enabled repository.
@@ -1008,24 +1912,72 @@ class DNFManager(object):
         It is useful when network settings are changed so that we can verify if
         repositories are still reachable.
 
+        The repositories are checked concurrently and the verification
+        stops at the first repository that has changed.
+
         :return: True if files haven't changed, otherwise False
         """
-        return bool(self._md_hashes and self._md_hashes == self._get_repomd_hashes())
+        if not self._md_hashes:
+            return False
+
+        repos = self._get_enabled_repos()
+
+        if set(self._md_hashes) != {repo.id for repo in repos}:
+            log.debug("The enabled repositories have changed.")
+            return False
+
+        for repo_id, md_hash in self._iterate_repomd_hashes(repos):
+            if md_hash != self._md_hashes[repo_id]:
+                log.debug("The repomd.xml file of '%s' has changed.", repo_id)
+                return False
+
+        return True
+
+    def _get_enabled_repos(self):
+        """Get a list of enabled DNF repos.
+
+        :return: a list of DNF repos
+        """
+        with self._lock:
+            return list(self._base.repos.iter_enabled())
 
     def _get_repomd_hashes(self):
         """Get a dictionary of repomd.xml hashes.
 
         :return: a dictionary of repo ids and repomd.xml hashes
         """
-        md_hashes = {}
+        md_hashes = dict(self._iterate_repomd_hashes(self._get_enabled_repos()))
+        log.debug("Loaded repomd.xml hashes: %s", md_hashes)
+        return md_hashes
 
-        for repo in self._base.repos.iter_enabled():
+    def _iterate_repomd_hashes(self, repos):
+        """Iterate over repomd.xml hashes of the specified repositories.
+
+        The repomd.xml files are downloaded concurrently and
+        the hashes are generated in the order of completion.
+        Downloads that haven't started yet are cancelled if
+        the iteration ends early.
+
+        :param repos: a list of DNF repos
+        :return: an iterator of repo ids and repomd.xml hashes
+        """
+        def _get_repomd_hash(repo):
             content = self._get_repomd_content(repo)
-            md_hash = calculate_hash(content) if content else None
-            md_hashes[repo.id] = md_hash
+            return calculate_hash(content) if content else None
 
-        log.debug("Loaded repomd.xml hashes: %s", md_hashes)
-        return md_hashes
+        if not repos:
+            return
+
+        workers = min(DNF_REPO_LOADING_WORKERS, len(repos))
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="AnaDNFRepomd")
+
+        try:
+            futures = {executor.submit(_get_repomd_hash, r): r.id for r in repos}
+
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def _get_repomd_content(self, repo):
         """Get a content of a repomd.xml file.
@@ -45,18 +45,25 @@ def paced(fn):
 class DownloadProgress(dnf.callback.DownloadProgress):
     """The class for receiving information about an ongoing download."""
 
-    def __init__(self, callback):
+    def __init__(self, callback, report=None):
         """Create a new instance.
 
         :param callback: a progress reporting callback
+        :param report: a timing report or None
         """
         super().__init__()
         self.callback = callback
+        self.report = report
+        self.batch_start = None
+        self.transfer_starts = {}
         self.downloads = collections.defaultdict(int)
+        self.downloaded_packages = set()
         self.last_time = time.time()
         self.total_files = 0
         self.total_size = Size(0)
         self.downloaded_size = Size(0)
+        self.local_files = 0
+        self.local_size = Size(0)
 
     @paced
     def _report_progress(self):
@@ -64,15 +71,26 @@ class DownloadProgress(dnf.callback.DownloadProgress):
         self.downloaded_size = Size(sum(self.downloads.values()))
 
         # Report the progress.
-        msg = _(
-            'Downloading {total_files} RPMs, '
-            '{downloaded_size} / {total_size} '
-            '({total_percent}%) done.'
-        ).format(
+        if not self.local_files:
+            msg = _(
+                'Downloading {total_files} RPMs, '
+                '{downloaded_size} / {total_size} '
+                '({total_percent}%) done.'
+            )
+        else:
+            msg = _(
+                'Downloading {total_files} RPMs, '
+                '{downloaded_size} / {total_size} '
+                '({total_percent}%) done, '
+                '{local_files} RPMs found locally.'
+            )
+
+        msg = msg.format(
             downloaded_size=self.downloaded_size,
             total_percent=int(100 * self.downloaded_size / self.total_size),
             total_files=self.total_files,
-            total_size=self.total_size
+            total_size=self.total_size,
+            local_files=self.local_files,
         )
 
         self.callback(msg)
@@ -82,17 +100,91 @@ class DownloadProgress(dnf.callback.DownloadProgress):
 
         if status is dnf.callback.STATUS_OK:
             self.downloads[nevra] = payload.download_size
+            self.downloaded_packages.add(nevra)
+            self._add_timing(nevra, payload.download_size, "downloaded")
             self._report_progress()
             return
 
+        if status == dnf.callback.STATUS_ALREADY_EXISTS and nevra in self.downloaded_packages:
+            # The package was downloaded by a failed batch or in advance.
+            self.downloads[nevra] = payload.download_size
+            self._report_progress()
+            return
+
+        if status == dnf.callback.STATUS_ALREADY_EXISTS:
+            self.downloads[nevra] = payload.download_size
+            self.local_files += 1
+            self.local_size += payload.download_size
+            self._add_timing(nevra, payload.download_size, "found locally")
+            self._report_progress()
+            return
+
+        self._add_timing(nevra, payload.download_size, "failed")
         log.warning("Failed to download '%s': %d - %s", nevra, status, msg)
 
+    def _add_timing(self, nevra, size, status):
+        """Add the download of the package to the timing report.
+
+        DNF doesn't report the start of a download, so the duration
+        is measured from the start of the batch and it includes the
+        time spent waiting for a free connection. The transfer time
+        is measured from the first reported progress of the package.
+        """
+        if self.report is None:
+            return
+
+        now = time.monotonic()
+        start = self.batch_start if self.batch_start is not None else now
+        transfer_start = self.transfer_starts.pop(nevra, None)
+
+        self.report.add(
+            "download",
+            duration=now - start,
+            package=nevra,
+            size=int(size),
+            status=status,
+            transfer=round(now - transfer_start, 3) if transfer_start is not None else None,
+        )
+
     def progress(self, payload, done):
         nevra = str(payload)
+        self.transfer_starts.setdefault(nevra, time.monotonic())
         self.downloads[nevra] = done
         self._report_progress()
 
     def start(self, total_files, total_size, total_drpms=0):
         del total_drpms
-        self.total_files = total_files
-        self.total_size = Size(total_size)
+        self.batch_start = time.monotonic()
+
+        # The packages can be downloaded in multiple batches.
+        self.total_files += total_files
+        self.total_size += Size(total_size)
+
+    def get_state(self):
+        """Get the state of the progress before a batch of packages.
+
+        :return: an opaque state
+        """
+        return self.total_files, self.total_size
+
+    def restore_state(self, state):
+        """Restore the state of the progress before a failed batch.
+
+        The batch will be downloaded again, so its packages shouldn't
+        be counted twice. The packages downloaded by the failed batch
+        stay downloaded and they will not be reported as local.
+
+        :param state: a state returned by get_state
+        """
+        self.total_files, self.total_size = state
+
+    def log_summary(self):
+        """Log the summary of the download."""
+        downloaded_size = Size(sum(self.downloads.values()))
+
+        log.info(
+            "Downloaded %s from the network, found %d RPMs (%s) locally.",
+            Size(downloaded_size - self.local_size),
+            self.local_files,
+            self.local_size
+        )
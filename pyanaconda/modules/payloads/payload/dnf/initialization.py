@@ -27,10 +27,10 @@ from pyanaconda.core.i18n import _
 from pyanaconda.modules.common.errors.payload import SourceSetupError
 from pyanaconda.modules.payloads.base.initialization import SetUpSourcesTask, TearDownSourcesTask
 from pyanaconda.modules.payloads.constants import SourceType
-from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager, MetadataError
+from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager
 from pyanaconda.modules.payloads.payload.dnf.repositories import update_treeinfo_repositories, \
-    disable_default_repositories, enable_updates_repositories, create_repository, \
-    enable_existing_repository, generate_source_from_repository
+    disable_default_repositories, enable_updates_repositories, enable_existing_repository, \
+    generate_source_from_repository
 from pyanaconda.modules.payloads.payload.dnf.tree_info import LoadTreeInfoMetadataTask
 
 DNF_LIBREPO_LOG = "/tmp/dnf.librepo.log"
@@ -66,14 +66,22 @@ SetUpDNFSourcesResult = namedtuple(
 class SetUpDNFSourcesTask(SetUpSourcesTask):
     """Set up all the installation source of the DNF payload."""
 
-    def __init__(self, sources, repositories, configuration):
-        """Create a new task."""
+    def __init__(self, sources, repositories, configuration, dnf_manager=None):
+        """Create a new task.
+
+        :param sources: a list of installation sources
+        :param repositories: a list of additional repositories
+        :param configuration: a packages configuration
+        :param dnf_manager: a previous DNF manager with reusable metadata or None
+        """
         super().__init__(sources)
         self._configuration = configuration
         self._repositories = repositories
+        self._loaded_metadata = dnf_manager.loaded_metadata if dnf_manager else None
         self._treeinfo_repositories = []
         self._release_version = None
         self._proxy = None
+        self._created_repositories = []
 
     @property
     def _source(self):
@@ -120,8 +128,11 @@ class SetUpDNFSourcesTask(SetUpSourcesTask):
         # Load additional sources.
         self._load_additional_sources(dnf_manager, sources, repositories)
 
-        # Validate enabled repositories.
-        self._validate_repositories(dnf_manager)
+        # Reuse metadata of unchanged repositories.
+        dnf_manager.reuse_metadata(self._loaded_metadata)
+
+        # Load and validate enabled repositories.
+        self._load_repositories(dnf_manager)
 
         # Load package and group metadata.
         self.report_progress(_("Downloading group metadata..."))
@@ -195,7 +206,7 @@ class SetUpDNFSourcesTask(SetUpSourcesTask):
         """
         log.debug("Preparing the DNF base...")
         dnf_manager = DNFManager()
-        dnf_manager.clear_cache()
+        dnf_manager.clear_cache(keep_metadata=bool(self._loaded_metadata))
         dnf_manager.configure_base(self._configuration)
         dnf_manager.configure_proxy(self._proxy)
         dnf_manager.configure_substitution(self._release_version)
@@ -224,7 +235,9 @@ class SetUpDNFSourcesTask(SetUpSourcesTask):
 
         else:
             repository = repository or source.generate_repo_configuration()
-            create_repository(dnf_manager, repository)
+            log.debug("Add the '%s' repository (%s).", repository.name, repository)
+            dnf_manager.add_repository(repository)
+            self._created_repositories.append(repository.name)
 
     def _load_additional_sources(self, dnf_manager, sources, repositories):
         """Load additional sources and handle system repositories.
@@ -240,28 +253,52 @@ class SetUpDNFSourcesTask(SetUpSourcesTask):
             if repository.origin == REPO_ORIGIN_SYSTEM:
                 enable_existing_repository(dnf_manager, repository)
 
-    @staticmethod
-    def _validate_repositories(dnf_manager):
-        """Validate all enabled repositories.
-
-        Collect error messages about invalid repositories.
-        All invalid repositories are disabled.
+    def _load_repositories(self, dnf_manager):
+        """Load and validate all enabled repositories.
 
-        The user repositories are validated when we add them
-        to DNF, so this covers invalid system repositories.
+        Metadata of the enabled repositories are downloaded concurrently.
+        All invalid repositories are disabled. The repositories created
+        from the installation sources are required to be valid. Warnings
+        are reported for other invalid repositories.
 
         :param DNFManager dnf_manager: a configured DNF manager
+        :raise SourceSetupError: if a created repository is invalid
         """
         # Check if there is at least one enabled repository.
-        if not dnf_manager.enabled_repositories:
+        repo_ids = dnf_manager.enabled_repositories
+
+        if not repo_ids:
             raise SourceSetupError(_("No repository is configured."))
 
-        # Load all enabled repositories and report warnings if any.
-        for repo_id in dnf_manager.enabled_repositories:
-            try:
-                dnf_manager.load_repository(repo_id)
-            except MetadataError as e:
-                log.warning(str(e))
+        # Load all enabled repositories.
+        self.report_progress(_("Downloading repository metadata..."))
+        processed = []
+
+        def _report_repository(repo_id, error):
+            processed.append(repo_id)
+
+            if error:
+                msg = _("Failed to download metadata of the '{name}' repository "
+                        "({done}/{total}).")
+            else:
+                msg = _("Downloaded metadata of the '{name}' repository ({done}/{total}).")
+
+            self.report_progress(msg.format(
+                name=repo_id, done=len(processed), total=len(repo_ids)
+            ))
+
+        errors = dnf_manager.load_repositories(repo_ids, _report_repository)
+
+        # Report invalid repositories.
+        for repo_id, error in errors.items():
+            if not error:
+                continue
+
+            if repo_id in self._created_repositories:
+                msg = _("Failed to add the '{name}' repository: {details}")
+                raise SourceSetupError(msg.format(name=repo_id, details=str(error)))
+
+            log.warning(str(error))
 
     @staticmethod
     def _load_metadata(dnf_manager):
@@ -134,12 +134,17 @@ class ResolvePackagesTask(CheckPackagesSelectionTask):
             + collect_platform_requirements(self._dnf_manager) \
             + collect_driver_disk_requirements()
 
-    def _collect_required_specs(self):
-        """Collect specs for the required software."""
-        super()._collect_required_specs()
+    def _collect_additional_specs(self):
+        """Collect specs for the installation requirements.
 
-        # Apply requirements.
-        apply_requirements(self._requirements, self._include_list, self._exclude_list)
+        The selection might be already resolved by the validation,
+        so the requirements are installed on top of it.
+
+        :return: a list of specs for inclusion
+        """
+        include_list = []
+        apply_requirements(self._requirements, include_list, self._exclude_list)
+        return include_list
 
 
 class PrepareDownloadLocationTask(Task):
@@ -220,6 +225,10 @@ class DownloadPackagesTask(Task):
         return "Download packages"
 
     def run(self):
+        if conf.payload.installation_chunk_size:
+            log.info("The packages will be downloaded during the installation.")
+            return
+
         self.report_progress(_("Downloading packages"))
         self._dnf_manager.download_packages(self.report_progress)
 
@@ -245,7 +254,15 @@ class InstallPackagesTask(Task):
         :return: a list of installed kernel versions
         """
         self.report_progress(_("Preparing transaction from installation source"))
-        self._dnf_manager.install_packages(self.report_progress)
+
+        if conf.payload.installation_chunk_size:
+            self._dnf_manager.install_packages_in_chunks(
+                self.report_progress,
+                conf.payload.installation_chunk_size
+            )
+        else:
+            self._dnf_manager.install_packages(self.report_progress)
+
         return get_kernel_version_list()
 
 
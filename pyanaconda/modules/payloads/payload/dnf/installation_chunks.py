@@ -0,0 +1,130 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["split_into_chunks"]
+
+
+def split_into_chunks(packages, get_dependencies, get_size, chunk_size):
+    """Split the packages into dependency-ordered chunks.
+
+    Dependencies of a package are always placed into the same
+    or an earlier chunk. Packages with cyclic dependencies are
+    always placed into the same chunk. The size of a chunk is
+    limited by the chunk size unless the chunk contains only
+    one group of cyclic dependencies.
+
+    :param packages: a list of packages
+    :param get_dependencies: a function that returns dependencies of a package
+    :param get_size: a function that returns a size of a package
+    :param chunk_size: a maximal size of a chunk
+    :return: a list of lists of packages
+    """
+    chunks = []
+    chunk = []
+    size = 0
+
+    for component in _get_ordered_components(packages, get_dependencies):
+        component_size = sum(get_size(p) for p in component)
+
+        if chunk and size + component_size > chunk_size:
+            chunks.append(chunk)
+            chunk = []
+            size = 0
+
+        chunk.extend(component)
+        size += component_size
+
+    if chunk:
+        chunks.append(chunk)
+
+    log.debug("Split %d packages into %d chunks.", len(packages), len(chunks))
+    return chunks
+
+
+def _get_ordered_components(packages, get_dependencies):
+    """Get strongly connected components of the dependency graph.
+
+    The components are found by the Tarjan's algorithm that returns
+    them in the order of dependencies: every component is returned
+    after all components it depends on.
+
+    :param packages: a list of packages
+    :param get_dependencies: a function that returns dependencies of a package
+    :return: a list of lists of packages
+    """
+    positions = {p: i for i, p in enumerate(packages)}
+    indexes = {}
+    low_links = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in packages:
+        if root in indexes:
+            continue
+
+        # Use an explicit stack of iterators to avoid a deep recursion.
+        indexes[root] = low_links[root] = len(indexes)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(get_dependencies(root)))]
+
+        while work:
+            package, dependencies = work[-1]
+            dependency = next(dependencies, None)
+
+            if dependency is not None:
+                if dependency not in positions:
+                    continue
+
+                if dependency not in indexes:
+                    indexes[dependency] = low_links[dependency] = len(indexes)
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+                    work.append((dependency, iter(get_dependencies(dependency))))
+                elif dependency in on_stack:
+                    low_links[package] = min(low_links[package], indexes[dependency])
+
+                continue
+
+            work.pop()
+
+            if work:
+                parent = work[-1][0]
+                low_links[parent] = min(low_links[parent], low_links[package])
+
+            if low_links[package] != indexes[package]:
+                continue
+
+            component = []
+
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+
+                if member == package:
+                    break
+
+            component.sort(key=positions.get)
+            components.append(component)
+
+    return components
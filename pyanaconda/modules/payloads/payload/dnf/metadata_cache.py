@@ -0,0 +1,246 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import shutil
+import tempfile
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.path import join_paths
+
+log = get_module_logger(__name__)
+
+__all__ = ["MetadataCache"]
+
+
+class MetadataCache(object):
+    """The persistent cache of repository metadata.
+
+    The cache keeps metadata of repositories across installations.
+    Every entry is keyed by a hash of the repomd.xml file, so it can
+    be shared by all installations from the same repository snapshot.
+
+    An entry contains the downloaded repodata directory and the solv
+    files generated by DNF from these repodata. The solv files are
+    stored without the repository id, because the same repository
+    can be configured with different ids.
+
+    Only the latest snapshot of every repository is kept. The entry
+    remembers the id of the repository that stored it, and older
+    entries of the same repository id are removed from the cache.
+    """
+
+    REPODATA_DIR = "repodata"
+    REPO_ID_FILE = "repo_id"
+    SOLV_DIR = "solv"
+    SOLV_NAME = "repo"
+
+    # The solv files generated by DNF are named {repo_id}{suffix}.
+    SOLV_SUFFIXES = [
+        ".solv",
+        "-filenames.solvx",
+        "-presto.solvx",
+        "-updateinfo.solvx",
+        "-other.solvx",
+    ]
+
+    def __init__(self, path):
+        """Create a new cache.
+
+        :param str path: a path to the cache directory or an empty string
+        """
+        self._path = path
+
+    @property
+    def enabled(self):
+        """Is the cache enabled?"""
+        return bool(self._path)
+
+    def _get_entry_path(self, md_hash):
+        """Get a path to the entry of the specified hash."""
+        return join_paths(self._path, md_hash.hex())
+
+    def contains(self, md_hash):
+        """Is there an entry for the specified hash?
+
+        :param bytes md_hash: a hash of the repomd.xml file
+        :return: True or False
+        """
+        if not self.enabled or not md_hash:
+            return False
+
+        return os.path.isdir(self._get_entry_path(md_hash))
+
+    def restore(self, repo_id, md_hash, repo_dir, solv_dir):
+        """Restore cached metadata of the specified repository.
+
+        :param str repo_id: an identifier of the repository
+        :param bytes md_hash: a hash of the repomd.xml file
+        :param str repo_dir: a path to the DNF cache directory of the repository
+        :param str solv_dir: a path to the directory with solv files
+        :return: True if the metadata were restored, otherwise False
+        """
+        if not self.contains(md_hash):
+            return False
+
+        entry_path = self._get_entry_path(md_hash)
+
+        try:
+            shutil.copytree(
+                join_paths(entry_path, self.REPODATA_DIR),
+                join_paths(repo_dir, self.REPODATA_DIR),
+                dirs_exist_ok=True
+            )
+
+            os.makedirs(solv_dir, exist_ok=True)
+
+            for suffix in self.SOLV_SUFFIXES:
+                solv_path = join_paths(entry_path, self.SOLV_DIR, self.SOLV_NAME + suffix)
+
+                if not os.path.exists(solv_path):
+                    continue
+
+                shutil.copy2(
+                    solv_path,
+                    join_paths(solv_dir, repo_id + suffix)
+                )
+
+        except OSError as e:
+            log.warning("Failed to restore cached metadata of '%s': %s", repo_id, e)
+            return False
+
+        log.debug("Restored cached metadata of '%s' from %s.", repo_id, entry_path)
+        return True
+
+    def store(self, repo_id, md_hash, repo_dir, solv_dir):
+        """Store metadata of the specified repository.
+
+        The entry is prepared in a temporary directory and renamed
+        at the end, so the cache can be safely shared by multiple
+        installations running at the same time.
+
+        :param str repo_id: an identifier of the repository
+        :param bytes md_hash: a hash of the repomd.xml file
+        :param str repo_dir: a path to the DNF cache directory of the repository
+        :param str solv_dir: a path to the directory with solv files
+        :return: True if the metadata were stored, otherwise False
+        """
+        if not self.enabled or not md_hash:
+            return False
+
+        if self.contains(md_hash):
+            self._prune(repo_id, md_hash)
+            return False
+
+        entry_path = self._get_entry_path(md_hash)
+        temp_path = None
+
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            temp_path = tempfile.mkdtemp(dir=self._path, prefix=".")
+
+            shutil.copytree(
+                join_paths(repo_dir, self.REPODATA_DIR),
+                join_paths(temp_path, self.REPODATA_DIR),
+            )
+
+            with open(join_paths(temp_path, self.REPO_ID_FILE), "w") as f:
+                f.write(repo_id)
+
+            os.mkdir(join_paths(temp_path, self.SOLV_DIR))
+
+            for suffix in self.SOLV_SUFFIXES:
+                solv_path = join_paths(solv_dir, repo_id + suffix)
+
+                if not os.path.exists(solv_path):
+                    continue
+
+                shutil.copy2(
+                    solv_path,
+                    join_paths(temp_path, self.SOLV_DIR, self.SOLV_NAME + suffix)
+                )
+
+            os.rename(temp_path, entry_path)
+
+        except OSError as e:
+            log.warning("Failed to store metadata of '%s' in the cache: %s", repo_id, e)
+
+            if temp_path:
+                shutil.rmtree(temp_path, ignore_errors=True)
+
+            return False
+
+        log.debug("Stored metadata of '%s' in %s.", repo_id, entry_path)
+        self._prune(repo_id, md_hash)
+        return True
+
+    def _prune(self, repo_id, md_hash):
+        """Remove older entries of the specified repository.
+
+        :param str repo_id: an identifier of the repository
+        :param bytes md_hash: a hash of the latest repomd.xml file
+        """
+        try:
+            names = os.listdir(self._path)
+        except OSError as e:
+            log.warning("Failed to prune the metadata cache: %s", e)
+            return
+
+        for name in names:
+            # Skip the latest entry and the temporary directories.
+            if name.startswith(".") or name == md_hash.hex():
+                continue
+
+            entry_path = join_paths(self._path, name)
+
+            if self._get_repo_id(entry_path) != repo_id:
+                continue
+
+            self._remove_entry(entry_path)
+
+    def _get_repo_id(self, entry_path):
+        """Get the id of the repository that stored the entry.
+
+        :param str entry_path: a path to the entry
+        :return: a repo id or None
+        """
+        try:
+            with open(join_paths(entry_path, self.REPO_ID_FILE), "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _remove_entry(self, entry_path):
+        """Remove the specified entry.
+
+        The entry is moved to a temporary directory first, so
+        other installations don't see a partially removed entry.
+
+        :param str entry_path: a path to the entry
+        """
+        temp_path = None
+
+        try:
+            temp_path = tempfile.mkdtemp(dir=self._path, prefix=".")
+            os.rename(entry_path, join_paths(temp_path, os.path.basename(entry_path)))
+        except OSError as e:
+            log.warning("Failed to remove %s from the metadata cache: %s", entry_path, e)
+        else:
+            log.debug("Removed %s from the metadata cache.", entry_path)
+        finally:
+            if temp_path:
+                shutil.rmtree(temp_path, ignore_errors=True)
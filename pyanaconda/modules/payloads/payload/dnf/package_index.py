@@ -0,0 +1,81 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import bisect
+import fnmatch
+
+__all__ = ["PackageNameIndex"]
+
+
+class PackageNameIndex(object):
+    """The index of names of available packages.
+
+    The names are kept in a sorted list, so a pattern with
+    a literal prefix is matched only against the names with
+    the same prefix.
+    """
+
+    GLOB_CHARACTERS = "*?["
+
+    def __init__(self, names):
+        """Create a new index.
+
+        :param names: an iterable of package names
+        """
+        self._names = sorted(set(names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        index = bisect.bisect_left(self._names, name)
+        return index < len(self._names) and self._names[index] == name
+
+    def match(self, pattern):
+        """Find package names that match the specified glob pattern.
+
+        :param str pattern: a glob pattern for package names
+        :return: a sorted list of package names
+        """
+        prefix = self._get_literal_prefix(pattern)
+
+        if prefix == pattern:
+            return [pattern] if pattern in self else []
+
+        return [
+            name for name in self._get_names_with_prefix(prefix)
+            if fnmatch.fnmatchcase(name, pattern)
+        ]
+
+    @classmethod
+    def _get_literal_prefix(cls, pattern):
+        """Get the part of the pattern before the first glob character."""
+        for index, character in enumerate(pattern):
+            if character in cls.GLOB_CHARACTERS:
+                return pattern[:index]
+
+        return pattern
+
+    def _get_names_with_prefix(self, prefix):
+        """Get package names that start with the specified prefix."""
+        start = bisect.bisect_left(self._names, prefix)
+
+        for name in self._names[start:]:
+            if not name.startswith(prefix):
+                break
+
+            yield name
@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import hashlib
+import os
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.path import join_paths, make_directories, clone_file
+
+log = get_module_logger(__name__)
+
+__all__ = ["PackagePool"]
+
+
+class PackagePool(object):
+    """The pool of local packages.
+
+    The pool consists of local read-only directories with RPM files,
+    for example a mounted ISO, an NFS export or a package cache of
+    a previous installation. Packages are indexed by their file names
+    (name-version-release.arch.rpm) and verified by their checksums,
+    so a package from the pool is used only if it has the same content
+    as the package from the repository.
+    """
+
+    def __init__(self, paths):
+        """Create a new pool.
+
+        :param [str] paths: a list of paths to directories with packages
+        """
+        self._paths = paths
+        self._index = None
+
+    @property
+    def enabled(self):
+        """Is the pool enabled?"""
+        return bool(self._paths)
+
+    @property
+    def _packages(self):
+        """The index of the available packages.
+
+        :return: a dictionary of file names and lists of paths
+        """
+        if self._index is None:
+            self._index = self._build_index(self._paths)
+
+        return self._index
+
+    @staticmethod
+    def _build_index(paths):
+        """Find packages in the specified directories.
+
+        :param [str] paths: a list of paths to directories with packages
+        :return: a dictionary of file names and lists of paths
+        """
+        index = {}
+
+        for path in paths:
+            if not os.path.isdir(path):
+                log.warning("The package pool %s doesn't exist.", path)
+                continue
+
+            for root, _dirs, files in os.walk(path):
+                for name in files:
+                    if name.endswith(".rpm"):
+                        index.setdefault(name, []).append(join_paths(root, name))
+
+        log.debug("Found %d packages in the package pools.", len(index))
+        return index
+
+    def find_package(self, file_name, checksum_type, checksum):
+        """Find a package with the specified checksum.
+
+        :param str file_name: a file name of the package
+        :param str checksum_type: a name of the checksum type, for example sha256
+        :param str checksum: a hex digest of the package
+        :return str: a path to the package or None
+        """
+        if not self.enabled:
+            return None
+
+        for path in self._packages.get(file_name, []):
+            if self._calculate_checksum(path, checksum_type) == checksum:
+                return path
+
+            log.debug("The checksum of %s doesn't match.", path)
+
+        return None
+
+    @staticmethod
+    def _calculate_checksum(path, checksum_type):
+        """Calculate the checksum of the specified file.
+
+        :return str: a hex digest or None
+        """
+        try:
+            checksum = hashlib.new(checksum_type)
+
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(1024 * 1024)
+                    if not data:
+                        break
+                    checksum.update(data)
+
+        except (OSError, ValueError) as e:
+            log.debug("Failed to calculate the checksum of %s: %s", path, e)
+            return None
+
+        return checksum.hexdigest()
+
+    def import_package(self, file_name, checksum_type, checksum, target_path):
+        """Import a package from the pool.
+
+        The package is hard linked, reflinked or copied to the target
+        path depending on the capabilities of the file systems.
+
+        :param str file_name: a file name of the package
+        :param str checksum_type: a name of the checksum type, for example sha256
+        :param str checksum: a hex digest of the package
+        :param str target_path: a path to the imported package
+        :return: True if the package was imported, otherwise False
+        """
+        source_path = self.find_package(file_name, checksum_type, checksum)
+
+        if not source_path:
+            return False
+
+        try:
+            make_directories(os.path.dirname(target_path))
+            method = clone_file(source_path, target_path)
+        except OSError as e:
+            log.warning("Failed to import %s from the package pool: %s", source_path, e)
+            return False
+
+        log.debug("Imported %s to %s (%s).", source_path, target_path, method)
+        return True
@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.constants import DNF_MAX_PARALLEL_DOWNLOADS
+
+log = get_module_logger(__name__)
+
+__all__ = ["AdaptiveParallelDownloads"]
+
+# The default number of parallel downloads in DNF.
+DNF_PARALLEL_DOWNLOADS = 3
+
+# How many packages should be downloaded per connection in one batch.
+PACKAGES_PER_DOWNLOAD = 4
+
+# The minimal relative growth of the throughput.
+THROUGHPUT_GROWTH = 0.1
+
+
+class AdaptiveParallelDownloads(object):
+    """The adaptive number of parallel downloads.
+
+    Packages are downloaded in batches. The number of parallel
+    downloads is raised after every batch while the measured
+    throughput keeps growing. Once the throughput stops growing,
+    the last number that improved the throughput is kept. The
+    number is halved after a failed batch.
+    """
+
+    def __init__(self, value=DNF_PARALLEL_DOWNLOADS, maximum=DNF_MAX_PARALLEL_DOWNLOADS):
+        """Create a new instance.
+
+        :param int value: an initial number of parallel downloads
+        :param int maximum: a maximal number of parallel downloads
+        """
+        self._value = min(value, maximum)
+        self._maximum = maximum
+        self._previous = None
+        self._throughput = 0.0
+        self._growing = True
+
+    @property
+    def value(self):
+        """The current number of parallel downloads."""
+        return self._value
+
+    @property
+    def batch_size(self):
+        """The number of packages in the next batch."""
+        return self._value * PACKAGES_PER_DOWNLOAD
+
+    def get_batches(self, packages):
+        """Split the packages into batches.
+
+        The size of every batch is determined by the current
+        number of parallel downloads.
+
+        :param packages: a list of packages
+        :return: a generator of lists of packages
+        """
+        start = 0
+
+        while start < len(packages):
+            end = start + self.batch_size
+            yield packages[start:end]
+            start = end
+
+    def succeeded(self, size, duration):
+        """Update the number after a successful batch.
+
+        :param int size: a number of downloaded bytes
+        :param float duration: a number of seconds
+        """
+        if not size or duration <= 0:
+            return
+
+        throughput = size / duration
+
+        if throughput > self._throughput * (1 + THROUGHPUT_GROWTH):
+            self._throughput = throughput
+            self._raise()
+        elif self._growing:
+            self._stop()
+
+    def _raise(self):
+        """Raise the number if the throughput can still grow."""
+        if not self._growing or self._value >= self._maximum:
+            return
+
+        self._previous = self._value
+        self._value = min(self._value * 2, self._maximum)
+        log.debug("Raising the number of parallel downloads to %d.", self._value)
+
+    def _stop(self):
+        """Return to the last number that improved the throughput."""
+        self._growing = False
+
+        if self._previous is None:
+            return
+
+        self._value = self._previous
+        log.debug("Keeping the number of parallel downloads at %d.", self._value)
+
+    def failed(self):
+        """Update the number after a failed batch.
+
+        :return: True if the number was lowered, otherwise False
+        """
+        self._growing = False
+        self._throughput = 0.0
+
+        if self._value <= 1:
+            return False
+
+        self._value = max(self._value // 2, 1)
+        log.debug("Lowering the number of parallel downloads to %d.", self._value)
+        return True
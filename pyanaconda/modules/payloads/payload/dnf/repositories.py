@@ -30,7 +30,6 @@ from pyanaconda.core.util import execWithRedirect
 from pyanaconda.modules.common.errors.payload import UnknownRepositoryError, SourceSetupError
 from pyanaconda.modules.common.structures.payload import RepoConfigurationData
 from pyanaconda.modules.payloads.constants import SourceType
-from pyanaconda.modules.payloads.payload.dnf.dnf_manager import MetadataError
 from pyanaconda.modules.payloads.source.factory import SourceFactory
 
 log = get_module_logger(__name__)
@@ -209,21 +208,6 @@ def enable_matching_repositories(dnf_manager, patterns, enabled=True):
         dnf_manager.set_repository_enabled(name, enabled)
 
 
-def create_repository(dnf_manager, repository):
-    """Create a new repository and check its validity.
-
-    :param DNFManager dnf_manager: a configured DNF manager
-    :param RepoConfigurationData repository: a resolved repository data
-    """
-    log.debug("Add the '%s' repository (%s).", repository.name, repository)
-    try:
-        dnf_manager.add_repository(repository)
-        dnf_manager.load_repository(repository.name)
-    except MetadataError as e:
-        msg = _("Failed to add the '{name}' repository: {details}")
-        raise SourceSetupError(msg.format(name=repository.name, details=str(e))) from None
-
-
 def enable_existing_repository(dnf_manager, repository):
     """Enable or disable an existing repository.
 
@@ -17,7 +17,30 @@
 #
 from pyanaconda.modules.common.task import Task
 
-__all__ = ["ResetDNFManagerTask"]
+__all__ = ["CompactDNFManagerTask", "ResetDNFManagerTask"]
+
+
+class CompactDNFManagerTask(Task):
+    """The task for releasing memory of the DNF manager."""
+
+    def __init__(self, dnf_manager):
+        """Create a new task.
+
+        :param dnf_manager: a DNF manager
+        """
+        super().__init__()
+        self._dnf_manager = dnf_manager
+
+    @property
+    def name(self):
+        return "Compact the DNF manager"
+
+    def run(self):
+        """Run the task.
+
+        Release the package data that are not needed after the installation.
+        """
+        self._dnf_manager.compact()
 
 
 class ResetDNFManagerTask(Task):
@@ -0,0 +1,90 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["TimingReport", "DNF_TIMING_REPORT"]
+
+# The report is copied to /var/log/anaconda on the installed system.
+DNF_TIMING_REPORT = "/tmp/dnf.timing.jsonl"
+
+
+class TimingReport(object):
+    """The report of timings of the package installation.
+
+    Every record of the report describes one event, for example
+    a download of a package, an installation of a package or
+    a run of a scriptlet. The records are appended to the report
+    file in the JSON lines format.
+    """
+
+    def __init__(self, path=DNF_TIMING_REPORT):
+        """Create a new report.
+
+        :param str path: a path to the report file
+        """
+        self._path = path
+        self._records = []
+
+    @property
+    def records(self):
+        """Records that haven't been written yet.
+
+        :return: a list of dictionaries
+        """
+        return self._records
+
+    def add(self, event, duration, **data):
+        """Add a new record.
+
+        :param str event: a type of the event
+        :param float duration: a duration of the event in seconds
+        :param data: additional data about the event
+        """
+        record = {"event": event, "duration": round(duration, 3)}
+        record.update(data)
+        self._records.append(record)
+
+    def get_slowest(self, event, count):
+        """Get the slowest records of the specified event.
+
+        :param str event: a type of the event
+        :param int count: a maximal number of records
+        :return: a list of records sorted by their duration
+        """
+        records = [r for r in self._records if r["event"] == event]
+        return sorted(records, key=lambda r: r["duration"], reverse=True)[:count]
+
+    def write(self):
+        """Append the records to the report file."""
+        if not self._records:
+            return
+
+        try:
+            with open(self._path, "a") as f:
+                for record in self._records:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            log.warning("Failed to write the timing report to %s: %s", self._path, e)
+            return
+
+        log.debug("Written %d records to %s.", len(self._records), self._path)
+        self._records = []
@@ -15,6 +15,9 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import threading
+import time
+
 import dnf.transaction
 import dnf.callback
 
@@ -26,62 +29,167 @@ log = get_module_logger(__name__)
 
 __all__ = ["process_transaction_progress", "TransactionProgress"]
 
+# The time slice of one frame of the transaction progress in seconds.
+TRANSACTION_PROGRESS_INTERVAL = 0.5
+
+# The number of the slowest scriptlets to log.
+TRANSACTION_SLOWEST_SCRIPTLETS = 10
 
-def process_transaction_progress(queue, callback):
+
+def process_transaction_progress(connection, callback):
     """Process the transaction progress.
 
+    The progress is received in frames. Every frame is a list of
+    (token, message) tuples collected during one time slice. Log
+    messages of the frame are logged at once and only the latest
+    progress message of the frame is reported.
+
     When the installation works correctly it will end by 'quit' token.
 
-    :param queue: a process shared queue
+    :param connection: a receiving end of a pipe
+    :param callback: a callback for progress reporting
+    :raise PayloadInstallationError: if the transaction fails
+    """
+    while True:
+        try:
+            frame = connection.recv()
+        except EOFError:
+            raise PayloadInstallationError(
+                "An error occurred during the transaction: "
+                "The transaction process has ended unexpectedly."
+            ) from None
+
+        if not _process_transaction_frame(frame, callback):
+            break  # Installation finished successfully
+
+
+def _process_transaction_frame(frame, callback):
+    """Process one frame of the transaction progress.
+
+    :param frame: a list of (token, message) tuples
     :param callback: a callback for progress reporting
+    :return: False if the transaction has finished, otherwise True
     :raise PayloadInstallationError: if the transaction fails
     """
-    (token, msg) = queue.get()
+    messages = []
+    progress = None
+    running = True
 
-    while token:
+    for token, msg in frame:
         if token == 'install':
-            callback(_("Installing {}").format(msg))
+            progress = _("Installing {}").format(msg)
         elif token == 'configure':
-            callback(_("Configuring {}").format(msg))
+            progress = _("Configuring {}").format(msg)
         elif token == 'log':
-            log.info(msg)
+            messages.append(msg)
         elif token == 'post':
-            callback(_("Performing post-installation setup tasks"))
+            progress = _("Performing post-installation setup tasks")
         elif token == 'quit':
-            log.info(msg)
-            break  # Installation finished successfully
+            messages.append(msg)
+            running = False
+            break
         elif token == 'error':
+            _log_transaction_messages(messages)
             log.error(msg)
             raise PayloadInstallationError("An error occurred during the transaction: " + msg)
 
-        (token, msg) = queue.get()
+    _log_transaction_messages(messages)
+
+    if progress:
+        callback(progress)
+
+    return running
+
+
+def _log_transaction_messages(messages):
+    """Log the specified messages at once.
+
+    :param messages: a list of messages
+    """
+    if messages:
+        log.info("\n".join(messages))
 
 
 class TransactionProgress(dnf.callback.TransactionProgress):
-    """The class for receiving information about an ongoing transaction."""
+    """The class for receiving information about an ongoing transaction.
+
+    Messages are not sent one by one. They are collected into frames
+    that are sent at most once per time slice. Errors and the end of
+    the transaction are sent immediately.
+    """
 
-    def __init__(self, queue):
+    def __init__(self, connection, report=None):
         """Create a new instance.
 
-        :param queue: a process shared queue
+        :param connection: a sending end of a pipe
+        :param report: a timing report or None
         """
         super().__init__()
-        self._queue = queue
+        self._connection = connection
+        self._report = report
+        self._start_time = None
+        self._post_time = None
+        self._installation = None
+        self._scriptlet = None
+        self._interval = TRANSACTION_PROGRESS_INTERVAL
+        self._lock = threading.Lock()
+        self._frame = []
+        self._timer = None
         self._last_ts = None
         self._postinst_phase = False
         self.cnt = 0
 
-    def progress(self, package, action, ti_done, _ti_total, ts_done, ts_total):
+    def _put(self, token, msg):
+        """Add a message to the current frame.
+
+        The frame is sent when its time slice ends.
+
+        :param token: a type of the message
+        :param msg: a content of the message
+        """
+        with self._lock:
+            self._frame.append((token, msg))
+
+            if self._interval <= 0:
+                self._send_frame()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._interval, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self):
+        """Send the current frame."""
+        with self._lock:
+            self._send_frame()
+
+    def _send_frame(self):
+        """Send the current frame if it isn't empty.
+
+        The caller has to hold the lock.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._frame:
+            return
+
+        frame, self._frame = self._frame, []
+        self._connection.send(frame)
+
+    def progress(self, package, action, ti_done, ti_total, ts_done, ts_total):
         """Report ongoing progress on the given transaction item.
 
         :param package: the DNF package object
         :param action: the ID of the current action
         :param ti_done: the number of processed bytes of the transaction item
-        :param _ti_total: the total number of bytes of the transaction item
+        :param ti_total: the total number of bytes of the transaction item
         :param ts_done: the number of actions processed in the whole transaction
         :param ts_total: the total number of actions in the whole transaction
         """
-        # Process DNF actions, communicating with anaconda via the queue
+        self._record_timings(package, action, ti_done, ti_total)
+
+        # Process DNF actions, communicating with anaconda via the pipe.
         # A normal installation consists of 'install' messages followed by
         # the 'post' message.
         if action == dnf.transaction.PKG_INSTALL and ti_done == 0:
@@ -93,17 +201,17 @@ class TransactionProgress(dnf.callback.TransactionProgress):
             msg = '%s.%s (%d/%d)' % \
                 (package.name, package.arch, ts_done, ts_total)
             self.cnt += 1
-            self._queue.put(('install', msg))
+            self._put('install', msg)
 
             # Log the exact package nevra, build time and checksum
             nevra = "%s-%s.%s" % (package.name, package.evr, package.arch)
             log_msg = "Installed: %s %s %s" % (nevra, package.buildtime, package.returnIdSum()[1])
-            self._queue.put(('log', log_msg))
+            self._put('log', log_msg)
 
         elif action == dnf.transaction.TRANS_POST:
-            self._queue.put(('post', None))
+            self._put('post', None)
             log_msg = "Post installation setup phase started."
-            self._queue.put(('log', log_msg))
+            self._put('log', log_msg)
             self._postinst_phase = True
 
         elif action == dnf.transaction.PKG_SCRIPTLET:
@@ -111,24 +219,113 @@ class TransactionProgress(dnf.callback.TransactionProgress):
             nevra = "%s-%s.%s" % (package.name, package.evr, package.arch)
             log_msg = "Configuring (running scriptlet for): %s %s %s" % (nevra, package.buildtime,
                                                                          package.returnIdSum()[1])
-            self._queue.put(('log', log_msg))
+            self._put('log', log_msg)
 
             # only show progress in UI for post-installation scriptlets
             if self._postinst_phase:
                 msg = '%s.%s' % (package.name, package.arch)
-                self._queue.put(('configure', msg))
+                self._put('configure', msg)
+
+    def _record_timings(self, package, action, ti_done, ti_total):
+        """Record timings of the transaction.
+
+        RPM reports only the start of a scriptlet, so the scriptlet
+        ends with the next event of the transaction.
+
+        :param package: the DNF package object
+        :param action: the ID of the current action
+        :param ti_done: the number of processed bytes of the transaction item
+        :param ti_total: the total number of bytes of the transaction item
+        """
+        if self._report is None:
+            return
+
+        now = time.monotonic()
+
+        if self._start_time is None:
+            self._start_time = now
+
+        # The running scriptlet has ended.
+        self._end_scriptlet(now)
+
+        if action == dnf.transaction.PKG_INSTALL:
+            nevra = str(package)
+
+            if ti_done == 0:
+                if not self._installation or self._installation[0] != nevra:
+                    self._installation = (nevra, now)
+
+            elif ti_done == ti_total and self._installation:
+                name, start = self._installation
+
+                if name == nevra:
+                    self._report.add("install", duration=now - start, package=nevra)
+                    self._installation = None
+
+        elif action == dnf.transaction.TRANS_POST:
+            self._post_time = now
+
+        elif action == dnf.transaction.PKG_SCRIPTLET:
+            phase = "post" if self._postinst_phase else "install"
+            self._scriptlet = (str(package), phase, now)
+
+    def _end_scriptlet(self, now):
+        """Record the end of the running scriptlet."""
+        if not self._scriptlet:
+            return
+
+        nevra, phase, start = self._scriptlet
+        self._scriptlet = None
+
+        self._report.add("scriptlet", duration=now - start, package=nevra, phase=phase)
+
+    def _write_timings(self):
+        """Write the timing report and log its summary."""
+        if self._report is None or self._start_time is None:
+            return
+
+        now = time.monotonic()
+        self._end_scriptlet(now)
+
+        if self._post_time is not None:
+            self._report.add("post", duration=now - self._post_time)
+
+        self._report.add("transaction", duration=now - self._start_time)
+
+        lines = [
+            "The transaction took {:.2f}s.".format(now - self._start_time),
+            "The slowest scriptlets:",
+        ]
+
+        for record in self._report.get_slowest("scriptlet", TRANSACTION_SLOWEST_SCRIPTLETS):
+            lines.append("  {} {:.2f}s ({})".format(
+                record["package"], record["duration"], record["phase"]
+            ))
+
+        self._put('log', "\n".join(lines))
+        self._report.write()
+
+    def log(self, message):
+        """Log a message of the transaction process.
+
+        :param message: a string to log
+        """
+        self._put('log', message)
 
     def error(self, message):
         """Report an error that occurred during the transaction.
 
         :param message: a string that describes the error
         """
-        self._queue.put(('error', message))
+        self._put('error', message)
+        self._flush()
 
     def quit(self, message):
-        """Report the end of the transaction and close the queue.
+        """Report the end of the transaction and close the pipe.
 
         :param message: the reason why the transaction ended
         """
-        self._queue.put(('quit', message))
-        self._queue.close()
+        self._write_timings()
+        self._put('quit', message)
+        self._flush()
+        self._connection.close()
@@ -0,0 +1,293 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import resource
+import traceback
+from collections import namedtuple
+
+import dnf
+import dnf.repo
+import dnf.transaction
+import libdnf.transaction
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.modules.payloads.payload.dnf.timing_report import TimingReport
+from pyanaconda.modules.payloads.payload.dnf.transaction_progress import TransactionProgress
+from pyanaconda.modules.payloads.payload.dnf.utils import transaction_has_errors
+
+log = get_module_logger(__name__)
+
+__all__ = [
+    "TransactionDescription",
+    "RepositoryDescription",
+    "get_package_key",
+    "find_packages",
+    "describe_transaction",
+    "run_transaction_worker",
+    "get_peak_memory_message",
+]
+
+# Options of the DNF configuration that affect the transaction.
+TRANSACTION_OPTIONS = [
+    "installroot",
+    "persistdir",
+    "cachedir",
+    "logdir",
+    "reposdir",
+    "releasever",
+    "module_platform_id",
+    "multilib_policy",
+    "install_weak_deps",
+    "installonlypkgs",
+    "installonly_limit",
+    "tsflags",
+    "gpgcheck",
+    "skip_if_unavailable",
+]
+
+# Reasons of packages that were pulled in by other packages.
+DEPENDENCY_REASONS = (
+    libdnf.transaction.TransactionItemReason_DEPENDENCY,
+    libdnf.transaction.TransactionItemReason_WEAK_DEPENDENCY,
+)
+
+# The description of a DNF transaction.
+TransactionDescription = namedtuple(
+    "TransactionDescription", [
+        "options",
+        "substitutions",
+        "repositories",
+        "load_system_repo",
+        "packages",
+        "dependencies",
+    ]
+)
+
+# The description of a DNF repository.
+RepositoryDescription = namedtuple(
+    "RepositoryDescription", [
+        "id",
+        "baseurl",
+        "mirrorlist",
+        "metalink",
+        "pkgdir",
+    ]
+)
+
+
+def get_package_key(package):
+    """Get a key that identifies the package in any sack."""
+    return (
+        package.name,
+        package.epoch,
+        package.version,
+        package.release,
+        package.arch,
+        package.reponame,
+    )
+
+
+def describe_transaction(base):
+    """Describe the resolved transaction of the DNF base.
+
+    The description can be sent to another process and used
+    to create a minimal DNF base with the same transaction.
+    Only transactions that install packages are supported.
+    Transactions with changes of modules are not supported.
+
+    :param base: a DNF base with a resolved transaction
+    :return: an instance of TransactionDescription or None
+    """
+    if base._moduleContainer.isChanged():  # pylint: disable=protected-access
+        log.debug("The transaction changes modules.")
+        return None
+
+    packages = []
+    dependencies = []
+
+    for tsi in base.transaction:
+        if tsi.action != dnf.transaction.PKG_INSTALL:
+            log.debug("The transaction doesn't only install packages.")
+            return None
+
+        if tsi.reason in DEPENDENCY_REASONS:
+            dependencies.append(get_package_key(tsi.pkg))
+        else:
+            packages.append(get_package_key(tsi.pkg))
+
+    repositories = [
+        RepositoryDescription(
+            id=repo.id,
+            baseurl=list(repo.baseurl),
+            mirrorlist=repo.mirrorlist,
+            metalink=repo.metalink,
+            pkgdir=repo.pkgdir,
+        )
+        for repo in base.repos.iter_enabled()
+    ]
+
+    return TransactionDescription(
+        options={name: getattr(base.conf, name) for name in TRANSACTION_OPTIONS},
+        substitutions=dict(base.conf.substitutions),
+        repositories=repositories,
+        load_system_repo=bool(base.sack.query().installed()),
+        packages=packages,
+        dependencies=dependencies,
+    )
+
+
+def run_transaction_worker(description, connection):
+    """Run the described DNF transaction.
+
+    This is the entry point of the transaction process started
+    with the spawn or forkserver method. The process doesn't share
+    anything with the payload module except for the pipe.
+
+    :param TransactionDescription description: a description of the transaction
+    :param connection: a sending end of a pipe
+    """
+    display = TransactionProgress(connection, TimingReport())
+    base = None
+
+    try:
+        base = _create_base(description)
+        _resolve_transaction(base, description)
+        base.do_transaction(display)
+
+        if transaction_has_errors(base.transaction):
+            display.error("The transaction process has ended with errors.")
+    except BaseException as e:  # pylint: disable=broad-except
+        display.error("The transaction process has ended abruptly: {}\n{}".format(
+            str(e), traceback.format_exc()))
+    finally:
+        if base:
+            base.close()
+
+        display.log(get_peak_memory_message())
+        display.quit("DNF quit")
+
+
+def _create_base(description):
+    """Create a minimal DNF base for the described transaction.
+
+    The metadata of the repositories are loaded from the cache.
+
+    :param TransactionDescription description: a description of the transaction
+    :return: a DNF base with a filled sack
+    """
+    base = dnf.Base()
+
+    for name, value in description.options.items():
+        setattr(base.conf, name, value)
+
+    base.conf.substitutions.update(description.substitutions)
+
+    for data in description.repositories:
+        repo = dnf.repo.Repo(data.id, base.conf)
+        repo.baseurl = data.baseurl
+        repo.mirrorlist = data.mirrorlist
+        repo.metalink = data.metalink
+        repo.pkgdir = data.pkgdir
+
+        # Don't download the metadata again.
+        repo._repo.setSyncStrategy(dnf.repo.SYNC_TRY_CACHE)  # pylint: disable=protected-access
+        base.repos.add(repo)
+
+    base.fill_sack(
+        load_system_repo=description.load_system_repo,
+        load_available_repos=True,
+    )
+
+    return base
+
+
+def find_packages(base, keys, strict=False):
+    """Find available packages with the specified keys.
+
+    :param base: a DNF base
+    :param keys: a list of package keys
+    :param strict: raise an error if some packages are missing
+    :return: a list of DNF packages
+    :raise RuntimeError: if some packages are missing in the strict mode
+    """
+    query = base.sack.query().available()
+    packages = []
+    missing = []
+
+    for name, epoch, version, release, arch, reponame in keys:
+        found = query.filter(
+            name=name,
+            epoch=epoch,
+            version=version,
+            release=release,
+            arch=arch,
+            reponame=reponame,
+        )
+
+        if not found:
+            missing.append("{}-{}:{}-{}.{} ({})".format(
+                name, epoch, version, release, arch, reponame
+            ))
+
+        packages.extend(found)
+
+    if strict and missing:
+        raise RuntimeError(
+            "Some packages are not available: {}".format(", ".join(sorted(missing)))
+        )
+
+    return packages
+
+
+def _resolve_transaction(base, description):
+    """Resolve the described transaction.
+
+    All packages that are not part of the transaction are excluded,
+    so the dependencies are resolved the same way as before.
+
+    :param base: a DNF base with a filled sack
+    :param TransactionDescription description: a description of the transaction
+    :raise RuntimeError: if the transaction cannot be recreated
+    """
+    expected = set(description.packages) | set(description.dependencies)
+    included = find_packages(base, expected, strict=True)
+
+    query = base.sack.query().available()
+    base.sack.add_excludes(query.difference(query.filter(pkg=included)))
+
+    for package in find_packages(base, description.packages):
+        base.package_install(package, strict=True)
+
+    base.resolve()
+    resolved = {get_package_key(p) for p in base.transaction.install_set}
+
+    if resolved != expected:
+        raise RuntimeError(
+            "The transaction doesn't match its description: "
+            "{} missing, {} unexpected packages.".format(
+                len(expected - resolved), len(resolved - expected)
+            )
+        )
+
+
+def get_peak_memory_message():
+    """Get a message about the peak memory usage of this process.
+
+    :return: a string
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return "The peak memory usage of the transaction process was {:.1f} MiB.".format(rss / 1024)
@@ -17,9 +17,12 @@
 #
 import configparser
 import copy
+import hashlib
 import os
+import threading
 import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from functools import partial
 from productmd.treeinfo import TreeInfo
@@ -41,6 +44,7 @@ __all__ = [
     "TreeInfoMetadataError",
     "NoTreeInfoError",
     "InvalidTreeInfoError",
+    "TreeInfoCache",
     "TreeInfoMetadata",
     "LoadTreeInfoMetadataResult",
     "LoadTreeInfoMetadataTask",
@@ -83,6 +87,86 @@ class InvalidTreeInfoError(TreeInfoMetadataError):
     pass
 
 
+class TreeInfoCache(object):
+    """The cache of treeinfo metadata.
+
+    The cache keeps parsed treeinfo metadata for the whole session,
+    so the metadata don't have to be processed again every time the
+    installation source is set up. The metadata are identified by
+    the URL of the installation root and the hash of the treeinfo
+    file, so a modified file is always processed again.
+
+    The cache also remembers remote installation roots without any
+    treeinfo file, so they are not probed again with the same download
+    options. Other options, for example a fixed proxy, might help.
+    """
+
+    def __init__(self):
+        """Create a new cache."""
+        self._lock = threading.Lock()
+        self._metadata = {}
+        self._missing = set()
+
+    @staticmethod
+    def _get_key(root_url, content):
+        """Get a key of the specified metadata."""
+        return root_url, hashlib.sha256(content.encode("utf-8", "backslashreplace")).digest()
+
+    def get_metadata(self, root_url, content):
+        """Get parsed metadata of the specified treeinfo file.
+
+        :param str root_url: a URL of the installation root
+        :param str content: a content of the treeinfo file
+        :return: a tuple of a release version and a list of repositories or None
+        """
+        with self._lock:
+            return self._metadata.get(self._get_key(root_url, content))
+
+    def add_metadata(self, root_url, content, release_version, repositories):
+        """Add parsed metadata of the specified treeinfo file.
+
+        :param str root_url: a URL of the installation root
+        :param str content: a content of the treeinfo file
+        :param str release_version: a release version
+        :param repositories: a list of TreeInfoRepoMetadata instances
+        """
+        with self._lock:
+            key = self._get_key(root_url, content)
+            self._metadata[key] = (release_version, list(repositories))
+            self._missing = {k for k in self._missing if k[0] != root_url}
+
+    def is_missing(self, root_url, options):
+        """Is there no treeinfo file in the specified installation root?
+
+        :param str root_url: a URL of the installation root
+        :param tuple options: download options of the installation root
+        :return: True or False
+        """
+        with self._lock:
+            return (root_url, options) in self._missing
+
+    def add_missing(self, root_url, options):
+        """Remember that the specified installation root has no treeinfo file.
+
+        Local installation roots are ignored, because the same mount
+        point can be used for different installation sources.
+
+        :param str root_url: a URL of the installation root
+        :param tuple options: download options of the installation root
+        """
+        if root_url.startswith("file://"):
+            return
+
+        with self._lock:
+            self._missing.add((root_url, options))
+
+    def clear(self):
+        """Clear the cache."""
+        with self._lock:
+            self._metadata.clear()
+            self._missing.clear()
+
+
 class TreeInfoMetadata(object):
     """The representation of a .treeinfo file.
 
@@ -117,6 +201,9 @@ class TreeInfoMetadata(object):
     # The number of download retries.
     MAX_TREEINFO_DOWNLOAD_RETRIES = 6
 
+    # The cache of treeinfo metadata shared by all instances.
+    _cache = TreeInfoCache()
+
     def __init__(self):
         """Create a new instance."""
         self._release_version = ""
@@ -231,12 +318,23 @@ class TreeInfoMetadata(object):
         if not data.url:
             raise NoTreeInfoError("No URL specified.")
 
+        downloader = self._get_downloader(data)
+
+        if self._cache.is_missing(data.url, self._get_download_options(downloader)):
+            raise NoTreeInfoError("No treeinfo metadata found (cached).")
+
         # Download the metadata.
         log.debug("Load treeinfo metadata for '%s'.", data.url)
+        content = self._download_metadata(downloader, data.url)
 
-        with requests_session() as session:
-            downloader = self._get_downloader(session, data)
-            content = self._download_metadata(downloader, data.url)
+        # Use the processed metadata if possible.
+        cached_metadata = self._cache.get_metadata(data.url, content)
+
+        if cached_metadata:
+            log.debug("Use cached treeinfo metadata of '%s'.", data.url)
+            self._release_version, repositories = cached_metadata
+            self._repositories = list(repositories)
+            return
 
         # Process the metadata.
         self._load_tree_info(
@@ -244,8 +342,15 @@ class TreeInfoMetadata(object):
             file_content=content
         )
 
-    def _get_downloader(self, session, data):
-        """Get a configured session.get method.
+        self._cache.add_metadata(
+            root_url=data.url,
+            content=content,
+            release_version=self._release_version,
+            repositories=self._repositories,
+        )
+
+    def _get_downloader(self, data):
+        """Get a configured download function.
 
         :return: a partial function
         """
@@ -284,7 +389,7 @@ class TreeInfoMetadata(object):
 
         # Return a partial function.
         return partial(
-            session.get,
+            self._download_file,
             headers=headers,
             proxies=proxies,
             verify=ssl_verify,
@@ -292,8 +397,39 @@ class TreeInfoMetadata(object):
             timeout=NETWORK_CONNECTION_TIMEOUT
         )
 
+    @staticmethod
+    def _get_download_options(downloader):
+        """Get download options that can affect the result of the download.
+
+        :param downloader: a configured download function
+        :return: a hashable tuple of options
+        """
+        options = downloader.keywords
+        return tuple(sorted(options["proxies"].items())), options["verify"], options["cert"]
+
+    @staticmethod
+    def _download_file(url, **kwargs):
+        """Download a file.
+
+        The requests sessions are not thread-safe, so every
+        download uses its own session.
+
+        :param str url: a URL of the file
+        :param kwargs: arguments of the session.get method
+        :return str: a content of the file
+        """
+        with requests_session() as session:
+            with session.get(url, **kwargs) as r:
+                r.raise_for_status()
+                return r.text
+
     def _download_metadata(self, downloader, url):
-        """Download metadata from the given URL."""
+        """Download metadata from the given URL.
+
+        All supported names of the treeinfo file are probed at once,
+        but the results are used in the order of the names, so the
+        first name that can be downloaded is always preferred.
+        """
         # How many times should we try the download?
         retry_max = self.MAX_TREEINFO_DOWNLOAD_RETRIES
 
@@ -312,25 +448,44 @@ class TreeInfoMetadata(object):
                 time.sleep(next(xdelay))
 
             # Download the metadata file.
-            for name in self.TREE_INFO_NAMES:
-                file_url = "{}/{}".format(url, name)
+            names = [n for n in self.TREE_INFO_NAMES if n not in not_found]
+            content = self._probe_metadata(downloader, url, names, not_found)
 
-                try:
-                    with downloader(file_url) as r:
-                        if r.status_code == 404:
-                            not_found.add(name)
+            if content is not None:
+                return content
+
+            if not_found == set(self.TREE_INFO_NAMES):
+                self._cache.add_missing(url, self._get_download_options(downloader))
+                raise NoTreeInfoError("No treeinfo metadata found (404).")
 
-                        r.raise_for_status()
-                        return r.text
+        raise NoTreeInfoError("Couldn't download treeinfo metadata.")
+
+    def _probe_metadata(self, downloader, url, names, not_found):
+        """Download the first available metadata file.
+
+        :param downloader: a configured download function
+        :param str url: a URL of the installation root
+        :param [str] names: names of the files to download
+        :param set not_found: names of the files that returned HTTP 404 code
+        :return str: a content of the downloaded file or None
+        """
+        executor = ThreadPoolExecutor(len(names), thread_name_prefix="AnaTreeInfo")
 
+        try:
+            futures = [executor.submit(downloader, "{}/{}".format(url, n)) for n in names]
+
+            for name, future in zip(names, futures):
+                try:
+                    return future.result()
                 except RequestException as e:
                     log.debug("Failed to download '%s': %s", name, e)
-                    continue
 
-            if not_found == set(self.TREE_INFO_NAMES):
-                raise NoTreeInfoError("No treeinfo metadata found (404).")
+                    if e.response is not None and e.response.status_code == 404:
+                        not_found.add(name)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        raise NoTreeInfoError("Couldn't download treeinfo metadata.")
+        return None
 
     def verify_image_base_repo(self):
         """Verify the base repository of an ISO image.
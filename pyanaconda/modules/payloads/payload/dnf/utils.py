@@ -15,7 +15,10 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import ctypes
+import ctypes.util
 import fnmatch
+import gc
 import hashlib
 import os
 import rpm
@@ -301,6 +304,12 @@ def pick_download_location(dnf_manager):
     install_size = dnf_manager.get_installation_size()
     mount_points = get_free_space_map()
 
+    # There are at most two chunks of packages at the same time.
+    if conf.payload.installation_chunk_size:
+        download_size = dnf_manager.get_chunked_download_size(
+            conf.payload.installation_chunk_size
+        )
+
     # Try to find mount points that are sufficient for download and install.
     sufficient = _pick_mount_points(
         mount_points,
@@ -414,6 +423,36 @@ def protect_installation_devices(previous_devices, current_devices):
     disk_selection_proxy.ProtectedDevices = protected_devices
 
 
+def get_memory_usage():
+    """Get the current memory usage of this process.
+
+    :return: a resident set size as an instance of Size or None
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError) as e:
+        log.debug("Failed to get the memory usage: %s", e)
+        return None
+
+    return Size(pages * os.sysconf("SC_PAGE_SIZE"))
+
+
+def release_memory():
+    """Release the unused memory of this process.
+
+    Run the garbage collector and return the freed memory
+    of the C heap to the system if possible.
+    """
+    gc.collect()
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        libc.malloc_trim(0)
+    except (OSError, AttributeError) as e:
+        log.debug("Failed to trim the memory: %s", e)
+
+
 def transaction_has_errors(transaction):
     """Detect if finished DNF transaction has any errors.
 
@@ -86,15 +86,39 @@ class CheckPackagesSelectionTask(ValidationTask):
 
         :return: a validation report
         """
-        # Clear the previous selection.
-        self._clear_selection()
-
         # Prepare the new selection.
         self._collect_selected_specs()
         self._collect_required_specs()
 
-        # Resolve the new selection.
-        return self._resolve_selection()
+        # Reuse the resolved selection if nothing has changed.
+        key = self._get_selection_key()
+        additional_list = self._collect_additional_specs()
+
+        if self._dnf_manager.resolved_selection != key:
+            # Clear the previous selection.
+            self._clear_selection()
+
+            # Resolve the new selection.
+            self._include_list.extend(additional_list)
+            report = self._resolve_selection()
+        elif additional_list:
+            # Extend the resolved selection.
+            self._dnf_manager.set_resolved_selection(None)
+            self._include_list.extend(additional_list)
+            report = self._resolve_additional_specs(additional_list)
+        else:
+            log.debug("The software selection is already resolved.")
+            return ValidationReport()
+
+        if report.get_messages():
+            return report
+
+        # Remember the resolved selection with the additional specs.
+        if additional_list:
+            key = self._get_selection_key()
+
+        self._dnf_manager.set_resolved_selection(key)
+        return report
 
     def _clear_selection(self):
         """Clear the previous selection."""
@@ -125,6 +149,25 @@ class CheckPackagesSelectionTask(ValidationTask):
         if kernel_package:
             self._include_list.append(kernel_package)
 
+    def _collect_additional_specs(self):
+        """Collect specs to install on top of the selection.
+
+        These specs are not part of the key of the selection, so
+        they can be added to an already resolved selection.
+
+        :return: a list of specs for inclusion
+        """
+        return []
+
+    def _get_selection_key(self):
+        """Get a key of the new selection."""
+        return self._dnf_manager.get_selection_key(
+            include_list=self._include_list,
+            exclude_list=self._exclude_list,
+            enabled_modules=self._selection.modules,
+            disabled_modules=self._selection.disabled_modules,
+        )
+
     def _resolve_selection(self):
         """Resolve the new selection."""
         log.debug("Resolving the software selection.")
@@ -145,6 +188,20 @@ class CheckPackagesSelectionTask(ValidationTask):
         log.debug("Resolving has been completed: %s", report)
         return report
 
+    def _resolve_additional_specs(self, include_list):
+        """Resolve the selection with additional specs."""
+        log.debug("Resolving the software selection with additional specs.")
+        report = ValidationReport()
+
+        with self._reported_errors(report):
+            self._dnf_manager.apply_specs(include_list, self._exclude_list)
+
+        with self._reported_errors(report):
+            self._dnf_manager.resolve_selection()
+
+        log.debug("Resolving has been completed: %s", report)
+        return report
+
     @contextmanager
     def _reported_errors(self, report):
         """Add exceptions into the validation report.
@@ -0,0 +1,300 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import glob
+import os
+import re
+import shutil
+from collections import namedtuple
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.path import join_paths, make_directories
+from pyanaconda.core.util import execWithRedirect
+from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+
+log = get_module_logger(__name__)
+
+__all__ = ["BlockDeployment", "MountInfo", "get_mount_info", "find_mount", "get_backing_file",
+           "get_subtree_patterns", "SUPPORTED_FILESYSTEMS"]
+
+# File systems that can be deployed at the block level.
+SUPPORTED_FILESYSTEMS = ("ext4", "xfs")
+
+# An entry of the mount table.
+MountInfo = namedtuple(
+    "MountInfo", [
+        "mount_id",
+        "parent_id",
+        "root",
+        "mount_point",
+        "fstype",
+        "source",
+    ]
+)
+
+
+def _unescape(value):
+    """Unescape a field of the mount table."""
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), value)
+
+
+def get_mount_info():
+    """Get the mount table of the current process.
+
+    :return: a list of MountInfo
+    """
+    mounts = []
+
+    with open("/proc/self/mountinfo", "r") as f:
+        for line in f:
+            fields = line.split()
+            separator = fields.index("-")
+
+            mounts.append(MountInfo(
+                mount_id=int(fields[0]),
+                parent_id=int(fields[1]),
+                root=_unescape(fields[3]),
+                mount_point=_unescape(fields[4]),
+                fstype=fields[separator + 1],
+                source=_unescape(fields[separator + 2]),
+            ))
+
+    return mounts
+
+
+def find_mount(mounts, path):
+    """Find the top-most mount at the specified path.
+
+    :param mounts: a list of MountInfo
+    :param str path: a path to the mount point
+    :return: an instance of MountInfo or None
+    """
+    path = os.path.normpath(path)
+    found = None
+
+    for mount in mounts:
+        if mount.mount_point == path:
+            found = mount
+
+    return found
+
+
+def get_backing_file(device):
+    """Get a backing file of the specified loop device.
+
+    :param str device: a path to the device
+    :return: a path to the backing file or None
+    """
+    name = os.path.basename(device)
+
+    if not name.startswith("loop"):
+        return None
+
+    try:
+        with open("/sys/block/{}/loop/backing_file".format(name), "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def get_subtree_patterns(patterns, path):
+    """Get exclude patterns relative to the specified subtree.
+
+    :param [str] patterns: exclude patterns relative to the root
+    :param str path: a path to the subtree
+    :return: a list of exclude patterns relative to the subtree
+    """
+    prefix = path.rstrip("/") + "/"
+    return ["/" + p[len(prefix):] for p in patterns if p.startswith(prefix)]
+
+
+class BlockDeployment(object):
+    """Deploy a file system image at the block level.
+
+    Only the allocated blocks of the image are written to the target
+    device by e2image or xfs_copy. The file system is then resized
+    to fill the device and it gets the UUID the storage configuration
+    expects, so the generated fstab and boot loader configuration
+    stay valid.
+    """
+
+    def __init__(self, image_path, fstype, device_path, uuid):
+        """Create a new deployment.
+
+        :param str image_path: a path to the file system image
+        :param str fstype: a type of the file system
+        :param str device_path: a path to the target device
+        :param str uuid: a new UUID of the file system
+        """
+        self._image_path = image_path
+        self._fstype = fstype
+        self._device_path = device_path
+        self._uuid = uuid
+
+    def write(self):
+        """Write the image to the unmounted device."""
+        log.debug("Writing %s to %s.", self._image_path, self._device_path)
+
+        if self._fstype == "xfs":
+            self._run("xfs_copy", ["-d", self._image_path, self._device_path])
+            self._run("xfs_admin", ["-U", self._uuid, self._device_path])
+            return
+
+        self._run("e2image", ["-ra", "-p", self._image_path, self._device_path])
+        self._run("e2fsck", ["-f", "-p", self._device_path], valid_codes=(0, 1))
+        self._run("resize2fs", [self._device_path])
+        self._run("tune2fs", ["-U", self._uuid, self._device_path])
+
+    def grow(self, mount_point):
+        """Grow the mounted file system to fill the device.
+
+        :param str mount_point: a path to the mount point
+        """
+        if self._fstype == "xfs":
+            self._run("xfs_growfs", [mount_point])
+
+    @staticmethod
+    def _run(cmd, args, valid_codes=(0, )):
+        """Run a command of the deployment."""
+        try:
+            rc = execWithRedirect(cmd, args)
+        except OSError as e:
+            raise PayloadInstallationError(
+                "Failed to deploy the image: {}".format(e)
+            ) from None
+
+        if rc not in valid_codes:
+            raise PayloadInstallationError(
+                "Failed to deploy the image: {} exited with code {}".format(cmd, rc)
+            )
+
+    @staticmethod
+    def move_mounts(mounts, root_mount, target):
+        """Move mounts on top of the root mount to another directory.
+
+        The mounts have to be private to be moved. If a mount cannot
+        be moved, the already moved mounts are moved back.
+
+        :param mounts: a list of MountInfo
+        :param root_mount: an instance of MountInfo
+        :param str target: a path to the target directory
+        :return: a list of tuples with the original and the new mount point
+        """
+        moved = []
+
+        try:
+            for index, mount in enumerate(mounts):
+                if mount.parent_id != root_mount.mount_id:
+                    continue
+
+                if mount.mount_point == root_mount.mount_point:
+                    continue
+
+                path = join_paths(target, str(index))
+                os.mkdir(path)
+                BlockDeployment._run("mount", ["--move", mount.mount_point, path])
+                moved.append((mount.mount_point, path))
+
+        except BaseException:
+            try:
+                BlockDeployment.restore_mounts(moved)
+            except PayloadInstallationError as e:
+                log.error("Failed to restore the moved mounts: %s", e)
+
+            raise
+
+        return moved
+
+    @staticmethod
+    def restore_mounts(moved):
+        """Move the mounts back.
+
+        Try to restore all mounts and raise the first error.
+
+        :param moved: a list of tuples with the original and the new mount point
+        :raise: PayloadInstallationError if a mount cannot be restored
+        """
+        error = None
+
+        for mount_point, path in reversed(moved):
+            try:
+                make_directories(mount_point)
+                BlockDeployment._run("mount", ["--move", path, mount_point])
+            except OSError as e:
+                error = error or PayloadInstallationError(
+                    "Failed to restore the mount {}: {}".format(mount_point, e)
+                )
+            except PayloadInstallationError as e:
+                error = error or e
+
+            if error:
+                log.error("Failed to restore the mount %s.", mount_point)
+
+        if error:
+            raise error
+
+    @staticmethod
+    def remove_staging_directory(path):
+        """Remove the empty directories of the moved mounts.
+
+        Nothing is removed recursively, so a directory
+        that still holds a mount is kept.
+
+        :param str path: a path to the staging directory
+        """
+        try:
+            for name in os.listdir(path):
+                os.rmdir(join_paths(path, name))
+
+            os.rmdir(path)
+        except OSError as e:
+            log.warning("Failed to remove the staging directory %s: %s", path, e)
+
+    @staticmethod
+    def clear_directory(path):
+        """Remove the content of the specified directory."""
+        if not os.path.isdir(path) or os.path.islink(path):
+            return
+
+        for name in os.listdir(path):
+            BlockDeployment.remove_path(join_paths(path, name))
+
+    @staticmethod
+    def remove_path(path):
+        """Remove the specified file or directory."""
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+
+    @staticmethod
+    def remove_excluded(root, patterns):
+        """Remove the excluded paths from the deployed system.
+
+        Directories of the API file systems at the top
+        level are kept, because they are mount points.
+
+        :param str root: a path to the deployed system
+        :param [str] patterns: exclude patterns relative to the root
+        """
+        for pattern in patterns:
+            if pattern.endswith("/") and pattern.count("/") == 2:
+                continue
+
+            for path in glob.glob(join_paths(root, pattern.rstrip("/"))):
+                log.debug("Removing excluded %s.", path)
+                BlockDeployment.remove_path(path)
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["DownloadState"]
+
+
+class DownloadState(object):
+    """The state of a partially downloaded file.
+
+    The state is stored in a small sidecar file next to the downloaded
+    file, so an interrupted download can be resumed from the last
+    confirmed offset instead of starting over. The state contains the
+    URL of the file and its validator (the ETag or the Last-Modified
+    header), so we never resume a download of a different file.
+    """
+
+    SUFFIX = ".state"
+
+    def __init__(self, path):
+        """Create a new state.
+
+        :param str path: a path to the downloaded file
+        """
+        self._file_path = path
+        self._state_path = path + self.SUFFIX
+
+    @property
+    def path(self):
+        """The path to the sidecar file."""
+        return self._state_path
+
+    def load(self, url):
+        """Load the state of a partial download.
+
+        :param str url: a URL of the downloaded file
+        :return: a tuple of a confirmed offset and a validator or (0, None)
+        """
+        try:
+            with open(self._state_path, "r") as f:
+                data = json.load(f)
+
+            offset = int(data["offset"])
+            validator = data["validator"]
+
+            if data["url"] != url or not validator:
+                log.debug("The partial download of %s cannot be resumed.", self._file_path)
+                return 0, None
+
+            if offset <= 0 or os.path.getsize(self._file_path) < offset:
+                log.debug("The partial file %s is not usable.", self._file_path)
+                return 0, None
+
+        except FileNotFoundError:
+            return 0, None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.debug("Failed to load the download state of %s: %s", self._file_path, e)
+            return 0, None
+
+        log.debug("Found a partial download of %s at %d bytes.", url, offset)
+        return offset, validator
+
+    def save(self, url, validator, offset):
+        """Save the state of a partial download.
+
+        The sidecar file is replaced atomically, so it always
+        describes a valid state of the download.
+
+        :param str url: a URL of the downloaded file
+        :param str validator: an ETag, a Last-Modified value or None
+        :param int offset: a number of confirmed bytes
+        """
+        data = {
+            "url": url,
+            "validator": validator,
+            "offset": offset,
+        }
+
+        temp_path = self._state_path + ".tmp"
+
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+
+            os.replace(temp_path, self._state_path)
+        except OSError as e:
+            log.warning("Failed to save the download state of %s: %s", self._file_path, e)
+
+    def remove(self):
+        """Remove the sidecar file."""
+        try:
+            os.unlink(self._state_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning("Failed to remove the download state of %s: %s", self._file_path, e)
@@ -0,0 +1,446 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import errno
+import fcntl
+import os
+import re
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.path import FICLONE, join_paths
+
+log = get_module_logger(__name__)
+
+__all__ = ["ImageCopy", "EXCLUDED_PATHS"]
+
+# Paths excluded from the installation of an image. The patterns
+# are anchored at the root of the image. A star doesn't match
+# a slash and a pattern with a trailing slash matches only
+# directories, the same as in the exclude patterns of rsync.
+EXCLUDED_PATHS = [
+    "/dev/",
+    "/proc/",
+    "/tmp/*",
+    "/sys/",
+    "/run/",
+    "/boot/*rescue*",
+    "/boot/loader/",
+    "/boot/efi/loader/",
+    "/etc/machine-id",
+    "/etc/machine-info",
+]
+
+# The maximal number of copying threads.
+MAX_WORKERS = 8
+
+# The size of a copied chunk in bytes.
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# The interval of the progress reporting in seconds.
+PROGRESS_INTERVAL = 0.5
+
+# Errors that mean that a reflink or copy_file_range cannot be used.
+UNSUPPORTED_ERRORS = (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY)
+
+
+def _compile_pattern(pattern):
+    """Compile an exclude pattern.
+
+    :param str pattern: an exclude pattern
+    :return: a tuple of a regular expression and a flag for directories
+    """
+    directory_only = pattern.endswith("/")
+    regex = re.escape(pattern.rstrip("/")).replace(r"\*", "[^/]*")
+    return re.compile(regex), directory_only
+
+
+class ImageCopy(object):
+    """Copy the content of a mounted image to the target system.
+
+    The source tree is walked first. Directories, symlinks and special
+    files are created right away and regular files are put to a queue
+    of a pool of threads. The data are shared with a reflink or copied
+    in the kernel with copy_file_range where possible, and holes of
+    sparse files are skipped. Hard links are created after all files
+    are copied and the metadata of directories are set at the end,
+    so their times are not changed by the copying.
+
+    Owners, permissions, times and extended attributes, including ACLs
+    and SELinux labels, are preserved. The copy doesn't cross file
+    system boundaries.
+    """
+
+    def __init__(self, source, target, excluded=None, workers=MAX_WORKERS):
+        """Create a new copy.
+
+        :param str source: a path to the mounted image
+        :param str target: a path to the target system
+        :param [str] excluded: a list of exclude patterns or None for the default
+        :param int workers: a number of copying threads
+        """
+        self._source = os.path.normpath(source)
+        self._target = os.path.normpath(target)
+        self._excluded = [
+            _compile_pattern(p) for p in
+            (EXCLUDED_PATHS if excluded is None else excluded)
+        ]
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._reflink = True
+        self._copy_file_range = hasattr(os, "copy_file_range")
+        self._total_size = 0
+        self._copied_size = 0
+        self._files = []
+        self._directories = []
+        self._links = []
+        self._inodes = {}
+
+    @property
+    def total_size(self):
+        """The number of bytes of all regular files."""
+        return self._total_size
+
+    @property
+    def copied_size(self):
+        """The number of copied bytes."""
+        with self._lock:
+            return self._copied_size
+
+    def run(self, callback=None):
+        """Copy the image.
+
+        :param callback: a function called with the copied and total size or None
+        :raise OSError: if the copy fails
+        """
+        self._create_tree()
+
+        log.debug(
+            "Copying %d files (%d bytes) with %d threads.",
+            len(self._files), self._total_size, self._workers
+        )
+
+        self._copy_files(callback)
+        self._create_links()
+        self._set_up_directories()
+
+        log.debug(
+            "Copied %d bytes, %d hard links and %d directories.",
+            self.copied_size, len(self._links), len(self._directories)
+        )
+
+    def _is_excluded(self, path, is_directory):
+        """Is the path excluded?
+
+        :param str path: a path relative to the root of the image
+        :param bool is_directory: is it a directory?
+        """
+        for regex, directory_only in self._excluded:
+            if directory_only and not is_directory:
+                continue
+
+            if regex.fullmatch(path):
+                return True
+
+        return False
+
+    def _create_tree(self):
+        """Walk the image and create everything except regular files."""
+        root_stat = os.lstat(self._source)
+        self._create_directory(self._source, self._target, root_stat)
+        queue = [""]
+
+        while queue:
+            parent = queue.pop()
+
+            with os.scandir(join_paths(self._source, parent)) as entries:
+                entries = list(entries)
+
+            for entry in entries:
+                path = parent + "/" + entry.name
+                st = entry.stat(follow_symlinks=False)
+                is_directory = stat.S_ISDIR(st.st_mode)
+
+                if self._is_excluded(path, is_directory):
+                    log.debug("Skipping excluded %s.", path)
+                    continue
+
+                source = entry.path
+                target = join_paths(self._target, path)
+
+                if is_directory:
+                    self._create_directory(source, target, st)
+
+                    # Don't cross file system boundaries.
+                    if st.st_dev == root_stat.st_dev:
+                        queue.append(path)
+
+                    continue
+
+                # Create hard links at the end.
+                if st.st_nlink > 1:
+                    key = (st.st_dev, st.st_ino)
+
+                    if key in self._inodes:
+                        self._links.append((self._inodes[key], target))
+                        continue
+
+                    self._inodes[key] = target
+
+                if stat.S_ISREG(st.st_mode):
+                    self._files.append((source, target, st))
+                    self._total_size += st.st_size
+                elif stat.S_ISLNK(st.st_mode):
+                    self._create_symlink(source, target, st)
+                else:
+                    self._create_special_file(source, target, st)
+
+    @staticmethod
+    def _replace(target, create):
+        """Create a new file and replace an existing one."""
+        try:
+            return create()
+        except FileExistsError:
+            os.unlink(target)
+            return create()
+
+    def _create_directory(self, source, target, st):
+        """Create a directory. Its metadata are set at the end."""
+        if not os.path.isdir(target):
+            self._replace(target, lambda: os.mkdir(target, 0o700))
+
+        self._directories.append((source, target, st))
+
+    def _create_symlink(self, source, target, st):
+        """Create a symbolic link."""
+        link = os.readlink(source)
+        self._replace(target, lambda: os.symlink(link, target))
+        self._copy_metadata(source, target, st)
+
+    def _create_special_file(self, source, target, st):
+        """Create a device node, a named pipe or a socket."""
+        self._replace(target, lambda: os.mknod(target, st.st_mode, st.st_rdev))
+        self._copy_metadata(source, target, st)
+
+    def _create_links(self):
+        """Create hard links."""
+        for existing, target in self._links:
+            self._replace(target, lambda: os.link(existing, target, follow_symlinks=False))
+
+    def _set_up_directories(self):
+        """Set the metadata of the directories."""
+        for source, target, st in reversed(self._directories):
+            self._copy_metadata(source, target, st)
+
+    def _copy_metadata(self, source, target, st):
+        """Copy owners, permissions, extended attributes and times.
+
+        The extended attributes are copied after the owners are
+        changed, because the change removes the file capabilities.
+        """
+        os.chown(target, st.st_uid, st.st_gid, follow_symlinks=False)
+
+        if not stat.S_ISLNK(st.st_mode):
+            os.chmod(target, stat.S_IMODE(st.st_mode))
+
+        self._copy_xattrs(source, target)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns), follow_symlinks=False)
+
+    @staticmethod
+    def _copy_xattrs(source, target):
+        """Copy extended attributes, including ACLs and SELinux labels."""
+        try:
+            names = os.listxattr(source, follow_symlinks=False)
+        except OSError as e:
+            log.debug("Failed to list extended attributes of %s: %s", source, e)
+            return
+
+        for name in names:
+            try:
+                value = os.getxattr(source, name, follow_symlinks=False)
+                os.setxattr(target, name, value, follow_symlinks=False)
+            except OSError as e:
+                log.warning("Failed to copy the extended attribute %s of %s: %s", name, source, e)
+
+    def _copy_files(self, callback):
+        """Copy the regular files with a pool of threads."""
+        executor = ThreadPoolExecutor(self._workers, thread_name_prefix="AnaImageCopy")
+        files = iter(self._files)
+        pending = set()
+        reported = 0
+
+        try:
+            while True:
+                # Keep the queue of the pool short.
+                while len(pending) < self._workers * 16:
+                    item = next(files, None)
+
+                    if item is None:
+                        break
+
+                    pending.add(executor.submit(self._copy_file, *item))
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    future.result()
+
+                if callback and time.monotonic() - reported >= PROGRESS_INTERVAL:
+                    callback(self.copied_size, self._total_size)
+                    reported = time.monotonic()
+
+        except BaseException:
+            self._cancelled.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+        if callback:
+            callback(self.copied_size, self._total_size)
+
+    def _copy_file(self, source, target, st):
+        """Copy a regular file."""
+        if self._cancelled.is_set():
+            return
+
+        fd_in = os.open(source, os.O_RDONLY | os.O_NOFOLLOW)
+
+        try:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW
+            fd_out = self._replace(target, lambda: os.open(target, flags, 0o600))
+
+            try:
+                self._copy_data(fd_in, fd_out, st.st_size)
+            finally:
+                os.close(fd_out)
+        finally:
+            os.close(fd_in)
+
+        self._copy_metadata(source, target, st)
+
+    def _add_copied_size(self, size):
+        """Add the number of copied bytes."""
+        with self._lock:
+            self._copied_size += size
+
+    def _copy_data(self, fd_in, fd_out, size):
+        """Copy the data of a file.
+
+        Share the data blocks with a reflink if possible.
+        Otherwise, copy only the data ranges of the file,
+        so the holes of a sparse file are preserved.
+        """
+        if self._clone_data(fd_in, fd_out):
+            self._add_copied_size(size)
+            return
+
+        offset = 0
+
+        while offset < size:
+            start, end = self._find_data(fd_in, offset, size)
+
+            # The hole is skipped.
+            self._add_copied_size(start - offset)
+
+            self._copy_range(fd_in, fd_out, start, end - start)
+            offset = end
+
+        os.ftruncate(fd_out, size)
+
+    def _clone_data(self, fd_in, fd_out):
+        """Try to create a reflink of the data.
+
+        :return: True on success, otherwise False
+        """
+        if not self._reflink:
+            return False
+
+        try:
+            fcntl.ioctl(fd_out, FICLONE, fd_in)
+            return True
+        except OSError as e:
+            if e.errno in UNSUPPORTED_ERRORS:
+                log.debug("Reflinks are not supported: %s", e)
+                self._reflink = False
+
+            return False
+
+    @staticmethod
+    def _find_data(fd, offset, size):
+        """Find the next range of data of a file.
+
+        :return: a tuple of the start and the end of the range
+        """
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            # There is a hole until the end of the file.
+            if e.errno == errno.ENXIO:
+                return size, size
+
+            # Holes are not supported.
+            return offset, size
+
+        end = os.lseek(fd, start, os.SEEK_HOLE)
+        return min(start, size), min(end, size)
+
+    def _copy_range(self, fd_in, fd_out, offset, count):
+        """Copy a range of data at the same offset."""
+        while count > 0:
+            if self._cancelled.is_set():
+                return
+
+            copied = self._copy_chunk(fd_in, fd_out, offset, min(CHUNK_SIZE, count))
+
+            if not copied:
+                raise OSError(errno.EIO, "The file was truncated during the copy.")
+
+            offset += copied
+            count -= copied
+            self._add_copied_size(copied)
+
+    def _copy_chunk(self, fd_in, fd_out, offset, count):
+        """Copy a chunk of data at the same offset.
+
+        :return: a number of copied bytes
+        """
+        if self._copy_file_range:
+            try:
+                return os.copy_file_range(fd_in, fd_out, count, offset, offset)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRORS:
+                    raise
+
+                log.debug("The copy_file_range call is not supported: %s", e)
+                self._copy_file_range = False
+
+        data = os.pread(fd_in, count, offset)
+        view = memoryview(data)
+
+        while view:
+            written = os.pwrite(fd_out, view, offset)
+            view = view[written:]
+            offset += written
+
+        return len(data)
@@ -17,31 +17,76 @@
 #
 import glob
 import hashlib
+import itertools
 import os
-import stat
+import subprocess
+import tempfile
+import time
 import requests
 import blivet.util
 
+from blivet.size import Size
+from collections import namedtuple
+from functools import partial
+from requests.adapters import HTTPAdapter
+
 from pyanaconda.anaconda_loggers import get_module_logger
-from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT
+from pyanaconda.core.configuration.anaconda import conf
+from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT, IMAGE_COPY_PARALLEL
 from pyanaconda.core.i18n import _
-from pyanaconda.core.util import execWithRedirect, execReadlines, requests_session
+from pyanaconda.core.util import execWithRedirect, execReadlines, requests_session, \
+    xprogressive_delay, startProgram
 from pyanaconda.core.path import join_paths
 from pyanaconda.core.string import lower_ascii
+from pyanaconda.modules.common.constants.objects import DEVICE_TREE
+from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.modules.common.structures.live_image import LiveImageConfigurationData
+from pyanaconda.modules.common.structures.storage import DeviceData, DeviceFormatData
 from pyanaconda.modules.common.task import Task
 from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.common.errors.storage import MountFilesystemError
+from pyanaconda.modules.payloads.payload.live_image.block_deployment import BlockDeployment, \
+    SUPPORTED_FILESYSTEMS, get_mount_info, find_mount, get_backing_file, get_subtree_patterns
 from pyanaconda.modules.payloads.payload.live_image.download_progress import DownloadProgress
+from pyanaconda.modules.payloads.payload.live_image.download_state import DownloadState
+from pyanaconda.modules.payloads.payload.live_image.image_copy import ImageCopy, EXCLUDED_PATHS
 from pyanaconda.modules.payloads.payload.live_image.installation_progress import \
     InstallationProgress
+from pyanaconda.modules.payloads.payload.live_image.segmented_download import \
+    SegmentedDownload, get_segments
 from pyanaconda.modules.payloads.payload.live_image.utils import get_proxies_from_option
 
 log = get_module_logger(__name__)
 
+# The block layout of the InstallFromImageTask task.
+BlockLayout = namedtuple(
+    "BlockLayout", [
+        "image_path",
+        "fstype",
+        "device_name",
+        "device_path",
+        "uuid",
+    ]
+)
+
+# The result of the DownloadImageTask task.
+DownloadImageResult = namedtuple(
+    "DownloadImageResult", [
+        "image_path",
+        "checksum",
+    ]
+)
+
 
 class DownloadImageTask(Task):
     """Task to download an image."""
 
+    # How many times should we try to resume a failed download?
+    MAX_DOWNLOAD_RETRIES = 5
+
+    # How often should we save the state of the download in bytes?
+    STATE_INTERVAL = 64 * 1024 * 1024
+
     def __init__(self, configuration: LiveImageConfigurationData, download_path):
         """Create a new task.
 
@@ -54,6 +99,9 @@ class DownloadImageTask(Task):
         self._proxy = configuration.proxy
         self._ssl_verify = configuration.ssl_verification_enabled
         self._download_path = download_path
+        self._sha256 = hashlib.sha256() if configuration.checksum else None
+        self._segments = conf.payload.image_download_segments
+        self._state = DownloadState(download_path)
 
     @property
     def name(self):
@@ -67,60 +115,196 @@ class DownloadImageTask(Task):
         the image is downloaded at the specified download location and
         we return that one.
 
-        :return: a path to the image
+        If the image should be verified, the sha256 checksum of the
+        downloaded image is calculated during the download, so the
+        image doesn't have to be read again.
+
+        If the download fails, it is resumed from the last confirmed
+        offset. The state of the download is kept in a sidecar file
+        next to the partial image, so even a download interrupted by
+        a previous attempt can be resumed.
+
+        :return: an instance of DownloadImageResult
         """
         log.info("Downloading the image...")
 
         if self._url.startswith("file://"):
             log.info("Nothing to download.")
-            return self._url.removeprefix("file://")
+            return DownloadImageResult(
+                image_path=self._url.removeprefix("file://"),
+                checksum=None
+            )
 
         with requests_session() as session:
             try:
+                # Keep a connection for every segment.
+                self._set_up_connection_pool(session)
+
+                # Resume a partial download if possible.
+                offset, validator = self._state.load(self._url)
+
                 # Send a GET request to the image URL.
-                response = self._send_request(session)
+                response = self._send_request(
+                    session, self._get_range_headers(offset, validator)
+                )
 
                 # Download the image to a file.
-                self._download_image(response)
+                self._download_image(session, response, offset)
 
             except requests.exceptions.RequestException as e:
                 raise PayloadInstallationError(
                     "Error while downloading the image: {}".format(e)
                 ) from e
 
-        return self._download_path
+        return DownloadImageResult(
+            image_path=self._download_path,
+            checksum=self._get_checksum()
+        )
+
+    def _set_up_connection_pool(self, session):
+        """Set up the connection pool of the session."""
+        if self._segments <= 1:
+            return
+
+        adapter = HTTPAdapter(pool_maxsize=self._segments)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
 
-    def _send_request(self, session):
+    def _send_request(self, session, headers=None):
         """Send a GET request to the image URL."""
         proxies = get_proxies_from_option(
             self._proxy
         )
+        kwargs = {}
+
+        if headers:
+            kwargs["headers"] = headers
+
         response = session.get(
             url=self._url,
             proxies=proxies,
             verify=self._ssl_verify,
             stream=True,
             timeout=NETWORK_CONNECTION_TIMEOUT,
+            **kwargs
         )
         response.raise_for_status()
         return response
 
-    def _download_image(self, response):
+    def _download_image(self, session, response, offset=0):
         """Download the image to a file."""
+        # Resume a partial download.
+        if offset and self._is_resumed(response, offset):
+            self._stream_download(session, response, offset)
+            return
+
+        # Forget a partial download that cannot be resumed.
+        self._state.remove()
+
         # Handle no content length header.
         if not self._get_content_length(response):
-            download = self._direct_download
+            with open(self._download_path, "wb") as image_file:
+                self._direct_download(response, image_file)
+        elif self._can_download_segments(response):
+            self._segmented_download(session, response)
         else:
-            download = self._stream_download
-
-        # Download the image to a file.
-        with open(self._download_path, "wb") as image_file:
-            download(response, image_file)
+            self._stream_download(session, response)
 
     def _get_content_length(self, response):
         """Get the content length value."""
         return response.headers.get('content-length')
 
+    def _get_validator(self, response):
+        """Get a value that identifies the version of the image.
+
+        :return: an ETag, a Last-Modified value or None
+        """
+        return response.headers.get('etag') or response.headers.get('last-modified')
+
+    @staticmethod
+    def _get_range_headers(offset, validator):
+        """Get headers of a request that resumes the download.
+
+        The If-Range header makes sure that the server sends us
+        the whole image if it has changed in the meantime.
+
+        :return: a dictionary of headers or None
+        """
+        if not offset:
+            return None
+
+        headers = {"Range": "bytes={}-".format(offset)}
+
+        if validator:
+            headers["If-Range"] = validator
+
+        return headers
+
+    def _is_resumed(self, response, offset):
+        """Does the response continue at the specified offset?"""
+        if response.status_code != 206:
+            return False
+
+        content_range = response.headers.get('content-range', '')
+        return content_range.startswith("bytes {}-".format(offset))
+
+    def _can_download_segments(self, response):
+        """Can we download the image in segments?"""
+        if self._segments <= 1:
+            return False
+
+        if response.headers.get('accept-ranges', '').lower() != 'bytes':
+            log.debug("The server doesn't support ranged requests.")
+            return False
+
+        total_size = int(self._get_content_length(response))
+        return len(get_segments(total_size, self._segments)) > 1
+
+    def _segmented_download(self, session, response):
+        """Download the image in segments at once."""
+        total_size = int(self._get_content_length(response))
+        segments = get_segments(total_size, self._segments)
+
+        # The segments are downloaded by new requests.
+        response.close()
+
+        log.debug("Downloading %s in %d segments.", self._url, len(segments))
+
+        progress = DownloadProgress(
+            url=self._url,
+            callback=self.report_progress,
+            total_size=total_size,
+        )
+
+        download = SegmentedDownload(
+            downloader=partial(self._send_request, session),
+            path=self._download_path,
+            total_size=total_size,
+            segments=segments,
+            retries=self.MAX_DOWNLOAD_RETRIES,
+        )
+
+        progress.start()
+        download.run(progress, self._sha256)
+        progress.end()
+
+    def _update_checksum(self, data):
+        """Update the checksum with the downloaded data."""
+        if self._sha256 is not None:
+            self._sha256.update(data)
+
+    def _get_checksum(self):
+        """Get the checksum of the downloaded image.
+
+        :return: a sha256 hex digest or None
+        """
+        if self._sha256 is None:
+            return None
+
+        checksum = self._sha256.hexdigest()
+        log.debug("sha256 of %s: %s", self._download_path, checksum)
+        return checksum
+
     def _direct_download(self, response, image_file):
         """Download the image at once."""
         log.warning(
@@ -130,11 +314,26 @@ class DownloadImageTask(Task):
 
         self.report_progress(_("Downloading {}").format(self._url))
         image_file.write(response.content)
+        self._update_checksum(response.content)
         log.debug("Downloaded %s.", self._url)
 
-    def _stream_download(self, response, image_file):
-        """Download the image in 1 MB chunks."""
-        total_size = int(self._get_content_length(response))
+    def _stream_download(self, session, response, offset=0):
+        """Download the image in 1 MB chunks.
+
+        If the download fails, we wait a bit and resume it from
+        the last confirmed offset with a ranged request. The number
+        of retries and the delay are reset whenever an attempt made
+        some progress. The checksum is kept in memory between the
+        attempts, so the downloaded data are never read again. Only
+        the partial image of an interrupted task has to be read once
+        to restore the checksum.
+
+        :param session: a requests session
+        :param response: a response to the first request
+        :param int offset: an offset of a resumed download
+        """
+        total_size = offset + int(self._get_content_length(response))
+        validator = self._get_validator(response)
 
         progress = DownloadProgress(
             url=self._url,
@@ -143,34 +342,153 @@ class DownloadImageTask(Task):
         )
 
         progress.start()
-        downloaded_size = 0
+        retries = 0
+        xdelay = xprogressive_delay()
+
+        with open(self._download_path, "r+b" if offset else "wb") as image_file:
+            if offset:
+                log.info("Resuming the download of %s at %d bytes.", self._url, offset)
+                restored = self._restore_checksum(image_file, offset)
+
+                # The partial image is shorter than expected.
+                if restored != offset:
+                    log.warning(
+                        "The partial image has only %d bytes, resuming from there.",
+                        restored
+                    )
+                    response.close()
+                    response = None
+                    offset = restored
 
-        for chunks in response.iter_content(1024 * 1024):
-            if not chunks:
-                continue
+            while True:
+                attempt_offset = offset
 
-            image_file.write(chunks)
-            image_file.flush()
+                try:
+                    if response is None:
+                        response = self._send_request(
+                            session, self._get_range_headers(offset, validator)
+                        )
 
-            downloaded_size += len(chunks)
-            progress.update(downloaded_size)
+                        if not self._is_resumed(response, offset):
+                            offset = self._restart_download(response, image_file, total_size)
+                            validator = self._get_validator(response)
+
+                    saved_size = offset
+
+                    for chunks in response.iter_content(1024 * 1024):
+                        if not chunks:
+                            continue
+
+                        image_file.write(chunks)
+                        image_file.flush()
+                        self._update_checksum(chunks)
+
+                        offset += len(chunks)
+                        progress.update(offset)
+
+                        if total_size > offset >= saved_size + self.STATE_INTERVAL:
+                            self._state.save(self._url, validator, offset)
+                            saved_size = offset
+
+                    if offset != total_size:
+                        raise requests.exceptions.RequestException(
+                            "The download is incomplete."
+                        )
+
+                    break
+
+                except requests.exceptions.RequestException as e:
+                    self._state.save(self._url, validator, offset)
+
+                    # Don't give up on a download that makes progress.
+                    if offset > attempt_offset:
+                        retries = 0
+                        xdelay = xprogressive_delay()
+
+                    if retries >= self.MAX_DOWNLOAD_RETRIES:
+                        raise
+
+                    retries += 1
+                    log.warning(
+                        "Failed to download the image at %d bytes (attempt %d/%d): %s",
+                        offset, retries, self.MAX_DOWNLOAD_RETRIES, e
+                    )
+
+                    if response is not None:
+                        response.close()
+                        response = None
+
+                    time.sleep(next(xdelay))
 
         progress.end()
+        self._state.remove()
+
+    def _restore_checksum(self, image_file, offset):
+        """Restore the checksum of a partial image.
+
+        The state of the checksum cannot be saved, so we have
+        to read the partial image once. The file is truncated
+        at the specified offset. If the file is shorter, the
+        download has to be resumed from its end.
+
+        :return: an offset of the restored partial image
+        """
+        image_file.seek(0, os.SEEK_END)
+        offset = min(offset, image_file.tell())
+        image_file.seek(0)
+
+        while self._sha256 is not None and image_file.tell() < offset:
+            data = image_file.read(min(1024 * 1024, offset - image_file.tell()))
+
+            if not data:
+                break
+
+            self._sha256.update(data)
+
+        image_file.seek(offset)
+        image_file.truncate()
+        return offset
+
+    def _restart_download(self, response, image_file, total_size):
+        """Start the download over.
+
+        The server sends us the whole image if it doesn't support
+        ranged requests or if the image has changed.
+
+        :return: a new offset
+        """
+        log.warning("Failed to resume the download of %s, starting over.", self._url)
+
+        if int(self._get_content_length(response) or 0) != total_size:
+            raise PayloadInstallationError(
+                "The image has changed during the download."
+            )
+
+        image_file.seek(0)
+        image_file.truncate()
+
+        if self._sha256 is not None:
+            self._sha256 = hashlib.sha256()
+
+        return 0
 
 
 class VerifyImageChecksumTask(Task):
     """Task to verify the checksum of the downloaded image."""
 
-    def __init__(self, configuration: LiveImageConfigurationData, image_path):
+    def __init__(self, configuration: LiveImageConfigurationData, image_path,
+                 calculated_checksum=None):
         """Create a new task.
 
         :param configuration: a configuration of a remote image
         :type configuration: an instance of LiveImageConfigurationData
         :param image_path: a path to the image
+        :param calculated_checksum: a sha256 checksum calculated during the download or None
         """
         super().__init__()
         self._image_path = image_path
         self._checksum = configuration.checksum
+        self._calculated_checksum = calculated_checksum
 
     @property
     def name(self):
@@ -184,7 +502,12 @@ class VerifyImageChecksumTask(Task):
 
         self.report_progress(_("Checking image checksum"))
         expected_checksum = self._normalize_checksum(self._checksum)
-        calculated_checksum = self._calculate_checksum(self._image_path)
+        calculated_checksum = self._calculated_checksum
+
+        if calculated_checksum:
+            log.debug("Use the checksum calculated during the download.")
+        else:
+            calculated_checksum = self._calculate_checksum(self._image_path)
 
         if expected_checksum != calculated_checksum:
             log.error("'%s' does not match '%s'", calculated_checksum, expected_checksum)
@@ -303,7 +626,27 @@ class MountImageTask(Task):
 
 
 class InstallFromTarTask(Task):
-    """Task to install the payload from tarball."""
+    """Task to install the payload from tarball.
+
+    The tarball is piped to tar, so the progress is calculated
+    from the number of bytes consumed from the tarball.
+    """
+
+    # The size of a chunk passed to tar in bytes.
+    CHUNK_SIZE = 1024 * 1024
+
+    # Signatures of compressed tarballs and the related tar options.
+    # The compression cannot be detected by tar if it reads a pipe.
+    COMPRESSION_OPTIONS = [
+        (b"\x1f\x8b", "--gzip"),
+        (b"BZh", "--bzip2"),
+        (b"\xfd7zXZ\x00", "--xz"),
+        (b"\x28\xb5\x2f\xfd", "--zstd"),
+        (b"LZIP", "--lzip"),
+        (b"\x5d\x00\x00", "--lzma"),
+        (b"\x89LZO", "--lzop"),
+        (b"\x1f\x9d", "--uncompress"),
+    ]
 
     def __init__(self, sysroot, tarfile):
         """Create a new task.
@@ -320,36 +663,101 @@ class InstallFromTarTask(Task):
         """The name of the task."""
         return "Install the payload from a tarball"
 
-    @property
-    def _installation_size(self):
-        """The installation size of the archive.
+    def run(self):
+        """Run the task."""
+        try:
+            with open(self._tarfile, "rb") as f:
+                progress = InstallationProgress(
+                    total_size=os.fstat(f.fileno()).st_size,
+                    callback=self.report_progress,
+                )
+                progress.start()
 
-        Use 2x the archive's size to estimate the size of the install.
+                chunks = iter(partial(f.read, self.CHUNK_SIZE), b"")
+                self._install_chunks(chunks, progress)
+
+        except OSError as e:
+            msg = "Failed to install tar: {}".format(e)
+            raise PayloadInstallationError(msg) from None
 
-        :return: a size in bytes
+        progress.end()
+
+    def _install_chunks(self, chunks, progress=None):
+        """Extract the tarball from the chunks of data.
+
+        :param chunks: an iterator of non-empty chunks of the tarball
+        :param progress: an object with the update method or None
         """
-        return os.stat(self._tarfile)[stat.ST_SIZE] * 2
+        first_chunk = next(chunks, b"")
 
-    def run(self):
-        """Run the task."""
-        with self._monitor_progress():
-            self._install_tar()
+        argv = ["tar"] + self._get_tar_arguments() + [
+            *self._get_compression_arguments(first_chunk),
+            "-xf", "-",
+            "-C", self._sysroot
+        ]
 
-    def _monitor_progress(self):
-        """Get a progress monitor."""
-        return InstallationProgress(
-            sysroot=self._sysroot,
-            callback=self.report_progress,
-            installation_size=self._installation_size,
-        )
+        with tempfile.TemporaryFile() as output:
+            try:
+                process = startProgram(argv, stdin=subprocess.PIPE, stdout=output)
+            except OSError as e:
+                msg = "Failed to install tar: {}".format(e)
+                raise PayloadInstallationError(msg) from None
+
+            try:
+                self._write_chunks(process, itertools.chain([first_chunk], chunks), progress)
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                process.wait()
+
+            output.seek(0)
+            for line in output.read().decode("utf-8", "replace").splitlines():
+                log.debug("tar: %s", line)
+
+        if process.returncode:
+            msg = "Failed to install tar: tar exited with code {}".format(process.returncode)
+            raise PayloadInstallationError(msg)
+
+    def _get_compression_arguments(self, data):
+        """Get arguments for the compression of the tarball.
+
+        :param bytes data: the beginning of the tarball
+        :return: a list of arguments
+        """
+        for signature, option in self.COMPRESSION_OPTIONS:
+            if data.startswith(signature):
+                return [option]
+
+        return []
+
+    @staticmethod
+    def _write_chunks(process, chunks, progress):
+        """Write the chunks of the tarball to the extraction process."""
+        consumed_size = 0
 
-    def _install_tar(self):
-        """Run installation of the payload from a tarball.
+        try:
+            for data in chunks:
+                process.stdin.write(data)
+                consumed_size += len(data)
+
+                if progress:
+                    progress.update(consumed_size)
+
+            process.stdin.close()
+        except BrokenPipeError:
+            # The process has failed, so the caller will check its return code.
+            log.error("The extraction of the tarball has stopped.")
+
+    @staticmethod
+    def _get_tar_arguments():
+        """Get common arguments of the extraction.
 
         Preserve ACL's, xattrs, and SELinux context.
+
+        :return: a list of arguments
         """
-        cmd = "tar"
-        args = [
+        return [
             "--numeric-owner",
             "--selinux",
             "--acls",
@@ -365,15 +773,102 @@ class InstallFromTarTask(Task):
             "--exclude", "./boot/efi/loader",
             "--exclude", "./etc/machine-id",
             "--exclude", "./etc/machine-info",
-            "-xaf", self._tarfile,
-            "-C", self._sysroot
         ]
 
-        try:
-            execWithRedirect(cmd, args)
-        except (OSError, RuntimeError) as e:
-            msg = "Failed to install tar: {}".format(e)
-            raise PayloadInstallationError(msg) from None
+
+class InstallFromTarStreamTask(InstallFromTarTask):
+    """Task to install the payload from a remote tarball stream.
+
+    The tarball is extracted while it is downloaded, so it doesn't
+    have to be stored anywhere and the network and disk I/O overlap.
+    The HTTP response is piped to tar, which runs the decompressor.
+    The checksum of the tarball is calculated from the same stream.
+    """
+
+    def __init__(self, sysroot, configuration: LiveImageConfigurationData):
+        """Create a new task.
+
+        :param sysroot: a path to the system root
+        :param configuration: a configuration of a remote tarball
+        :type configuration: an instance of LiveImageConfigurationData
+        """
+        super().__init__(sysroot=sysroot, tarfile="-")
+        self._url = configuration.url
+        self._proxy = configuration.proxy
+        self._ssl_verify = configuration.ssl_verification_enabled
+        self._sha256 = hashlib.sha256() if configuration.checksum else None
+
+    @property
+    def name(self):
+        """The name of the task."""
+        return "Install the payload from a tarball stream"
+
+    def run(self):
+        """Run the task.
+
+        :return: a sha256 checksum of the tarball or None
+        """
+        log.info("Installing the payload from a stream of %s.", self._url)
+
+        with requests_session() as session:
+            try:
+                response = session.get(
+                    url=self._url,
+                    proxies=get_proxies_from_option(self._proxy),
+                    verify=self._ssl_verify,
+                    stream=True,
+                    timeout=NETWORK_CONNECTION_TIMEOUT,
+                )
+                response.raise_for_status()
+                self._install_stream(response)
+
+            except requests.exceptions.RequestException as e:
+                raise PayloadInstallationError(
+                    "Error while downloading the tarball: {}".format(e)
+                ) from e
+
+        if self._sha256 is None:
+            return None
+
+        return self._sha256.hexdigest()
+
+    def _install_stream(self, response):
+        """Extract the tarball from the response."""
+        chunks = filter(None, response.iter_content(self.CHUNK_SIZE))
+        progress = self._get_download_progress(response)
+
+        self._install_chunks(self._calculate_checksum(chunks), progress)
+
+        if progress:
+            progress.end()
+
+    def _calculate_checksum(self, chunks):
+        """Calculate the checksum of the passed chunks."""
+        for data in chunks:
+            if self._sha256 is not None:
+                self._sha256.update(data)
+
+            yield data
+
+    def _get_download_progress(self, response):
+        """Start to report the progress of the download.
+
+        :return: an instance of DownloadProgress or None
+        """
+        total_size = int(response.headers.get('content-length') or 0)
+
+        if not total_size:
+            self.report_progress(_("Downloading {}").format(self._url))
+            return None
+
+        progress = DownloadProgress(
+            url=self._url,
+            callback=self.report_progress,
+            total_size=total_size,
+        )
+
+        progress.start()
+        return progress
 
 
 class InstallFromImageTask(Task):
@@ -390,6 +885,7 @@ class InstallFromImageTask(Task):
         self._mount_point = mount_point
         self._log_rsync = False
         self._rsync_progress = ""
+        self._copy_progress = ""
 
     @property
     def name(self):
@@ -403,13 +899,202 @@ class InstallFromImageTask(Task):
         symlinks and hardlinks. Go recursively, include devices and
         special files. Don't cross file system boundaries.
 
-        Use a trailing slash on the source directory to copy the content
-        instead of the directory itself. See `man rsync`.
+        The content is copied by rsync or by the parallel copy engine
+        depending on the configuration. If the block deployment is
+        enabled and possible, the image is written to the root device
+        instead and only the other mount points are copied.
         """
         # Force write everything to disk.
         self.report_progress(_("Synchronizing writes to disk"))
         os.sync()
 
+        if conf.payload.image_block_deployment and self._deploy_blocks():
+            return
+
+        if conf.payload.image_copy_method == IMAGE_COPY_PARALLEL:
+            self._copy_image()
+        else:
+            self._run_rsync()
+
+    def _get_block_layout(self, mounts):
+        """Get the block layout of the installation.
+
+        :param mounts: a list of MountInfo
+        :return: an instance of BlockLayout or None
+        """
+        image_mount = find_mount(mounts, self._mount_point)
+
+        if not image_mount or image_mount.root != "/":
+            log.debug("The image is not a mounted file system.")
+            return None
+
+        if image_mount.fstype not in SUPPORTED_FILESYSTEMS:
+            log.debug("The %s file system of the image is not supported.", image_mount.fstype)
+            return None
+
+        image_path = get_backing_file(image_mount.source)
+
+        if not image_path or not os.path.isfile(image_path):
+            log.debug("The image is not backed by a file.")
+            return None
+
+        if os.path.realpath(image_path).startswith(os.path.realpath(self._sysroot) + "/"):
+            log.debug("The image is stored on the target system.")
+            return None
+
+        device_tree = STORAGE.get_proxy(DEVICE_TREE)
+        device_name = device_tree.GetMountPoints().get("/")
+
+        if not device_name:
+            log.debug("There is no root device.")
+            return None
+
+        device_data = DeviceData.from_structure(
+            device_tree.GetDeviceData(device_name)
+        )
+        format_data = DeviceFormatData.from_structure(
+            device_tree.GetFormatData(device_name)
+        )
+        uuid = format_data.attrs.get("uuid")
+
+        if format_data.type != image_mount.fstype or not uuid:
+            log.debug("The root file system doesn't match the image.")
+            return None
+
+        if device_data.size < os.path.getsize(image_path):
+            log.debug("The root device is smaller than the image.")
+            return None
+
+        root_mount = find_mount(mounts, self._sysroot)
+
+        if not root_mount or root_mount.fstype != image_mount.fstype:
+            log.debug("The root file system is not mounted.")
+            return None
+
+        return BlockLayout(
+            image_path=image_path,
+            fstype=image_mount.fstype,
+            device_name=device_name,
+            device_path=device_data.path,
+            uuid=uuid,
+        )
+
+    def _deploy_blocks(self):
+        """Deploy the image at the block level.
+
+        The mounts on top of the root file system are moved aside,
+        the root file system is unmounted and replaced with the image.
+        The content of the other file systems is copied afterwards.
+
+        :return: True if the image was deployed, otherwise False
+        """
+        mounts = get_mount_info()
+        layout = self._get_block_layout(mounts)
+
+        if not layout:
+            log.info("Falling back to the file-level installation.")
+            return False
+
+        log.info("Deploying %s to %s.", layout.image_path, layout.device_path)
+        self.report_progress(_("Installing software..."))
+
+        root_mount = find_mount(mounts, self._sysroot)
+        device_tree = STORAGE.get_proxy(DEVICE_TREE)
+        deployment = BlockDeployment(
+            image_path=layout.image_path,
+            fstype=layout.fstype,
+            device_path=layout.device_path,
+            uuid=layout.uuid,
+        )
+
+        # Never remove the staging directory recursively, it holds mounts.
+        temp_dir = tempfile.mkdtemp(prefix="anaconda-mounts-")
+
+        try:
+            moved = deployment.move_mounts(mounts, root_mount, temp_dir)
+
+            try:
+                device_tree.UnmountDevice(layout.device_name, self._sysroot)
+                deployment.write()
+                device_tree.MountDevice(layout.device_name, self._sysroot, "")
+                deployment.grow(self._sysroot)
+                deployment.remove_excluded(self._sysroot, EXCLUDED_PATHS)
+
+                for mount_point, _path in moved:
+                    deployment.clear_directory(mount_point)
+
+            finally:
+                deployment.restore_mounts(moved)
+
+        except (OSError, MountFilesystemError) as e:
+            msg = "Failed to deploy image: {}".format(e)
+            raise PayloadInstallationError(msg) from None
+
+        finally:
+            deployment.remove_staging_directory(temp_dir)
+
+        self._copy_mount_points(device_tree)
+        return True
+
+    def _copy_mount_points(self, device_tree):
+        """Copy the content of the image to the other mount points."""
+        mount_points = sorted(device_tree.GetMountPoints())
+
+        for mount_point in mount_points:
+            if mount_point == "/" or not mount_point.startswith("/"):
+                continue
+
+            # Nested mount points are copied with their parents.
+            parent = os.path.dirname(mount_point)
+
+            if any(parent == p or parent.startswith(p + "/") for p in mount_points if p != "/"):
+                continue
+
+            source = join_paths(self._mount_point, mount_point)
+
+            if not os.path.isdir(source):
+                continue
+
+            log.debug("Copying the content of %s.", mount_point)
+            self._copy_image(
+                source=source,
+                target=join_paths(self._sysroot, mount_point),
+                excluded=get_subtree_patterns(EXCLUDED_PATHS, mount_point),
+            )
+
+    def _copy_image(self, source=None, target=None, excluded=None):
+        """Copy the mounted image with multiple threads."""
+        image_copy = ImageCopy(
+            source=source or self._mount_point,
+            target=target or self._sysroot,
+            excluded=excluded,
+        )
+
+        try:
+            self.report_progress(_("Installing software..."))
+            image_copy.run(self._report_copy_progress)
+        except OSError as e:
+            msg = "Failed to install image: {}".format(e)
+            raise PayloadInstallationError(msg) from None
+
+    def _report_copy_progress(self, copied_size, total_size):
+        """Report the progress of the parallel copy."""
+        pct = 100 if not total_size else int(100 * copied_size / total_size)
+        str_pct = "{}%".format(pct)
+
+        if self._copy_progress == str_pct:
+            return
+
+        self._copy_progress = str_pct
+        log.debug("Copied %s of %s (%s).", Size(copied_size), Size(total_size), str_pct)
+        self.report_progress(_("Installing software {}").format(str_pct))
+
+    def _run_rsync(self):
+        """Copy the mounted image with rsync.
+
+        Use a trailing slash on the source directory to copy the content
+        instead of the directory itself. See `man rsync`.
+        """
         # Copy the mounted image to storage
         cmd = "rsync"
         args = [
@@ -417,19 +1102,15 @@ class InstallFromImageTask(Task):
             "--stats",  # show statistics at end of process
             "--info=flist2,name,progress2",  # show progress after each file
             "--no-inc-recursive",  # force calculating total work in advance
-            "--exclude", "/dev/",
-            "--exclude", "/proc/",
-            "--exclude", "/tmp/*",
-            "--exclude", "/sys/",
-            "--exclude", "/run/",
-            "--exclude", "/boot/*rescue*",
-            "--exclude", "/boot/loader/",
-            "--exclude", "/boot/efi/loader/",
-            "--exclude", "/etc/machine-id",
-            "--exclude", "/etc/machine-info",
+        ]
+
+        for pattern in EXCLUDED_PATHS:
+            args.extend(["--exclude", pattern])
+
+        args.extend([
             os.path.normpath(self._mount_point) + "/",
             self._sysroot
-        ]
+        ])
 
         try:
             self.report_progress(_("Installing software..."))
@@ -15,130 +15,66 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
-import os
-import time
-
 from blivet.size import Size
 
 from pyanaconda.anaconda_loggers import get_module_logger
-from pyanaconda.core.constants import THREAD_LIVE_PROGRESS
 from pyanaconda.core.i18n import _
-from pyanaconda.core.path import join_paths
-from pyanaconda.modules.common.constants.objects import DEVICE_TREE
-from pyanaconda.modules.common.constants.services import STORAGE
-from pyanaconda.modules.common.structures.storage import DeviceData
-from pyanaconda.modules.common.task.cancellable import Cancellable
-from pyanaconda.core.threads import thread_manager
 
 log = get_module_logger(__name__)
 
 __all__ = ["InstallationProgress"]
 
 
-class InstallationProgress(Cancellable):
-    """Progress monitor of the image installation."""
+class InstallationProgress(object):
+    """Progress of the image installation.
+
+    The progress is fed by the installation pipeline with the number
+    of bytes consumed from the installed archive or image, so it grows
+    linearly and it doesn't have to query the target file systems.
+    """
 
-    def __init__(self, sysroot, installation_size, callback):
+    def __init__(self, total_size, callback):
         """Create a new installation progress.
 
-        :param sysroot: a path to the system root
-        :param installation_size: a size of the installed payload
+        :param int total_size: a size of the installed archive or image in bytes
         :param callback: a function for the progress reporting
         """
-        super().__init__()
-        self._sysroot = sysroot
-        self._installation_size = installation_size
+        self._last_pct = -1
+        self._installed_size = 0
+        self._total_size = total_size
         self._callback = callback
-        self._thread_name = THREAD_LIVE_PROGRESS
-
-    def __enter__(self):
-        """Start to monitor the progress."""
-        # Start the thread.
-        thread_manager.add_thread(
-            name=self._thread_name,
-            target=self._monitor_progress
-        )
-
-    def __exit__(self, _exc_type, _exc_val, _exc_tb):
-        """Stop to monitor the progress."""
-        # Cancel the progress reporting.
-        self.cancel()
-
-        # Wait for the thread to finish.
-        thread_manager.wait(self._thread_name)
-
-    def _monitor_progress(self):
-        """Monitor the amount of disk space used on the target and source."""
-        log.debug("Installing %s.", Size(self._installation_size))
 
-        # Force write everything to disk.
-        self._callback(_("Synchronizing writes to disk"))
-        os.sync()
+    def _report_progress(self, pct=None):
+        """Report the progress."""
+        if pct is None and not self._total_size:
+            pct = 0
+        elif pct is None:
+            pct = min(int(100 * self._installed_size / self._total_size), 100)
 
-        # Calculate the starting size used by the system.
-        mount_points = self._get_mount_points_to_count()
-        starting_size = self._calculate_used_size(mount_points)
-        log.debug("Used %s by %s.", Size(starting_size), ", ".join(mount_points))
+        if pct == self._last_pct:
+            return
 
-        pct = 0
-        last_pct = -1
+        self._last_pct = pct
 
-        while pct < 100 and not self.check_cancel():
-            # Calculate the installed size used by the system.
-            current_size = self._calculate_used_size(mount_points)
-            installed_size = current_size - starting_size
+        log.debug("Installed %s of %s (%s%%)", Size(self._installed_size),
+                  Size(self._total_size), pct)
+        self._callback(_("Installing software {}%").format(pct))
 
-            # Report the progress message.
-            pct = min(int(100 * installed_size / self._installation_size), 100)
+    def start(self):
+        """Start the installation progress."""
+        log.debug("Installing %s.", Size(self._total_size))
+        self._installed_size = 0
+        self._report_progress()
 
-            if pct != last_pct:
-                log.debug("Installed %s (%s%%)", Size(installed_size), pct)
-                self._callback(_("Installing software {}%").format(pct))
+    def update(self, installed_size):
+        """Update the installation progress.
 
-            last_pct = pct
-            time.sleep(0.777)
-
-    def _get_mount_points_to_count(self):
-        """Get mount points in the device tree, which should be queried for capacity.
-
-        :return: a list of mount points
-        """
-        device_tree = STORAGE.get_proxy(DEVICE_TREE)
-        mount_points = device_tree.GetMountPoints()
-
-        result = []
-        counted_btrfs_volumes = []
-
-        for path, device in mount_points.items():
-            dev_data = DeviceData.from_structure(device_tree.GetDeviceData(device))
-
-            if not dev_data.type == "btrfs subvolume":
-                # not btrfs subvolume, so just take it as is
-                result.append(join_paths(self._sysroot, path))
-            else:
-                # For BTRFS, add only one mount-pointed subvolume per volume.
-                # That's because statvfs reports free/used as aggregate across the whole volume.
-                ancestors = device_tree.GetAncestors([device])
-                for ancestor in ancestors:
-                    anc_data = DeviceData.from_structure(device_tree.GetDeviceData(ancestor))
-                    if anc_data.type == "btrfs volume" and ancestor not in counted_btrfs_volumes:
-                        result.append(join_paths(self._sysroot, path))
-                        counted_btrfs_volumes.append(ancestor)
-
-        return result
-
-    def _calculate_used_size(self, mount_points):
-        """Calculate the total used size of the mount points.
-
-        :return: a size in bytes
+        :param int installed_size: a number of consumed bytes
         """
-        total = 0
-
-        for path in mount_points:
-            if not os.path.exists(path):
-                continue
-
-            stat = os.statvfs(path)
-            total += stat.f_frsize * (stat.f_blocks - stat.f_bfree)
+        self._installed_size = installed_size
+        self._report_progress()
 
-        return total
+    def end(self):
+        """Finish the installation progress."""
+        self._installed_size = self._total_size
+        self._report_progress(100)
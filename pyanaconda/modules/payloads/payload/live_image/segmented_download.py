@@ -0,0 +1,251 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from requests.exceptions import RequestException
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.util import xprogressive_delay
+
+log = get_module_logger(__name__)
+
+__all__ = ["SegmentedDownload", "get_segments"]
+
+# The minimal size of a downloaded segment in bytes.
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+
+# The size of a downloaded chunk in bytes.
+CHUNK_SIZE = 1024 * 1024
+
+# The interval of the progress reporting in seconds.
+PROGRESS_INTERVAL = 0.5
+
+
+def get_segments(total_size, count):
+    """Split a file of the specified size into segments.
+
+    Every segment has at least MIN_SEGMENT_SIZE bytes,
+    so small files are split into fewer segments.
+
+    :param int total_size: a size of the file in bytes
+    :param int count: a maximal number of segments
+    :return: a list of (start, end) tuples with inclusive ends
+    """
+    count = max(1, min(count, total_size // MIN_SEGMENT_SIZE))
+    size = total_size // count
+    segments = []
+
+    for index in range(count):
+        start = index * size
+        end = total_size - 1 if index == count - 1 else start + size - 1
+        segments.append((start, end))
+
+    return segments
+
+
+class SegmentedDownload(object):
+    """Download a file in segments at once.
+
+    Every segment is downloaded by a separate ranged GET request
+    and written at its offset into a preallocated sparse file.
+    A failed segment is resumed from its last written byte.
+    """
+
+    def __init__(self, downloader, path, total_size, segments, retries=0):
+        """Create a new download.
+
+        :param downloader: a function that sends a GET request with the given headers
+        :param str path: a path to the downloaded file
+        :param int total_size: a size of the file in bytes
+        :param segments: a list of (start, end) tuples with inclusive ends
+        :param int retries: a number of attempts to resume a failed segment
+        """
+        self._downloader = downloader
+        self._path = path
+        self._total_size = total_size
+        self._segments = segments
+        self._retries = retries
+        self._lock = threading.Lock()
+        self._written = [0] * len(segments)
+        self._cancelled = threading.Event()
+
+    @property
+    def downloaded_size(self):
+        """The number of downloaded bytes."""
+        with self._lock:
+            return sum(self._written)
+
+    @property
+    def contiguous_size(self):
+        """The number of downloaded bytes from the start of the file."""
+        with self._lock:
+            size = 0
+
+            for (start, end), written in zip(self._segments, self._written):
+                size += written
+
+                if written != end - start + 1:
+                    break
+
+            return size
+
+    def run(self, progress, checksum=None):
+        """Download the file.
+
+        The checksum is updated with the downloaded data in
+        the right order while the segments are downloaded.
+
+        :param progress: an instance of DownloadProgress
+        :param checksum: a hashlib object or None
+        :raise RequestException: if the download fails
+        """
+        with open(self._path, "wb") as f:
+            f.truncate(self._total_size)
+
+        fd = os.open(self._path, os.O_RDWR)
+        checked_size = 0
+
+        executor = ThreadPoolExecutor(len(self._segments), thread_name_prefix="AnaImageDownload")
+
+        try:
+            pending = [
+                executor.submit(self._download_segment, fd, index)
+                for index in range(len(self._segments))
+            ]
+
+            while pending:
+                done, pending = wait(pending, PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+
+                for future in done:
+                    future.result()
+
+                progress.update(self.downloaded_size)
+
+                if checksum is not None:
+                    checked_size = self._update_checksum(fd, checksum, checked_size)
+
+        except BaseException:
+            self._cancelled.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            os.close(fd)
+
+    def _download_segment(self, fd, index):
+        """Download the specified segment.
+
+        If the download of the segment fails, wait a bit
+        and resume it from the last written byte.
+
+        :param int fd: a file descriptor of the downloaded file
+        :param int index: an index of the segment
+        """
+        start, end = self._segments[index]
+        xdelay = xprogressive_delay()
+        retries = 0
+
+        while not self._cancelled.is_set():
+            try:
+                self._download_range(fd, index)
+                return
+            except RequestException as e:
+                if retries >= self._retries:
+                    raise
+
+                retries += 1
+                log.warning(
+                    "Failed to download the segment %d-%d (attempt %d/%d): %s",
+                    start, end, retries, self._retries, e
+                )
+
+                self._cancelled.wait(next(xdelay))
+
+    def _download_range(self, fd, index):
+        """Download the rest of the specified segment.
+
+        :param int fd: a file descriptor of the downloaded file
+        :param int index: an index of the segment
+        """
+        start, end = self._segments[index]
+
+        with self._lock:
+            offset = start + self._written[index]
+
+        if offset > end:
+            return
+
+        headers = {"Range": "bytes={}-{}".format(offset, end)}
+
+        with self._downloader(headers) as response:
+            if response.status_code != 206:
+                raise RequestException(
+                    "Unexpected response to a ranged request: {}".format(response.status_code)
+                )
+
+            for data in response.iter_content(CHUNK_SIZE):
+                if self._cancelled.is_set():
+                    return
+
+                if not data:
+                    continue
+
+                if offset + len(data) > end + 1:
+                    raise RequestException("The segment {}-{} is too long.".format(start, end))
+
+                self._write_data(fd, data, offset)
+                offset += len(data)
+
+                with self._lock:
+                    self._written[index] = offset - start
+
+        if offset != end + 1:
+            raise RequestException("The segment {}-{} is incomplete.".format(start, end))
+
+    @staticmethod
+    def _write_data(fd, data, offset):
+        """Write the data at the specified offset."""
+        view = memoryview(data)
+
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+
+    def _update_checksum(self, fd, checksum, checked_size):
+        """Update the checksum with the downloaded data.
+
+        The data are read back from the file, so they are
+        most likely still available in the page cache.
+
+        :return: a new number of checked bytes
+        """
+        contiguous_size = self.contiguous_size
+
+        while checked_size < contiguous_size:
+            size = min(CHUNK_SIZE, contiguous_size - checked_size)
+            data = os.pread(fd, size, checked_size)
+
+            if not data:
+                break
+
+            checksum.update(data)
+            checked_size += len(data)
+
+        return checked_size
@@ -71,16 +71,17 @@ class InstallLiveImageTask(Task):
             configuration=self._configuration,
             download_path=self._download_path
         )
-        image_path = self._run_task(task)
+        result = self._run_task(task)
 
         task = VerifyImageChecksumTask(
             configuration=self._configuration,
-            image_path=image_path
+            image_path=result.image_path,
+            calculated_checksum=result.checksum
         )
         self._run_task(task)
 
         task = MountImageTask(
-            image_path=image_path,
+            image_path=result.image_path,
             image_mount_point=self._image_mount_point,
             iso_mount_point=self._iso_mount_point,
         )
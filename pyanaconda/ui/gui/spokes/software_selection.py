@@ -34,7 +34,7 @@ from pyanaconda.ui.gui.spokes.lib.software_selection import GroupListBoxRow, Sep
     EnvironmentListBoxRow
 from pyanaconda.ui.gui.utils import escape_markup
 from pyanaconda.ui.lib.software import SoftwareSelectionCache, get_software_selection_status, \
-    is_software_selection_complete, get_group_data, get_environment_data
+    is_software_selection_complete
 from pyanaconda.ui.lib.subscription import is_cdn_registration_required
 from pyanaconda.ui.lib.software import FEATURE_64K, KernelFeatures, get_kernel_from_properties, \
     get_available_kernel_features, get_kernel_titles_and_descriptions
@@ -262,7 +262,7 @@ class SoftwareSelectionSpoke(NormalSpoke):
 
         for environment in self._selection_cache.available_environments:
             # Get the environment data.
-            data = get_environment_data(self.payload.proxy, environment)
+            data = self._selection_cache.get_environment_data(environment)
             selected = self._selection_cache.is_environment_selected(environment)
 
             # Add a new environment row.
@@ -277,9 +277,8 @@ class SoftwareSelectionSpoke(NormalSpoke):
 
         if self._selection_cache.environment:
             # Get the environment data.
-            environment_data = get_environment_data(
-                dnf_proxy=self.payload.proxy,
-                environment_name=self._selection_cache.environment,
+            environment_data = self._selection_cache.get_environment_data(
+                self._selection_cache.environment
             )
 
             # Add all optional groups.
@@ -302,7 +301,7 @@ class SoftwareSelectionSpoke(NormalSpoke):
     def _add_group_row(self, group):
         """Add a new row for the specified group."""
         # Get the group data.
-        data = get_group_data(self.payload.proxy, group)
+        data = self._selection_cache.get_group_data(group)
         selected = self._selection_cache.is_group_selected(group)
 
         # Add a new group row.
@@ -28,30 +28,6 @@ log = get_module_logger(__name__)
 FEATURE_64K = "64k"
 KernelFeatures = namedtuple("KernelFeatures", ["page_size_64k"])
 
-def get_environment_data(dnf_proxy, environment_name):
-    """Get the environment data.
-
-    :param dnf_proxy: a proxy of the DNF payload
-    :param environment_name: an environment name
-    :return CompsEnvironmentData: an environment data
-    """
-    return CompsEnvironmentData.from_structure(
-        dnf_proxy.GetEnvironmentData(environment_name)
-    )
-
-
-def get_group_data(dnf_proxy, group_name):
-    """Get the group data.
-
-    :param dnf_proxy: a proxy of the DNF payload
-    :param group_name: a group name
-    :return CompsGroupData: a group data
-    """
-    return CompsGroupData.from_structure(
-        dnf_proxy.GetGroupData(group_name)
-    )
-
-
 def is_software_selection_complete(dnf_proxy, selection, kickstarted=False):
     """Check the completeness of the software selection.
 
@@ -156,6 +132,8 @@ class SoftwareSelectionCache(object):
         :param dnf_proxy: a proxy of the DNF payload
         """
         self._dnf_proxy = dnf_proxy
+        self._environments_data = None
+        self._groups_data = None
         self._environment = ""
         self._available_groups = set()
         self._default_groups = set()
@@ -194,6 +172,52 @@ class SoftwareSelectionCache(object):
         """
         return sorted(self._available_groups)
 
+    def get_environment_data(self, environment):
+        """Get the data of the specified environment.
+
+        The data of all environments are requested at once
+        and kept in the cache.
+
+        :param str environment: an identifier of an environment
+        :return CompsEnvironmentData: an environment data
+        """
+        if self._environments_data is None:
+            self._environments_data = {
+                data.id: data for data in CompsEnvironmentData.from_structure_list(
+                    self._dnf_proxy.GetEnvironmentsData()
+                )
+            }
+
+        if environment in self._environments_data:
+            return self._environments_data[environment]
+
+        return CompsEnvironmentData.from_structure(
+            self._dnf_proxy.GetEnvironmentData(environment)
+        )
+
+    def get_group_data(self, group):
+        """Get the data of the specified group.
+
+        The data of all groups are requested at once
+        and kept in the cache.
+
+        :param str group: an identifier of a group
+        :return CompsGroupData: a group data
+        """
+        if self._groups_data is None:
+            self._groups_data = {
+                data.id: data for data in CompsGroupData.from_structure_list(
+                    self._dnf_proxy.GetGroupsData()
+                )
+            }
+
+        if group in self._groups_data:
+            return self._groups_data[group]
+
+        return CompsGroupData.from_structure(
+            self._dnf_proxy.GetGroupData(group)
+        )
+
     def select_environment(self, environment):
         """Select the specified environment.
 
@@ -211,9 +235,7 @@ class SoftwareSelectionCache(object):
             return
 
         # Get the environment data.
-        environment_data = CompsEnvironmentData.from_structure(
-            self._dnf_proxy.GetEnvironmentData(environment)
-        )
+        environment_data = self.get_environment_data(environment)
 
         # Select the environment.
         self._environment = environment_data.id
@@ -240,9 +262,7 @@ class SoftwareSelectionCache(object):
         log.debug("Selecting the '%s' group.", group)
 
         # Get the group data.
-        group_data = CompsGroupData.from_structure(
-            self._dnf_proxy.GetGroupData(group)
-        )
+        group_data = self.get_group_data(group)
 
         # Remove the group from the deselected groups.
         self._deselected_groups.discard(group_data.id)
@@ -259,9 +279,7 @@ class SoftwareSelectionCache(object):
         log.debug("Deselecting the '%s' group.", group)
 
         # Get the group data.
-        group_data = CompsGroupData.from_structure(
-            self._dnf_proxy.GetGroupData(group)
-        )
+        group_data = self.get_group_data(group)
 
         # Add the group to the deselected groups. We don't need
         # to remove the group from selected or default groups,
@@ -20,7 +20,7 @@ from pyanaconda.flags import flags
 from pyanaconda.ui.categories.software import SoftwareCategory
 from pyanaconda.ui.context import context
 from pyanaconda.ui.lib.software import get_software_selection_status, \
-    is_software_selection_complete, SoftwareSelectionCache, get_group_data, get_environment_data
+    is_software_selection_complete, SoftwareSelectionCache
 from pyanaconda.ui.tui.spokes import NormalTUISpoke
 from pyanaconda.core.threads import thread_manager
 from pyanaconda.ui.lib.software import FEATURE_64K, KernelFeatures, \
@@ -221,7 +221,7 @@ class SoftwareSpoke(NormalTUISpoke):
         )
 
         for environment in self._selection_cache.available_environments:
-            data = get_environment_data(self.payload.proxy, environment)
+            data = self._selection_cache.get_environment_data(environment)
             selected = self._selection_cache.is_environment_selected(environment)
 
             widget = CheckboxWidget(
@@ -337,7 +337,7 @@ class AdditionalSoftwareSpoke(NormalTUISpoke):
         )
 
         for group in self._selection_cache.available_groups:
-            data = get_group_data(self.payload.proxy, group)
+            data = self._selection_cache.get_group_data(group)
             selected = self._selection_cache.is_group_selected(group)
 
             widget = CheckboxWidget(
@@ -0,0 +1,251 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+"""Benchmarks of the DNF payload with synthetic repositories.
+
+Generate a synthetic repository, run the main operations of the
+DNF payload with it and write the measured times into a JSON file.
+Optionally, compare the results with a baseline and fail if some
+of the operations got slower.
+
+The benchmarks use the DNF cache of the installation environment,
+so don't run them on a running installer. Example:
+
+    python3 -m tests.benchmark_tests.dnf_benchmark --packages 5000 --output results.json
+
+    python3 -m tests.benchmark_tests.dnf_benchmark --packages 5000 --baseline results.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+from pyanaconda.modules.common.structures.packages import PackagesConfigurationData
+from pyanaconda.modules.common.structures.payload import RepoConfigurationData
+from pyanaconda.modules.payloads.constants import SourceType
+from pyanaconda.modules.payloads.payload.dnf.initialization import SetUpDNFSourcesTask
+from pyanaconda.modules.payloads.source.factory import SourceFactory
+from tests.benchmark_tests.synthetic_repository import SyntheticRepository
+
+__all__ = ["DNFBenchmark"]
+
+
+class DNFBenchmark(object):
+    """The benchmark of the DNF payload."""
+
+    def __init__(self, repository, repeat=3):
+        """Create a new benchmark.
+
+        :param SyntheticRepository repository: a generator of the repository
+        :param int repeat: a number of runs of every operation
+        """
+        self._repository = repository
+        self._repeat = repeat
+        self._results = {}
+        self._dnf_manager = None
+
+    def run(self, path):
+        """Run the benchmark with a repository at the specified path.
+
+        :param str path: a path to the repository
+        :return: a dictionary with results
+        """
+        start = time.perf_counter()
+        self._repository.create(path)
+        self._results = {"create_repository": [time.perf_counter() - start]}
+
+        self._measure("set_up_sources", self._set_up_sources, path)
+        self._measure("load_packages_metadata", self._dnf_manager.load_packages_metadata)
+        self._measure("get_environment_data", self._get_environment_data)
+        self._measure("get_environments_data", self._dnf_manager.get_environments_data,
+                      reset=self._drop_comps_data)
+        self._measure("resolve_selection", self._resolve_selection)
+        self._measure("get_installation_size", self._dnf_manager.get_installation_size,
+                      reset=self._drop_installation_size)
+        self._measure("get_download_size", self._dnf_manager.get_download_size)
+
+        return {
+            "parameters": dict(self._repository.parameters, repeat=self._repeat),
+            "results": {
+                name: self._summarize(durations)
+                for name, durations in self._results.items()
+            },
+        }
+
+    def _measure(self, name, function, *args, reset=None):
+        """Measure durations of the specified function.
+
+        The reset function is called before every run and it isn't
+        measured. Use it to drop caches of the measured function,
+        so all runs take the uncached code path.
+        """
+        durations = []
+
+        for _ in range(self._repeat):
+            if reset:
+                reset()
+
+            start = time.perf_counter()
+            function(*args)
+            durations.append(time.perf_counter() - start)
+
+        self._results[name] = durations
+
+    @staticmethod
+    def _summarize(durations):
+        """Summarize the measured durations."""
+        return {
+            "runs": [round(d, 6) for d in durations],
+            "min": round(min(durations), 6),
+            "median": round(statistics.median(durations), 6),
+            "max": round(max(durations), 6),
+        }
+
+    def _set_up_sources(self, path):
+        """Set up the DNF sources with the repository."""
+        configuration = RepoConfigurationData()
+        configuration.url = "file://" + path
+
+        source = SourceFactory.create_source(SourceType.URL)
+        source.set_configuration(configuration)
+
+        task = SetUpDNFSourcesTask(
+            sources=[source],
+            repositories=[],
+            configuration=PackagesConfigurationData(),
+        )
+
+        result = task.run()
+
+        if self._dnf_manager:
+            self._dnf_manager.reset_base()
+
+        self._dnf_manager = result.dnf_manager
+
+    def _drop_comps_data(self):
+        """Drop the cached data of environments and groups."""
+        self._dnf_manager._comps_data = None
+
+    def _drop_installation_size(self):
+        """Drop the cached installation size and numbers of files."""
+        self._dnf_manager._installation_size = (None, None)
+        self._dnf_manager._files_numbers = {}
+
+    def _get_environment_data(self):
+        """Get data of all environments."""
+        for environment in self._dnf_manager.environments:
+            self._dnf_manager.get_environment_data(environment)
+
+    def _resolve_selection(self):
+        """Resolve a selection with an environment and modules."""
+        include_list = ["@^" + self._repository.environment_ids[0]]
+        include_list.extend("@" + name for name in self._repository.module_names)
+
+        self._dnf_manager.clear_selection()
+        self._dnf_manager.apply_specs(include_list, [])
+        self._dnf_manager.resolve_selection()
+
+
+def compare_results(results, baseline, threshold):
+    """Compare the results with a baseline.
+
+    :param dict results: the current results
+    :param dict baseline: the baseline results
+    :param float threshold: an allowed relative slowdown
+    :return: a list of messages about regressions
+    """
+    regressions = []
+
+    for name, result in results["results"].items():
+        expected = baseline["results"].get(name)
+
+        if not expected:
+            continue
+
+        limit = expected["median"] * (1 + threshold)
+
+        if result["median"] > limit:
+            regressions.append("{}: {:.3f}s > {:.3f}s".format(name, result["median"], limit))
+
+    return regressions
+
+
+def parse_arguments(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmarks of the DNF payload.")
+    parser.add_argument("--packages", type=int, default=1000,
+                        help="a number of packages")
+    parser.add_argument("--groups", type=int, default=20,
+                        help="a number of groups")
+    parser.add_argument("--environments", type=int, default=4,
+                        help="a number of environments")
+    parser.add_argument("--modules", type=int, default=2,
+                        help="a number of modules")
+    parser.add_argument("--files", type=int, default=10,
+                        help="a number of files per package")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="a number of runs of every operation")
+    parser.add_argument("--output", default="-",
+                        help="a path to the JSON file with results")
+    parser.add_argument("--baseline",
+                        help="a path to the JSON file with baseline results")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="an allowed relative slowdown against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark."""
+    args = parse_arguments(argv)
+
+    repository = SyntheticRepository(
+        packages=args.packages,
+        groups=args.groups,
+        environments=args.environments,
+        modules=args.modules,
+        files=args.files,
+    )
+
+    with TemporaryDirectory() as path:
+        results = DNFBenchmark(repository, repeat=args.repeat).run(path)
+
+    output = json.dumps(results, indent=4, sort_keys=True)
+
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+
+    regressions = compare_results(results, baseline, args.threshold)
+
+    for message in regressions:
+        print("Regression of {}".format(message), file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import gzip
+import hashlib
+import os
+from xml.sax.saxutils import escape
+
+__all__ = ["SyntheticRepository"]
+
+PACKAGE_NAME = "bench-package-{:05d}"
+GROUP_ID = "bench-group-{:03d}"
+ENVIRONMENT_ID = "bench-environment-{:02d}"
+MODULE_NAME = "bench-module-{:02d}"
+MODULE_PACKAGE_NAME = "bench-module-{:02d}-package-{:02d}"
+
+
+class SyntheticRepository(object):
+    """A generator of synthetic repositories.
+
+    The generated repository contains only metadata. There are
+    no RPM files, so it can be used to measure everything up to
+    the download of packages.
+
+    Every package requires the package with the half of its index,
+    so the dependencies form a binary tree. Groups contain every
+    n-th package and environments contain every n-th group.
+    """
+
+    def __init__(self, packages=1000, groups=20, environments=4, modules=2,
+                 files=10, module_packages=5):
+        """Create a new generator.
+
+        :param int packages: a number of packages
+        :param int groups: a number of groups
+        :param int environments: a number of environments
+        :param int modules: a number of modules
+        :param int files: a number of files per package
+        :param int module_packages: a number of packages per module
+        """
+        self.packages = packages
+        self.groups = groups
+        self.environments = environments
+        self.modules = modules
+        self.files = files
+        self.module_packages = module_packages
+
+    @property
+    def parameters(self):
+        """The parameters of the repository."""
+        return {
+            "packages": self.packages,
+            "groups": self.groups,
+            "environments": self.environments,
+            "modules": self.modules,
+            "files": self.files,
+            "module_packages": self.module_packages,
+        }
+
+    @property
+    def environment_ids(self):
+        """Identifiers of the generated environments."""
+        return [ENVIRONMENT_ID.format(i) for i in range(self.environments)]
+
+    @property
+    def module_names(self):
+        """Names of the generated modules."""
+        return [MODULE_NAME.format(i) for i in range(self.modules)]
+
+    def create(self, path):
+        """Create the repository at the specified path.
+
+        :param str path: a path to the repository
+        """
+        repodata = os.path.join(path, "repodata")
+        os.makedirs(repodata, exist_ok=True)
+
+        packages = list(self._generate_packages())
+        records = [
+            self._write_data(repodata, "primary", "primary.xml.gz", self._get_primary(packages)),
+            self._write_data(repodata, "filelists", "filelists.xml.gz", self._get_filelists(packages)),
+            self._write_data(repodata, "other", "other.xml.gz", self._get_other(packages)),
+            self._write_data(repodata, "group", "comps.xml", self._get_comps()),
+        ]
+
+        if self.modules:
+            records.append(
+                self._write_data(repodata, "modules", "modules.yaml.gz", self._get_modules())
+            )
+
+        with open(os.path.join(repodata, "repomd.xml"), "w") as f:
+            f.write(self._get_repomd(records))
+
+    def _generate_packages(self):
+        """Generate descriptions of packages.
+
+        :return: a generator of tuples (name, checksum, requires, size)
+        """
+        for i in range(self.packages):
+            name = PACKAGE_NAME.format(i)
+            requires = [PACKAGE_NAME.format(i // 2)] if i else []
+            yield name, self._get_checksum(name), requires, 1024 * (1 + i % 100)
+
+        for m in range(self.modules):
+            for p in range(self.module_packages):
+                name = MODULE_PACKAGE_NAME.format(m, p)
+                requires = [PACKAGE_NAME.format(p)] if self.packages > p else []
+                yield name, self._get_checksum(name), requires, 2048
+
+    @staticmethod
+    def _get_checksum(name):
+        """Get a fake checksum of a package."""
+        return hashlib.sha256(name.encode()).hexdigest()
+
+    def _get_primary(self, packages):
+        """Get the content of the primary.xml file."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<metadata xmlns="http://linux.duke.edu/metadata/common" '
+            'xmlns:rpm="http://linux.duke.edu/metadata/rpm" packages="{}">'.format(len(packages)),
+        ]
+
+        for name, checksum, requires, size in packages:
+            lines.append('<package type="rpm">')
+            lines.append('<name>{}</name>'.format(name))
+            lines.append('<arch>noarch</arch>')
+            lines.append('<version epoch="0" ver="1.0" rel="1"/>')
+            lines.append('<checksum type="sha256" pkgid="YES">{}</checksum>'.format(checksum))
+            lines.append('<summary>Synthetic package {}</summary>'.format(name))
+            lines.append('<description>Synthetic package for benchmarks.</description>')
+            lines.append('<packager/><url/>')
+            lines.append('<time file="1" build="1"/>')
+            lines.append('<size package="{0}" installed="{1}" archive="{1}"/>'.format(
+                size, size * 4
+            ))
+            lines.append('<location href="Packages/{}-1.0-1.noarch.rpm"/>'.format(name))
+            lines.append('<format>')
+            lines.append('<rpm:license>MIT</rpm:license>')
+            lines.append('<rpm:vendor/>')
+            lines.append('<rpm:group>Unspecified</rpm:group>')
+            lines.append('<rpm:buildhost>localhost</rpm:buildhost>')
+            lines.append('<rpm:sourcerpm>{}-1.0-1.src.rpm</rpm:sourcerpm>'.format(name))
+            lines.append('<rpm:header-range start="0" end="1"/>')
+            lines.append('<rpm:provides>')
+            lines.append('<rpm:entry name="{}" flags="EQ" epoch="0" ver="1.0" rel="1"/>'.format(
+                name
+            ))
+            lines.append('</rpm:provides>')
+
+            if requires:
+                lines.append('<rpm:requires>')
+                lines.extend('<rpm:entry name="{}"/>'.format(r) for r in requires)
+                lines.append('</rpm:requires>')
+
+            lines.append('</format>')
+            lines.append('</package>')
+
+        lines.append('</metadata>')
+        return "\n".join(lines)
+
+    def _get_filelists(self, packages):
+        """Get the content of the filelists.xml file."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<filelists xmlns="http://linux.duke.edu/metadata/filelists" '
+            'packages="{}">'.format(len(packages)),
+        ]
+
+        for name, checksum, _requires, _size in packages:
+            lines.append('<package pkgid="{}" name="{}" arch="noarch">'.format(checksum, name))
+            lines.append('<version epoch="0" ver="1.0" rel="1"/>')
+            lines.extend(
+                '<file>/usr/share/{}/file-{}</file>'.format(name, i)
+                for i in range(self.files)
+            )
+            lines.append('</package>')
+
+        lines.append('</filelists>')
+        return "\n".join(lines)
+
+    @staticmethod
+    def _get_other(packages):
+        """Get the content of the other.xml file."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<otherdata xmlns="http://linux.duke.edu/metadata/other" '
+            'packages="{}">'.format(len(packages)),
+        ]
+
+        for name, checksum, _requires, _size in packages:
+            lines.append('<package pkgid="{}" name="{}" arch="noarch">'.format(checksum, name))
+            lines.append('<version epoch="0" ver="1.0" rel="1"/>')
+            lines.append('</package>')
+
+        lines.append('</otherdata>')
+        return "\n".join(lines)
+
+    def _get_comps(self):
+        """Get the content of the comps.xml file."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<!DOCTYPE comps PUBLIC "-//Red Hat, Inc.//DTD Comps info//EN" "comps.dtd">',
+            '<comps>',
+        ]
+
+        for g in range(self.groups):
+            lines.append('<group>')
+            lines.append('<id>{}</id>'.format(GROUP_ID.format(g)))
+            lines.append('<name>{}</name>'.format(escape("Group {}".format(g))))
+            lines.append('<description>Synthetic group for benchmarks.</description>')
+            lines.append('<default>false</default>')
+            lines.append('<uservisible>true</uservisible>')
+            lines.append('<packagelist>')
+            lines.extend(
+                '<packagereq type="{}">{}</packagereq>'.format(
+                    "mandatory" if i % 3 else "optional",
+                    PACKAGE_NAME.format(i)
+                )
+                for i in range(g, self.packages, self.groups)
+            )
+            lines.append('</packagelist>')
+            lines.append('</group>')
+
+        for e in range(self.environments):
+            lines.append('<environment>')
+            lines.append('<id>{}</id>'.format(ENVIRONMENT_ID.format(e)))
+            lines.append('<name>{}</name>'.format(escape("Environment {}".format(e))))
+            lines.append('<description>Synthetic environment for benchmarks.</description>')
+            lines.append('<display_order>{}</display_order>'.format(e))
+            lines.append('<grouplist>')
+            lines.extend(
+                '<groupid>{}</groupid>'.format(GROUP_ID.format(g))
+                for g in range(e, self.groups, self.environments)
+            )
+            lines.append('</grouplist>')
+            lines.append('<optionlist>')
+            lines.extend(
+                '<groupid>{}</groupid>'.format(GROUP_ID.format(g))
+                for g in range(self.groups)
+                if g % self.environments != e
+            )
+            lines.append('</optionlist>')
+            lines.append('</environment>')
+
+        lines.append('</comps>')
+        return "\n".join(lines)
+
+    def _get_modules(self):
+        """Get the content of the modules.yaml file."""
+        documents = []
+
+        for m in range(self.modules):
+            name = MODULE_NAME.format(m)
+            packages = [MODULE_PACKAGE_NAME.format(m, p) for p in range(self.module_packages)]
+
+            documents.append("\n".join([
+                "---",
+                "document: modulemd",
+                "version: 2",
+                "data:",
+                "  name: {}".format(name),
+                "  stream: \"1\"",
+                "  version: 1",
+                "  context: \"00000000\"",
+                "  arch: noarch",
+                "  summary: Synthetic module",
+                "  description: Synthetic module for benchmarks.",
+                "  license:",
+                "    module: [MIT]",
+                "  profiles:",
+                "    default:",
+                "      rpms: [{}]".format(", ".join(packages)),
+                "  artifacts:",
+                "    rpms:",
+                *["    - {}-0:1.0-1.noarch".format(p) for p in packages],
+                "...",
+                "---",
+                "document: modulemd-defaults",
+                "version: 1",
+                "data:",
+                "  module: {}".format(name),
+                "  stream: \"1\"",
+                "  profiles:",
+                "    \"1\": [default]",
+                "...",
+            ]))
+
+        return "\n".join(documents) + "\n"
+
+    @staticmethod
+    def _write_data(repodata, data_type, file_name, content):
+        """Write a metadata file.
+
+        :return: a tuple with the record for the repomd.xml file
+        """
+        raw = content.encode("utf-8")
+        data = gzip.compress(raw, mtime=0) if file_name.endswith(".gz") else raw
+
+        with open(os.path.join(repodata, file_name), "wb") as f:
+            f.write(data)
+
+        return (
+            data_type,
+            file_name,
+            hashlib.sha256(data).hexdigest(),
+            len(data),
+            hashlib.sha256(raw).hexdigest(),
+            len(raw),
+        )
+
+    @staticmethod
+    def _get_repomd(records):
+        """Get the content of the repomd.xml file."""
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<repomd xmlns="http://linux.duke.edu/metadata/repo" '
+            'xmlns:rpm="http://linux.duke.edu/metadata/rpm">',
+            '<revision>1</revision>',
+        ]
+
+        for data_type, file_name, checksum, size, open_checksum, open_size in records:
+            lines.append('<data type="{}">'.format(data_type))
+            lines.append('<checksum type="sha256">{}</checksum>'.format(checksum))
+
+            if file_name.endswith(".gz"):
+                lines.append('<open-checksum type="sha256">{}</open-checksum>'.format(
+                    open_checksum
+                ))
+
+            lines.append('<location href="repodata/{}"/>'.format(file_name))
+            lines.append('<timestamp>1</timestamp>')
+            lines.append('<size>{}</size>'.format(size))
+
+            if file_name.endswith(".gz"):
+                lines.append('<open-size>{}</open-size>'.format(open_size))
+
+            lines.append('</data>')
+
+        lines.append('</repomd>')
+        return "\n".join(lines) + "\n"
@@ -38,7 +38,7 @@ from pyanaconda.core.configuration.ui import UserInterfaceSection
 from pyanaconda.modules.common.constants import services, namespaces
 from pyanaconda.core.constants import SOURCE_TYPE_CLOSEST_MIRROR, GEOLOC_DEFAULT_PROVIDER, \
     GEOLOC_PROVIDER_FEDORA_GEOIP, GEOLOC_PROVIDER_HOSTIP, GEOLOC_URL_FEDORA_GEOIP, \
-    GEOLOC_URL_HOSTIP
+    GEOLOC_URL_HOSTIP, DNF_DEFAULT_PARALLEL_DOWNLOADS, DNF_ADAPTIVE_PARALLEL_DOWNLOADS
 
 # Path to the configuration directory of the repo.
 CONFIG_DIR = os.environ.get("ANACONDA_DATA")
@@ -486,6 +486,107 @@ class AnacondaConfigurationTestCase(unittest.TestCase):
             convert("""test remote
             test URL""")
 
+    def test_fastest_mirror(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.fastest_mirror is False
+
+        conf.payload._set_option("fastest_mirror", True)
+        assert conf.payload.fastest_mirror is True
+
+    def test_default_parallel_downloads(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.max_parallel_downloads == DNF_DEFAULT_PARALLEL_DOWNLOADS
+        assert conf.payload.download_throttle == ""
+
+    def test_default_installation_chunk_size(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.installation_chunk_size is None
+
+    def test_transaction_start_method(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.transaction_start_method == "fork"
+
+        conf.payload._set_option("transaction_start_method", "spawn")
+        assert conf.payload.transaction_start_method == "spawn"
+
+        conf.payload._set_option("transaction_start_method", "invalid")
+
+        with pytest.raises(ValueError):
+            _ = conf.payload.transaction_start_method
+
+    def test_metadata_cache(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.metadata_cache == ""
+
+        conf.payload._set_option("metadata_cache", "/var/cache/anaconda")
+        assert conf.payload.metadata_cache == "/var/cache/anaconda"
+
+    def test_image_download_segments(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.image_download_segments == 1
+
+        convert = PayloadSection._convert_download_segments
+        assert convert("1") == 1
+        assert convert("8") == 8
+
+        with pytest.raises(ValueError):
+            convert("0")
+
+        with pytest.raises(ValueError):
+            convert("-1")
+
+        with pytest.raises(ValueError):
+            convert("many")
+
+    def test_image_copy_method(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.image_copy_method == "rsync"
+
+        conf.payload._set_option("image_copy_method", "parallel")
+        assert conf.payload.image_copy_method == "parallel"
+
+        conf.payload._set_option("image_copy_method", "invalid")
+
+        with pytest.raises(ValueError):
+            _ = conf.payload.image_copy_method
+
+    def test_image_block_deployment(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.image_block_deployment is False
+
+    def test_stream_remote_tarballs(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.stream_remote_tarballs is False
+
+    def test_convert_chunk_size(self):
+        convert = PayloadSection._convert_chunk_size
+
+        assert convert("") is None
+        assert convert("500 MiB") == Size("500 MiB")
+
+    def test_convert_parallel_downloads(self):
+        convert = PayloadSection._convert_parallel_downloads
+
+        assert convert("") == DNF_DEFAULT_PARALLEL_DOWNLOADS
+        assert convert("adaptive") == DNF_ADAPTIVE_PARALLEL_DOWNLOADS
+        assert convert("10") == 10
+        assert convert("20") == 20
+
+        with self.assertLogs(level="WARNING") as cm:
+            assert convert("50") == 20
+
+        msg = "The number of parallel downloads 50 is limited to 20."
+        assert any(map(lambda x: msg in x, cm.output))
+
+        with pytest.raises(ValueError):
+            convert("0")
+
+        with pytest.raises(ValueError):
+            convert("-1")
+
+        with pytest.raises(ValueError):
+            convert("fast")
+
     def test_default_password_policies(self):
         conf = AnacondaConfiguration.from_defaults()
         assert conf.ui.password_policies == [
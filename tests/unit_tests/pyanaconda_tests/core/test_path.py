@@ -21,7 +21,7 @@ import unittest
 from unittest.mock import patch, call
 import pytest
 from pyanaconda.core.path import set_system_root, make_directories, get_mount_paths, \
-    open_with_perm, join_paths, touch, set_mode
+    open_with_perm, join_paths, touch, set_mode, clone_file
 
 
 class SetSystemRootTests(unittest.TestCase):
@@ -257,3 +257,34 @@ class MiscTests(unittest.TestCase):
             assert os.stat(file_path).st_mode == 0o100744
         finally:
             shutil.rmtree(test_dir)
+
+    def test_clone_file(self):
+        """Test the clone_file function."""
+        with tempfile.TemporaryDirectory() as test_dir:
+            source = os.path.join(test_dir, "source")
+
+            with open(source, "w") as f:
+                f.write("content")
+
+            # Create a hard link.
+            target = os.path.join(test_dir, "target_1")
+            assert clone_file(source, target) == "hardlink"
+            assert os.path.samefile(source, target)
+
+            # Create a reflink or a copy.
+            target = os.path.join(test_dir, "target_2")
+            assert clone_file(source, target, hardlink=False) in ("reflink", "copy")
+            assert not os.path.samefile(source, target)
+
+            with open(target, "r") as f:
+                assert f.read() == "content"
+
+            # Create a copy.
+            target = os.path.join(test_dir, "target_3")
+
+            with patch("pyanaconda.core.path.fcntl.ioctl", side_effect=OSError):
+                assert clone_file(source, target, hardlink=False) == "copy"
+
+            with open(target, "r") as f:
+                assert f.read() == "content"
+
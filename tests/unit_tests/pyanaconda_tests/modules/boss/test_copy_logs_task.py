@@ -45,8 +45,8 @@ class CopyLogsTaskTest(unittest.TestCase):
         mkdir_mock.assert_called_once_with("/somewhere/var/log/anaconda/")
 
         for logfile in ["anaconda.log", "syslog", "X.log", "program.log", "packaging.log",
-                        "storage.log", "ifcfg.log", "lvm.log", "dnf.librepo.log", "hawkey.log",
-                        "dbus.log"]:
+                        "storage.log", "ifcfg.log", "lvm.log", "dnf.librepo.log", "dnf.timing.jsonl",
+                        "hawkey.log", "dbus.log"]:
             copy_file_mock.assert_any_call(
                 "/tmp/"+logfile,
                 "/var/log/anaconda/" + logfile
@@ -128,6 +128,39 @@ class SetUpDNFSourcesTaskTestCase(unittest.TestCase):
             # There is only the base repository configured.
             assert dnf_manager.enabled_repositories == ["anaconda"]
 
+    def test_reuse_metadata(self):
+        """Set up a valid source with metadata of a previous DNF manager."""
+        with TemporaryDirectory() as path:
+            self._create_repository(path)
+
+            def _create_source():
+                source = SourceFactory.create_source(SourceType.URL)
+                configuration = RepoConfigurationData()
+                configuration.url = "file://" + path
+                source.set_configuration(configuration)
+                return source
+
+            result = self._run_task(_create_source())
+            previous = result.dnf_manager
+            assert previous.loaded_metadata
+
+            previous.reset_base()
+
+            task = SetUpDNFSourcesTask(
+                configuration=PackagesConfigurationData(),
+                sources=[_create_source()],
+                repositories=[],
+                dnf_manager=previous,
+            )
+
+            with self.assertLogs(level="INFO") as cm:
+                result = task.run()
+
+            msg = "Reusing loaded metadata of repositories: anaconda"
+            assert any(map(lambda x: msg in x, cm.output))
+            assert result.dnf_manager.enabled_repositories == ["anaconda"]
+            assert result.dnf_manager.loaded_metadata
+
     def test_source_proxy(self):
         """Set up a valid source with a proxy."""
         with TemporaryDirectory() as path:
@@ -197,12 +230,70 @@ class SetUpDNFSourcesTaskTestCase(unittest.TestCase):
             repository.name = "test"
             repository.url = "file://" + path
 
+            task = SetUpDNFSourcesTask(
+                configuration=PackagesConfigurationData(),
+                sources=[source],
+                repositories=[repository],
+            )
+
+            callback = Mock()
+            task.progress_changed_signal.connect(callback)
+
             with pytest.raises(SourceSetupError) as cm:
-                self._run_task(source, [repository])
+                task.run()
 
             msg = "Failed to add the 'test' repository:"
             assert str(cm.value).startswith(msg)
 
+            # The failed repository is reported.
+            messages = [c.args[1] for c in callback.call_args_list]
+            assert any(m.startswith(
+                "Failed to download metadata of the 'test' repository"
+            ) for m in messages)
+
+    def test_multiple_repositories(self):
+        """Set up multiple additional repositories."""
+        with TemporaryDirectory() as path:
+            source = SourceFactory.create_source(
+                SourceType.CLOSEST_MIRROR
+            )
+
+            repositories = []
+
+            for name in ["r1", "r2", "r3", "r4"]:
+                self._create_repository(path, name)
+
+                repository = RepoConfigurationData()
+                repository.name = name
+                repository.url = "file://{}/{}".format(path, name)
+                repositories.append(repository)
+
+            task = SetUpDNFSourcesTask(
+                configuration=PackagesConfigurationData(),
+                sources=[source],
+                repositories=repositories,
+            )
+
+            callback = Mock()
+            task.progress_changed_signal.connect(callback)
+            result = task.run()
+
+            dnf_manager = result.dnf_manager
+            # All additional repositories are configured.
+            for name in ["r1", "r2", "r3", "r4"]:
+                assert name in dnf_manager.enabled_repositories
+
+            # The progress is reported for every repository.
+            messages = [c.args[1] for c in callback.call_args_list]
+            total = len(dnf_manager.enabled_repositories)
+
+            for name in ["r1", "r2", "r3", "r4"]:
+                assert any(m.startswith(
+                    "Downloaded metadata of the '{}' repository".format(name)
+                ) for m in messages)
+
+            assert any(m.endswith("({}/{}).".format(total, total)) for m in messages)
+
     def test_system_repository(self):
         """Set up a system repository."""
         with TemporaryDirectory() as path:
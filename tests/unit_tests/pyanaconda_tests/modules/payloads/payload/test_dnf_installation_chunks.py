@@ -0,0 +1,103 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from pyanaconda.modules.payloads.payload.dnf.installation_chunks import split_into_chunks
+
+
+class SplitIntoChunksTestCase(unittest.TestCase):
+    """Test the split_into_chunks function."""
+
+    def _split(self, dependencies, chunk_size, sizes=None):
+        """Split packages with the specified dependencies."""
+        sizes = sizes or {}
+
+        return split_into_chunks(
+            packages=list(dependencies.keys()),
+            get_dependencies=lambda p: dependencies[p],
+            get_size=lambda p: sizes.get(p, 1),
+            chunk_size=chunk_size,
+        )
+
+    def test_no_packages(self):
+        """Split no packages."""
+        assert self._split({}, chunk_size=10) == []
+
+    def test_no_dependencies(self):
+        """Split packages without dependencies."""
+        dependencies = {
+            "a": [],
+            "b": [],
+            "c": [],
+        }
+
+        assert self._split(dependencies, chunk_size=10) == [["a", "b", "c"]]
+        assert self._split(dependencies, chunk_size=2) == [["a", "b"], ["c"]]
+        assert self._split(dependencies, chunk_size=1) == [["a"], ["b"], ["c"]]
+
+    def test_dependencies(self):
+        """Split packages with dependencies."""
+        dependencies = {
+            "a": ["b", "c"],
+            "b": ["c", "unknown"],
+            "c": [],
+            "d": ["a"],
+        }
+
+        assert self._split(dependencies, chunk_size=10) == [["c", "b", "a", "d"]]
+        assert self._split(dependencies, chunk_size=1) == [["c"], ["b"], ["a"], ["d"]]
+
+    def test_cyclic_dependencies(self):
+        """Split packages with cyclic dependencies."""
+        dependencies = {
+            "a": ["b"],
+            "b": ["c"],
+            "c": ["a", "d"],
+            "d": ["d"],
+            "e": ["a"],
+        }
+
+        assert self._split(dependencies, chunk_size=1) == [["d"], ["a", "b", "c"], ["e"]]
+        assert self._split(dependencies, chunk_size=4) == [["d", "a", "b", "c"], ["e"]]
+
+    def test_sizes(self):
+        """Split packages by their sizes."""
+        dependencies = {
+            "a": [],
+            "b": [],
+            "c": [],
+            "d": [],
+        }
+        sizes = {
+            "a": 5,
+            "b": 20,
+            "c": 3,
+            "d": 4,
+        }
+
+        assert self._split(dependencies, 10, sizes) == [["a"], ["b"], ["c", "d"]]
+
+    def test_deep_dependencies(self):
+        """Split a long chain of dependencies."""
+        dependencies = {i: [i + 1] for i in range(5000)}
+        dependencies[5000] = []
+
+        chunks = self._split(dependencies, chunk_size=1000)
+        assert len(chunks) == 6
+        assert chunks[0][0] == 5000
+        assert chunks[-1][-1] == 0
@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from pyanaconda.core.path import make_directories, join_paths
+from pyanaconda.modules.payloads.payload.dnf.metadata_cache import MetadataCache
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    """Test the persistent cache of repository metadata."""
+
+    def _create_file(self, path, content):
+        """Create a file with the specified content."""
+        make_directories(os.path.dirname(path))
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _read_file(self, path):
+        """Read the content of the specified file."""
+        with open(path, "r") as f:
+            return f.read()
+
+    def _create_metadata(self, repo_dir, solv_dir, repo_id):
+        """Create fake metadata of a repository."""
+        self._create_file(join_paths(repo_dir, "repodata", "repomd.xml"), "repomd")
+        self._create_file(join_paths(repo_dir, "repodata", "primary.xml.gz"), "primary")
+        self._create_file(join_paths(solv_dir, repo_id + ".solv"), "solv")
+        self._create_file(join_paths(solv_dir, repo_id + "-filenames.solvx"), "filenames")
+        self._create_file(join_paths(solv_dir, repo_id + "-other-filenames.solvx"), "other")
+
+    def test_disabled(self):
+        """Test a disabled cache."""
+        cache = MetadataCache("")
+        assert cache.enabled is False
+        assert cache.contains(b"hash") is False
+        assert cache.store("r1", b"hash", "/nonexistent", "/nonexistent") is False
+        assert cache.restore("r1", b"hash", "/nonexistent", "/nonexistent") is False
+
+    def test_no_hash(self):
+        """Test the cache with no hash."""
+        with TemporaryDirectory() as d:
+            cache = MetadataCache(d)
+            assert cache.enabled is True
+            assert cache.contains(None) is False
+            assert cache.store("r1", None, d, d) is False
+            assert cache.restore("r1", None, d, d) is False
+
+    def test_store_and_restore(self):
+        """Test the store and restore methods."""
+        with TemporaryDirectory() as d:
+            cache = MetadataCache(join_paths(d, "cache"))
+
+            # Store metadata of the r1 repository.
+            self._create_metadata(join_paths(d, "r1-123"), join_paths(d, "dnf"), "r1")
+
+            assert cache.contains(b"\x01\x02") is False
+            assert cache.store("r1", b"\x01\x02", join_paths(d, "r1-123"), join_paths(d, "dnf"))
+            assert cache.contains(b"\x01\x02") is True
+
+            assert sorted(os.listdir(join_paths(d, "cache"))) == ["0102"]
+            assert sorted(os.listdir(join_paths(d, "cache", "0102", "solv"))) == [
+                "repo-filenames.solvx",
+                "repo.solv",
+            ]
+
+            # Don't store the same metadata twice.
+            assert not cache.store("r1", b"\x01\x02", join_paths(d, "r1-123"), join_paths(d, "dnf"))
+
+            # Restore the metadata for the r2 repository.
+            assert cache.restore("r2", b"\x01\x02", join_paths(d, "r2-456"), join_paths(d, "new"))
+
+            assert self._read_file(join_paths(d, "r2-456", "repodata", "repomd.xml")) == "repomd"
+            assert self._read_file(join_paths(d, "r2-456", "repodata", "primary.xml.gz")) \
+                == "primary"
+
+            assert sorted(os.listdir(join_paths(d, "new"))) == [
+                "r2-filenames.solvx",
+                "r2.solv",
+            ]
+            assert self._read_file(join_paths(d, "new", "r2.solv")) == "solv"
+
+            # Restore unknown metadata.
+            assert not cache.restore("r3", b"\x03", join_paths(d, "r3"), join_paths(d, "new"))
+            assert not os.path.exists(join_paths(d, "r3"))
+
+    def test_prune(self):
+        """Test that only the latest snapshot of a repository is kept."""
+        with TemporaryDirectory() as d:
+            cache = MetadataCache(join_paths(d, "cache"))
+            self._create_metadata(join_paths(d, "r1-123"), join_paths(d, "dnf"), "r1")
+            self._create_metadata(join_paths(d, "r2-456"), join_paths(d, "dnf"), "r2")
+
+            assert cache.store("r1", b"\x01", join_paths(d, "r1-123"), join_paths(d, "dnf"))
+            assert cache.store("r2", b"\x02", join_paths(d, "r2-456"), join_paths(d, "dnf"))
+            assert sorted(os.listdir(join_paths(d, "cache"))) == ["01", "02"]
+
+            # Store a new snapshot of the r1 repository.
+            assert cache.store("r1", b"\x03", join_paths(d, "r1-123"), join_paths(d, "dnf"))
+            assert sorted(os.listdir(join_paths(d, "cache"))) == ["02", "03"]
+
+            # Use an older snapshot of the r1 repository again.
+            assert cache.store("r1", b"\x01", join_paths(d, "r1-123"), join_paths(d, "dnf"))
+            assert sorted(os.listdir(join_paths(d, "cache"))) == ["01", "02"]
+
+            # The stored snapshot is kept.
+            assert not cache.store("r2", b"\x02", join_paths(d, "r2-456"), join_paths(d, "dnf"))
+            assert sorted(os.listdir(join_paths(d, "cache"))) == ["01", "02"]
+
+    def test_store_failed(self):
+        """Test the store method with missing metadata."""
+        with TemporaryDirectory() as d:
+            cache = MetadataCache(join_paths(d, "cache"))
+
+            assert not cache.store("r1", b"\x01", join_paths(d, "r1"), join_paths(d, "dnf"))
+            assert cache.contains(b"\x01") is False
+            assert os.listdir(join_paths(d, "cache")) == []
@@ -0,0 +1,67 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from pyanaconda.modules.payloads.payload.dnf.package_index import PackageNameIndex
+
+
+class PackageNameIndexTestCase(unittest.TestCase):
+    """Test the index of package names."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.index = PackageNameIndex([
+            "langpacks-cs",
+            "langpacks-core-cs",
+            "kernel",
+            "kernel-64k",
+            "kernel",
+            "lang",
+        ])
+
+    def test_contains(self):
+        """Test the membership test."""
+        assert len(self.index) == 5
+        assert "kernel" in self.index
+        assert "kernel-64k" in self.index
+        assert "kern" not in self.index
+        assert "zsh" not in self.index
+        assert "" not in self.index
+
+    def test_match_name(self):
+        """Test the match method with a package name."""
+        assert self.index.match("kernel") == ["kernel"]
+        assert self.index.match("kern") == []
+        assert self.index.match("zsh") == []
+
+    def test_match_pattern(self):
+        """Test the match method with a glob pattern."""
+        assert self.index.match("langpacks-*") == ["langpacks-core-cs", "langpacks-cs"]
+        assert self.index.match("lang*") == ["lang", "langpacks-core-cs", "langpacks-cs"]
+        assert self.index.match("*-cs") == ["langpacks-core-cs", "langpacks-cs"]
+        assert self.index.match("kernel?64k") == ["kernel-64k"]
+        assert self.index.match("kernel-[0-9]*") == ["kernel-64k"]
+        assert self.index.match("Kernel*") == []
+        assert self.index.match("zsh*") == []
+
+    def test_empty(self):
+        """Test an empty index."""
+        index = PackageNameIndex([])
+        assert len(index) == 0
+        assert "kernel" not in index
+        assert index.match("*") == []
@@ -0,0 +1,92 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import hashlib
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from pyanaconda.core.path import make_directories, join_paths
+from pyanaconda.modules.payloads.payload.dnf.package_pool import PackagePool
+
+
+class PackagePoolTestCase(unittest.TestCase):
+    """Test the pool of local packages."""
+
+    def _create_package(self, path, content):
+        """Create a fake package and return its checksum."""
+        make_directories(os.path.dirname(path))
+
+        with open(path, "w") as f:
+            f.write(content)
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def test_disabled(self):
+        """Test a disabled pool."""
+        pool = PackagePool([])
+        assert pool.enabled is False
+        assert pool.find_package("p1-1.0-1.noarch.rpm", "sha256", "abc") is None
+        assert pool.import_package("p1-1.0-1.noarch.rpm", "sha256", "abc", "/p1") is False
+
+    def test_find_package(self):
+        """Test the find_package method."""
+        with TemporaryDirectory() as d:
+            c1 = self._create_package(join_paths(d, "pool1", "a", "p1-1.0-1.noarch.rpm"), "p1")
+            c2 = self._create_package(join_paths(d, "pool1", "b", "p2-1.0-1.noarch.rpm"), "p2")
+            c3 = self._create_package(join_paths(d, "pool2", "p2-1.0-1.noarch.rpm"), "p2 new")
+
+            pool = PackagePool([
+                join_paths(d, "pool1"),
+                join_paths(d, "pool2"),
+                join_paths(d, "nonexistent"),
+            ])
+            assert pool.enabled is True
+
+            assert pool.find_package("p1-1.0-1.noarch.rpm", "sha256", c1) == \
+                join_paths(d, "pool1", "a", "p1-1.0-1.noarch.rpm")
+
+            assert pool.find_package("p2-1.0-1.noarch.rpm", "sha256", c2) == \
+                join_paths(d, "pool1", "b", "p2-1.0-1.noarch.rpm")
+
+            assert pool.find_package("p2-1.0-1.noarch.rpm", "sha256", c3) == \
+                join_paths(d, "pool2", "p2-1.0-1.noarch.rpm")
+
+            # Unknown checksum.
+            assert pool.find_package("p1-1.0-1.noarch.rpm", "sha256", c2) is None
+
+            # Unknown checksum type.
+            assert pool.find_package("p1-1.0-1.noarch.rpm", "invalid", c1) is None
+
+            # Unknown package.
+            assert pool.find_package("p3-1.0-1.noarch.rpm", "sha256", c1) is None
+
+    def test_import_package(self):
+        """Test the import_package method."""
+        with TemporaryDirectory() as d:
+            c1 = self._create_package(join_paths(d, "pool", "p1-1.0-1.noarch.rpm"), "p1")
+            pool = PackagePool([join_paths(d, "pool")])
+
+            target = join_paths(d, "download", "p1-1.0-1.noarch.rpm")
+            assert pool.import_package("p1-1.0-1.noarch.rpm", "sha256", c1, target) is True
+
+            with open(target, "r") as f:
+                assert f.read() == "p1"
+
+            target = join_paths(d, "download", "p2-1.0-1.noarch.rpm")
+            assert pool.import_package("p2-1.0-1.noarch.rpm", "sha256", c1, target) is False
+            assert not os.path.exists(target)
@@ -0,0 +1,95 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import unittest
+
+from pyanaconda.modules.payloads.payload.dnf.parallel_downloads import \
+    AdaptiveParallelDownloads
+
+
+class AdaptiveParallelDownloadsTestCase(unittest.TestCase):
+    """Test the adaptive number of parallel downloads."""
+
+    def test_batches(self):
+        """Test the get_batches method."""
+        parallelism = AdaptiveParallelDownloads(value=1)
+        packages = list(range(10))
+        batches = []
+
+        for batch in parallelism.get_batches(packages):
+            batches.append(batch)
+            parallelism.succeeded(size=100 * len(batches), duration=1)
+
+        assert batches == [[0, 1, 2, 3], [4, 5, 6, 7, 8, 9]]
+
+    def test_growing_throughput(self):
+        """Raise the number while the throughput keeps growing."""
+        parallelism = AdaptiveParallelDownloads(value=3, maximum=20)
+        assert parallelism.value == 3
+        assert parallelism.batch_size == 12
+
+        parallelism.succeeded(size=100, duration=1)
+        assert parallelism.value == 6
+
+        parallelism.succeeded(size=200, duration=1)
+        assert parallelism.value == 12
+
+        parallelism.succeeded(size=400, duration=1)
+        assert parallelism.value == 20
+
+        parallelism.succeeded(size=800, duration=1)
+        assert parallelism.value == 20
+
+    def test_stable_throughput(self):
+        """Keep the last number that improved the throughput."""
+        parallelism = AdaptiveParallelDownloads(value=3)
+
+        parallelism.succeeded(size=100, duration=1)
+        assert parallelism.value == 6
+
+        parallelism.succeeded(size=105, duration=1)
+        assert parallelism.value == 3
+
+        parallelism.succeeded(size=300, duration=1)
+        assert parallelism.value == 3
+
+    def test_no_data(self):
+        """Ignore batches without downloaded data."""
+        parallelism = AdaptiveParallelDownloads(value=3)
+
+        parallelism.succeeded(size=0, duration=1)
+        assert parallelism.value == 3
+
+        parallelism.succeeded(size=100, duration=0)
+        assert parallelism.value == 3
+
+    def test_failed(self):
+        """Lower the number after failures."""
+        parallelism = AdaptiveParallelDownloads(value=6)
+
+        assert parallelism.failed() is True
+        assert parallelism.value == 3
+
+        assert parallelism.failed() is True
+        assert parallelism.value == 1
+
+        assert parallelism.failed() is False
+        assert parallelism.value == 1
+
+        # Don't raise the number after failures.
+        parallelism.succeeded(size=100, duration=1)
+        assert parallelism.value == 1
@@ -30,7 +30,7 @@ from pyanaconda.modules.common.structures.payload import RepoConfigurationData
 from pyanaconda.modules.payloads.constants import SourceType
 from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager
 from pyanaconda.modules.payloads.payload.dnf.repositories import generate_driver_disk_repositories, \
-    generate_source_from_repository, enable_updates_repositories, create_repository, \
+    generate_source_from_repository, enable_updates_repositories, \
     disable_default_repositories, enable_existing_repository
 
 
@@ -294,18 +294,6 @@ class DNFRepositoriesUtilsTestCase(unittest.TestCase):
             call("r3", False),
         ]
 
-    def test_create_repository(self):
-        """Test the create_repository function."""
-        dnf_manager = MagicMock(spec=DNFManager)
-
-        repository = RepoConfigurationData()
-        repository.name = "test"
-        repository.url = "file:///path"
-
-        create_repository(dnf_manager, repository)
-        dnf_manager.add_repository.assert_called_once_with(repository)
-        dnf_manager.load_repository.assert_called_once_with("test")
-
     def test_enable_existing_repository(self):
         """Test the enable_existing_repository function."""
         dnf_manager = MagicMock(spec=DNFManager)
@@ -16,9 +16,11 @@
 # Red Hat, Inc.
 #
 import unittest
+from unittest.mock import Mock
 
 from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager
-from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask
+from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask, \
+    CompactDNFManagerTask
 
 
 class ResetDNFManagerTaskTestCase(unittest.TestCase):
@@ -35,3 +37,18 @@ class ResetDNFManagerTaskTestCase(unittest.TestCase):
         task.run()
 
         assert dnf_base._closed
+
+
+class CompactDNFManagerTaskTestCase(unittest.TestCase):
+    """Test the task for releasing memory of the DNF manager."""
+
+    def test_compact_dnf_manager_task(self):
+        """Test the CompactDNFManagerTask task."""
+        dnf_manager = Mock()
+
+        task = CompactDNFManagerTask(
+            dnf_manager=dnf_manager
+        )
+        task.run()
+
+        dnf_manager.compact.assert_called_once_with()
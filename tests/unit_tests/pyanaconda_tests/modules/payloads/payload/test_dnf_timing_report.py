@@ -0,0 +1,91 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from pyanaconda.modules.payloads.payload.dnf.timing_report import TimingReport
+
+
+class TimingReportTestCase(unittest.TestCase):
+    """Test the timing report of the package installation."""
+
+    def _read_report(self, path):
+        """Read records of the report."""
+        with open(path, "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_add(self):
+        """Test the add method."""
+        report = TimingReport("/nonexistent")
+        report.add("scriptlet", duration=1.23456, package="p1", phase="post")
+        report.add("post", duration=2)
+
+        assert report.records == [
+            {"event": "scriptlet", "duration": 1.235, "package": "p1", "phase": "post"},
+            {"event": "post", "duration": 2},
+        ]
+
+    def test_get_slowest(self):
+        """Test the get_slowest method."""
+        report = TimingReport("/nonexistent")
+        report.add("scriptlet", duration=1, package="p1")
+        report.add("scriptlet", duration=3, package="p2")
+        report.add("install", duration=5, package="p3")
+        report.add("scriptlet", duration=2, package="p4")
+
+        records = report.get_slowest("scriptlet", 2)
+        assert [r["package"] for r in records] == ["p2", "p4"]
+
+        records = report.get_slowest("scriptlet", 10)
+        assert [r["package"] for r in records] == ["p2", "p4", "p1"]
+
+        assert report.get_slowest("download", 10) == []
+
+    def test_write(self):
+        """Test the write method."""
+        with TemporaryDirectory() as d:
+            path = os.path.join(d, "report.jsonl")
+
+            report = TimingReport(path)
+            report.write()
+            assert not os.path.exists(path)
+
+            report.add("download", duration=1, package="p1", size=100)
+            report.write()
+            assert report.records == []
+
+            report.add("install", duration=2, package="p1")
+            report.write()
+
+            assert self._read_report(path) == [
+                {"event": "download", "duration": 1, "package": "p1", "size": 100},
+                {"event": "install", "duration": 2, "package": "p1"},
+            ]
+
+    def test_write_failed(self):
+        """Test the failed write method."""
+        report = TimingReport("/nonexistent/report.jsonl")
+        report.add("install", duration=2, package="p1")
+
+        with self.assertLogs(level="WARNING") as cm:
+            report.write()
+
+        assert "Failed to write the timing report" in "\n".join(cm.output)
+        assert report.records
@@ -0,0 +1,231 @@
+#
+# Copyright (C) 2024  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import multiprocessing
+import unittest
+from unittest.mock import patch, Mock
+
+import libdnf.transaction
+import pytest
+from dnf.transaction import PKG_INSTALL, PKG_ERASE, PKG_SCRIPTLET
+
+from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.payloads.payload.dnf.transaction_progress import \
+    process_transaction_progress
+from pyanaconda.modules.payloads.payload.dnf.transaction_worker import TransactionDescription, \
+    RepositoryDescription, describe_transaction, run_transaction_worker, \
+    TRANSACTION_OPTIONS, _resolve_transaction, find_packages
+
+WORKER = "pyanaconda.modules.payloads.payload.dnf.transaction_worker"
+
+
+class TransactionWorkerTestCase(unittest.TestCase):
+    """Test the worker of the DNF transaction."""
+
+    def _get_package(self, name, reponame="r1"):
+        """Get a mocked package."""
+        package = Mock(
+            epoch=0,
+            version="1.0",
+            release="1",
+            arch="x86_64",
+            reponame=reponame,
+            evr="1.0-1",
+            buildtime=100,
+        )
+        package.name = name
+        package.returnIdSum.return_value = ("", "1a2b3c")
+        return package
+
+    def _get_item(self, package, reason, action=PKG_INSTALL):
+        """Get a mocked transaction item."""
+        return Mock(pkg=package, reason=reason, action=action)
+
+    def _get_base(self, items):
+        """Get a mocked DNF base."""
+        base = Mock()
+        base._moduleContainer.isChanged.return_value = False
+        base.transaction = items
+
+        repo = Mock(
+            baseurl=("http://r1",),
+            mirrorlist=None,
+            metalink=None,
+            pkgdir="/mnt/sysroot/var/cache/pkgs"
+        )
+        repo.id = "r1"
+        base.repos.iter_enabled.return_value = [repo]
+        base.conf.substitutions = {"basearch": "x86_64"}
+        base.sack.query.return_value.installed.return_value = []
+        return base
+
+    def test_describe_transaction(self):
+        """Test the describe_transaction function."""
+        p1 = self._get_package("p1")
+        p2 = self._get_package("p2")
+        p3 = self._get_package("p3")
+
+        base = self._get_base([
+            self._get_item(p1, libdnf.transaction.TransactionItemReason_USER),
+            self._get_item(p2, libdnf.transaction.TransactionItemReason_DEPENDENCY),
+            self._get_item(p3, libdnf.transaction.TransactionItemReason_GROUP),
+        ])
+
+        description = describe_transaction(base)
+
+        assert isinstance(description, TransactionDescription)
+        assert sorted(description.options) == sorted(TRANSACTION_OPTIONS)
+        assert description.substitutions == {"basearch": "x86_64"}
+        assert description.load_system_repo is False
+        assert description.repositories == [
+            RepositoryDescription(
+                id="r1",
+                baseurl=["http://r1"],
+                mirrorlist=None,
+                metalink=None,
+                pkgdir="/mnt/sysroot/var/cache/pkgs",
+            )
+        ]
+        assert description.packages == [
+            ("p1", 0, "1.0", "1", "x86_64", "r1"),
+            ("p3", 0, "1.0", "1", "x86_64", "r1"),
+        ]
+        assert description.dependencies == [
+            ("p2", 0, "1.0", "1", "x86_64", "r1"),
+        ]
+
+    def test_describe_unsupported_transaction(self):
+        """Test the describe_transaction function with unsupported transactions."""
+        p1 = self._get_package("p1")
+
+        # Remove a package.
+        base = self._get_base([
+            self._get_item(p1, libdnf.transaction.TransactionItemReason_USER, PKG_ERASE)
+        ])
+        assert describe_transaction(base) is None
+
+        # Change modules.
+        base = self._get_base([
+            self._get_item(p1, libdnf.transaction.TransactionItemReason_USER)
+        ])
+        base._moduleContainer.isChanged.return_value = True
+        assert describe_transaction(base) is None
+
+    def test_find_packages(self):
+        """Test the find_packages function."""
+        p1 = self._get_package("p1")
+        p2 = self._get_package("p2")
+
+        base = Mock()
+        query = base.sack.query.return_value.available.return_value
+        query.filter.side_effect = lambda **kwargs: {"p1": [p1], "p2": [p2]}.get(kwargs["name"], [])
+
+        keys = [
+            ("p1", 0, "1.0", "1", "x86_64", "r1"),
+            ("p2", 0, "1.0", "1", "x86_64", "r1"),
+        ]
+        assert find_packages(base, keys, strict=True) == [p1, p2]
+
+        keys.append(("p3", 0, "1.0", "1", "x86_64", "r2"))
+        assert find_packages(base, keys) == [p1, p2]
+
+        with pytest.raises(RuntimeError) as cm:
+            find_packages(base, keys, strict=True)
+
+        msg = "Some packages are not available: p3-0:1.0-1.x86_64 (r2)"
+        assert str(cm.value) == msg
+
+    def test_resolve_transaction(self):
+        """Test the _resolve_transaction function."""
+        p1 = self._get_package("p1")
+        p2 = self._get_package("p2")
+
+        base = Mock()
+        base.transaction.install_set = {p1, p2}
+
+        description = Mock(
+            packages=[("p1", 0, "1.0", "1", "x86_64", "r1")],
+            dependencies=[("p2", 0, "1.0", "1", "x86_64", "r1")],
+        )
+
+        with patch(WORKER + ".find_packages") as find_packages:
+            find_packages.side_effect = [[p1, p2], [p1]]
+            _resolve_transaction(base, description)
+
+        base.sack.add_excludes.assert_called_once()
+        base.package_install.assert_called_once_with(p1, strict=True)
+        base.resolve.assert_called_once_with()
+
+        # The resolved transaction is different.
+        base.transaction.install_set = {p1}
+
+        with patch(WORKER + ".find_packages") as find_packages:
+            find_packages.side_effect = [[p1, p2], [p1]]
+
+            with pytest.raises(RuntimeError) as cm:
+                _resolve_transaction(base, description)
+
+        msg = "The transaction doesn't match its description: 1 missing, 0 unexpected packages."
+        assert str(cm.value) == msg
+
+    @patch(WORKER + "._resolve_transaction")
+    @patch(WORKER + "._create_base")
+    def test_run_transaction_worker(self, create_base, resolve):
+        """Test the run_transaction_worker function."""
+        base = create_base.return_value
+        base.transaction = []
+        base.do_transaction.side_effect = self._install_packages
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        description = Mock()
+        calls = []
+
+        with self.assertLogs(level="INFO") as cm:
+            run_transaction_worker(description, sender)
+            process_transaction_progress(receiver, calls.append)
+
+        create_base.assert_called_once_with(description)
+        resolve.assert_called_once_with(base, description)
+        base.close.assert_called_once_with()
+
+        assert calls
+        output = "\n".join(cm.output)
+        assert "The peak memory usage of the transaction process was" in output
+        assert "DNF quit" in output
+
+    @patch(WORKER + "._create_base")
+    def test_run_transaction_worker_failed(self, create_base):
+        """Test the failed run_transaction_worker function."""
+        create_base.side_effect = OSError("Fake error!")
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        run_transaction_worker(Mock(), sender)
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            process_transaction_progress(receiver, Mock())
+
+        msg = "An error occurred during the transaction: " \
+              "The transaction process has ended abruptly: Fake error!"
+
+        assert str(cm.value).startswith(msg)
+
+    def _install_packages(self, progress):
+        """Simulate the installation of packages."""
+        package = self._get_package("p1")
+        progress.progress(package, PKG_INSTALL, 0, 100, 0, 1)
+        progress.progress(package, PKG_SCRIPTLET, 75, 100, 0, 1)
+        progress.progress(package, PKG_INSTALL, 100, 100, 1, 1)
@@ -17,11 +17,13 @@
 #
 import os.path
 import tempfile
+import time
 import pytest
 import unittest
 
 from unittest.mock import patch, Mock
 from dasbus.structure import compare_data
+from requests import HTTPError, ConnectionError
 
 from pyanaconda.core.constants import URL_TYPE_METALINK, NETWORK_CONNECTION_TIMEOUT, \
     REPO_ORIGIN_TREEINFO
@@ -150,6 +152,10 @@ class TreeInfoMetadataTestCase(unittest.TestCase):
         self.maxDiff = None
         self.metadata = TreeInfoMetadata()
         self.metadata.MAX_TREEINFO_DOWNLOAD_RETRIES = 2
+        self.metadata._cache.clear()
+
+    def tearDown(self):
+        self.metadata._cache.clear()
 
     def _create_file(self, root_path, file_name, content):
         """Create a new file."""
@@ -393,7 +399,7 @@ class TreeInfoMetadataTestCase(unittest.TestCase):
 
         self.metadata.load_data(data)
 
-        session_getter.assert_called_once_with(
+        session_getter.assert_any_call(
             "http://path/.treeinfo",
             headers={"user-agent": "anaconda (anaconda)/bluesky"},
             proxies={},
@@ -414,7 +420,7 @@ class TreeInfoMetadataTestCase(unittest.TestCase):
 
         self.metadata.load_data(data)
 
-        session_getter.assert_called_once_with(
+        session_getter.assert_any_call(
             "http://path/.treeinfo",
             headers={"user-agent": "anaconda (anaconda)/bluesky"},
             proxies={
@@ -438,7 +444,7 @@ class TreeInfoMetadataTestCase(unittest.TestCase):
 
         self.metadata.load_data(data)
 
-        session_getter.assert_called_once_with(
+        session_getter.assert_any_call(
             "http://path/.treeinfo",
             headers={"user-agent": "anaconda (anaconda)/bluesky"},
             proxies={},
@@ -447,6 +453,149 @@ class TreeInfoMetadataTestCase(unittest.TestCase):
             timeout=NETWORK_CONNECTION_TIMEOUT
         )
 
+    @patch("requests.Session.get")
+    def test_load_data_probing(self, session_getter):
+        """Test the load_data method with concurrent probing."""
+        def _get(url, **kwargs):
+            response = Mock(status_code=200, text=TREE_INFO_FEDORA)
+
+            if url.endswith("/.treeinfo"):
+                response.raise_for_status.side_effect = ConnectionError("Fake error!")
+
+            result = Mock()
+            result.__enter__ = Mock(return_value=response)
+            result.__exit__ = Mock(return_value=False)
+            return result
+
+        session_getter.side_effect = _get
+
+        data = RepoConfigurationData()
+        data.url = "http://path"
+
+        self.metadata.load_data(data)
+        assert self.metadata.release_version == "34"
+
+        urls = sorted(c.args[0] for c in session_getter.call_args_list)
+        assert urls == ["http://path/.treeinfo", "http://path/treeinfo"]
+
+    @patch("requests.Session.get")
+    def test_load_data_probing_order(self, session_getter):
+        """Test the load_data method with the preferred treeinfo file."""
+        def _get(url, **kwargs):
+            # The preferred file is downloaded last.
+            if url.endswith("/.treeinfo"):
+                time.sleep(0.1)
+                response = Mock(status_code=200, text=TREE_INFO_RHEL)
+            else:
+                response = Mock(status_code=200, text=TREE_INFO_FEDORA)
+
+            result = Mock()
+            result.__enter__ = Mock(return_value=response)
+            result.__exit__ = Mock(return_value=False)
+            return result
+
+        session_getter.side_effect = _get
+
+        data = RepoConfigurationData()
+        data.url = "http://path"
+
+        self.metadata.load_data(data)
+        assert self.metadata.release_version == "8.5"
+
+    @patch("requests.Session.get")
+    def test_load_data_cached(self, session_getter):
+        """Test the load_data method with cached metadata."""
+        session_getter.return_value.__enter__.return_value = \
+            Mock(status_code=200, text=TREE_INFO_FEDORA)
+
+        data = RepoConfigurationData()
+        data.url = "http://path"
+
+        with patch.object(TreeInfoMetadata, "_load_tree_info", autospec=True,
+                          side_effect=TreeInfoMetadata._load_tree_info) as loader:
+            self.metadata.load_data(data)
+            assert loader.call_count == 1
+
+            # Use the cached metadata.
+            metadata = TreeInfoMetadata()
+            metadata.load_data(data)
+            assert loader.call_count == 1
+
+            assert metadata.release_version == "34"
+            assert metadata.repositories == self.metadata.repositories
+
+            # Process the modified metadata.
+            session_getter.return_value.__enter__.return_value = \
+                Mock(status_code=200, text=TREE_INFO_RHEL)
+
+            metadata = TreeInfoMetadata()
+            metadata.load_data(data)
+            assert loader.call_count == 2
+            assert metadata.release_version == "8.5"
+
+            # Process the metadata of a different root.
+            data.url = "http://other"
+
+            metadata = TreeInfoMetadata()
+            metadata.load_data(data)
+            assert loader.call_count == 3
+
+    @patch("requests.Session.get")
+    def test_load_data_cached_no_metadata(self, session_getter):
+        """Test the load_data method with cached missing metadata."""
+        response = Mock(status_code=404)
+        response.raise_for_status.side_effect = HTTPError(response=response)
+        session_getter.return_value.__enter__.return_value = response
+
+        data = RepoConfigurationData()
+        data.url = "http://path"
+
+        with pytest.raises(NoTreeInfoError) as cm:
+            self.metadata.load_data(data)
+
+        assert str(cm.value) == "No treeinfo metadata found (404)."
+        assert session_getter.call_count == 2
+
+        # Don't probe the installation root again.
+        with pytest.raises(NoTreeInfoError) as cm:
+            self.metadata.load_data(data)
+
+        assert str(cm.value) == "No treeinfo metadata found (cached)."
+        assert session_getter.call_count == 2
+
+        # Probe the installation root again with different options.
+        data.proxy = "http://example.com/proxy"
+
+        with pytest.raises(NoTreeInfoError) as cm:
+            self.metadata.load_data(data)
+
+        assert str(cm.value) == "No treeinfo metadata found (404)."
+        assert session_getter.call_count == 4
+
+        data.proxy = ""
+        data.ssl_verification_enabled = False
+
+        with pytest.raises(NoTreeInfoError) as cm:
+            self.metadata.load_data(data)
+
+        assert str(cm.value) == "No treeinfo metadata found (404)."
+        assert session_getter.call_count == 6
+
+    def test_load_data_local_no_metadata(self):
+        """Test the load_data method with missing local metadata."""
+        with tempfile.TemporaryDirectory() as path:
+            data = RepoConfigurationData()
+            data.url = "file://" + path
+
+            with pytest.raises(NoTreeInfoError):
+                self.metadata.load_data(data)
+
+            # Local installation roots are probed again.
+            self._create_file(path, ".treeinfo", TREE_INFO_FEDORA)
+            self.metadata.load_data(data)
+
+        assert self.metadata.release_version == "34"
+
     def test_generate_treeinfo_repository_fedora(self):
         """Test the generate_treeinfo_repository function with Fedora repos."""
         root_url = self._load_treeinfo(TREE_INFO_FEDORA)
@@ -125,6 +125,60 @@ class CheckPackagesSelectionTaskTestCase(unittest.TestCase):
         assert report.error_messages == ["e2", "e4"]
         assert report.warning_messages == ["e1", "e3"]
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.validation.get_kernel_package")
+    def test_check_resolved_selection(self, kernel_getter):
+        """Test the reuse of a resolved selection."""
+        kernel_getter.return_value = "kernel"
+
+        dnf_manager = Mock()
+        dnf_manager.default_environment = None
+        dnf_manager.get_selection_key.return_value = "key"
+
+        selection = PackagesSelectionData()
+        selection.modules = ["m1"]
+        selection.disabled_modules = ["m2"]
+
+        # Resolve a new selection.
+        task = CheckPackagesSelectionTask(dnf_manager, selection)
+        report = task.run()
+
+        dnf_manager.get_selection_key.assert_called_once_with(
+            include_list=["@core", "kernel"],
+            exclude_list=[],
+            enabled_modules=["m1"],
+            disabled_modules=["m2"],
+        )
+        dnf_manager.resolve_selection.assert_called_once_with()
+        dnf_manager.set_resolved_selection.assert_called_once_with("key")
+        assert report.get_messages() == []
+
+        # Reuse the resolved selection.
+        dnf_manager.reset_mock()
+        dnf_manager.resolved_selection = "key"
+
+        task = CheckPackagesSelectionTask(dnf_manager, selection)
+        report = task.run()
+
+        dnf_manager.clear_selection.assert_not_called()
+        dnf_manager.apply_specs.assert_not_called()
+        dnf_manager.resolve_selection.assert_not_called()
+        assert report.get_messages() == []
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.validation.get_kernel_package")
+    def test_check_unresolved_selection(self, kernel_getter):
+        """Test that a selection with errors is not remembered."""
+        kernel_getter.return_value = None
+        selection = PackagesSelectionData()
+
+        dnf_manager = Mock()
+        dnf_manager.apply_specs.side_effect = MissingSpecsError("e1")
+
+        task = CheckPackagesSelectionTask(dnf_manager, selection)
+        report = task.run()
+
+        assert report.warning_messages == ["e1"]
+        dnf_manager.set_resolved_selection.assert_not_called()
+
 
 class VerifyRepomdHashesTaskTestCase(unittest.TestCase):
     """Test the VerifyRepomdHashesTask task."""
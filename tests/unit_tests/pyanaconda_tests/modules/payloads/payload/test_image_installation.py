@@ -15,96 +15,35 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
-import os
-import tempfile
 import unittest
-import time
 
-from unittest.mock import Mock, call, patch
+from unittest.mock import Mock, call
 
-from pyanaconda.core.path import join_paths
-from pyanaconda.modules.common.constants.objects import DEVICE_TREE
-from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.modules.payloads.payload.live_image.installation_progress import \
     InstallationProgress
-from pyanaconda.modules.common.structures.storage import DeviceData
-from tests.unit_tests.pyanaconda_tests import patch_dbus_get_proxy_with_cache
 
 
 class InstallationProgressTestCase(unittest.TestCase):
     """Test the installation progress of the image installation."""
 
-    @patch("os.statvfs")
-    @patch_dbus_get_proxy_with_cache
-    def test_canceled_progress(self, proxy_getter, statvfs_mock):
-        """Test the canceled installation progress."""
+    def test_progress(self):
+        """Test the installation progress."""
         callback = Mock()
 
-        with tempfile.TemporaryDirectory() as sysroot:
-            os.mkdir(join_paths(sysroot, "/boot"))
-            os.mkdir(join_paths(sysroot, "/home"))
-
-            device_tree = STORAGE.get_proxy(DEVICE_TREE)
-            device_tree.GetMountPoints.return_value = {
-                "/": "dev1",
-                "/boot": "dev2",
-                "/home": "dev3",
-            }
-            device_tree.GetDeviceData.return_value = DeviceData.to_structure(DeviceData())
-
-            statvfs_mock.return_value = \
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=100)
-
-            progress = InstallationProgress(
-                sysroot=sysroot,
-                callback=callback,
-                installation_size=1024 * 100
-            )
-
-            with progress:
-                time.sleep(2)
-
-        expected = [
-            call("Synchronizing writes to disk"),
-            call("Installing software 0%")
-        ]
-        assert callback.call_args_list == expected
-
-    @patch("time.sleep")
-    @patch("os.statvfs")
-    @patch_dbus_get_proxy_with_cache
-    def test_finished_progress(self, proxy_getter, statvfs_mock, sleep_mock):
-        """Test the finished installation progress."""
-        callback = Mock()
+        progress = InstallationProgress(
+            total_size=1024 * 100,
+            callback=callback,
+        )
 
-        with tempfile.TemporaryDirectory() as sysroot:
-            device_tree = STORAGE.get_proxy(DEVICE_TREE)
-            device_tree.GetMountPoints.return_value = {
-                "/": "dev1",
-                "/boot": "dev2",
-                "/home": "dev3",
-            }
-            device_tree.GetDeviceData.return_value = DeviceData.to_structure(DeviceData())
-
-            statvfs_mock.side_effect = [
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=125),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=100),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=75),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=45),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=25),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=0),
-            ]
-
-            progress = InstallationProgress(
-                sysroot=sysroot,
-                callback=callback,
-                installation_size=1024 * 100
-            )
-
-            progress._monitor_progress()
+        progress.start()
+        progress.update(1024 * 25)
+        progress.update(1024 * 25 + 1)
+        progress.update(1024 * 50)
+        progress.update(1024 * 80)
+        progress.end()
 
         expected = [
-            call("Synchronizing writes to disk"),
+            call("Installing software 0%"),
             call("Installing software 25%"),
             call("Installing software 50%"),
             call("Installing software 80%"),
@@ -112,46 +51,34 @@ class InstallationProgressTestCase(unittest.TestCase):
         ]
         assert callback.call_args_list == expected
 
-    @patch_dbus_get_proxy_with_cache
-    def test_btrfs_mountpoint_selection(self, proxy_getter):
-        """Test installation progress calculation with btrfs."""
-
-        def get_device_data(device):
-            data = DeviceData()
-            if device in ("root-btrfs-one", "home-btrfs-one"):
-                data.type = "btrfs subvolume"
-            elif device == "btrfs-one":
-                data.type = "btrfs volume"
-            return DeviceData.to_structure(data)
-
-        def get_device_ancestors(devices):
-            ancestors = {
-                "root-btrfs-one": ["btrfs-one", "dev1-disk", "dev2-disk"],
-                "dev2": ["dev2-disk"],
-                "home-btrfs-one": ["dev1-disk", "dev2-disk", "btrfs-one"],
-            }
-            return ancestors[devices[0]]
-
+    def test_progress_overflow(self):
+        """Test the installation progress with an unexpected size."""
         callback = Mock()
 
-        device_tree = STORAGE.get_proxy(DEVICE_TREE)
-        device_tree.GetMountPoints.return_value = {
-            "/": "root-btrfs-one",
-            "/boot": "dev2",
-            "/home": "home-btrfs-one",
-        }
-        device_tree.GetDeviceData = Mock(wraps=get_device_data)
-        device_tree.GetAncestors = Mock(wraps=get_device_ancestors)
+        progress = InstallationProgress(
+            total_size=1024,
+            callback=callback,
+        )
+
+        progress.update(2048)
+        progress.end()
+
+        callback.assert_called_once_with("Installing software 100%")
+
+    def test_empty_progress(self):
+        """Test the installation progress of an empty payload."""
+        callback = Mock()
 
         progress = InstallationProgress(
-            sysroot="/somewhere",
+            total_size=0,
             callback=callback,
-            installation_size=1024 * 100
         )
 
-        mount_points = progress._get_mount_points_to_count()
+        progress.start()
+        progress.end()
 
-        assert mount_points == [
-            "/somewhere/",
-            "/somewhere/boot",
+        expected = [
+            call("Installing software 0%"),
+            call("Installing software 100%"),
         ]
+        assert callback.call_args_list == expected
@@ -26,7 +26,8 @@ from dasbus.structure import compare_data
 from dasbus.typing import *  # pylint: disable=wildcard-import
 
 from pyanaconda.modules.common.errors.general import UnavailableValueError
-from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask
+from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask, \
+    CompactDNFManagerTask
 
 from pyanaconda.modules.payloads.payload.dnf.installation import SetRPMMacrosTask, \
     ResolvePackagesTask, PrepareDownloadLocationTask, DownloadPackagesTask, InstallPackagesTask, \
@@ -805,6 +806,7 @@ class DNFInterfaceTestCase(unittest.TestCase):
         assert obj.implementation._sources == [source]
         assert obj.implementation._repositories == [repository]
         assert obj.implementation._configuration == configuration
+        assert obj.implementation._loaded_metadata is None
 
     @patch_dbus_publish_object
     def test_tear_down_sources_with_task(self, publisher):
@@ -936,6 +938,8 @@ class DNFInterfaceTestCase(unittest.TestCase):
             "multilib-policy": get_variant(Str, MULTILIB_POLICY_ALL),
             "timeout": get_variant(Int, 10),
             "retries": get_variant(Int, 5),
+            "max-parallel-downloads": get_variant(Int, 0),
+            "download-throttle": get_variant(Str, "10M"),
         }
 
         self._check_dbus_property(
@@ -1028,6 +1032,26 @@ class DNFInterfaceTestCase(unittest.TestCase):
             'visible-groups': get_variant(List[Str], []),
         }
 
+    def test_get_environments_data(self):
+        """Test the GetEnvironmentsData method."""
+        data = CompsEnvironmentData()
+        data.id = "e1"
+        data.name = "The 'e1' environment"
+        data.description = "This is the 'e1' environment."
+
+        dnf_manager = Mock(spec=DNFManager)
+        dnf_manager.get_environments_data.return_value = [data]
+        self.module._dnf_manager = dnf_manager
+
+        assert self.interface.GetEnvironmentsData() == [{
+            'id': get_variant(Str, 'e1'),
+            'name': get_variant(Str, "The 'e1' environment"),
+            'description': get_variant(Str, "This is the 'e1' environment."),
+            'default-groups': get_variant(List[Str], []),
+            'optional-groups': get_variant(List[Str], []),
+            'visible-groups': get_variant(List[Str], []),
+        }]
+
     def test_resolve_group(self):
         """Test the ResolveGroup method."""
         assert self.interface.ResolveGroup("g1") == ""
@@ -1058,6 +1082,23 @@ class DNFInterfaceTestCase(unittest.TestCase):
             'description': get_variant(Str, "This is the 'g1' group.")
         }
 
+    def test_get_groups_data(self):
+        """Test the GetGroupsData method."""
+        data = CompsGroupData()
+        data.id = "g1"
+        data.name = "The 'g1' group"
+        data.description = "This is the 'g1' group."
+
+        dnf_manager = Mock(spec=DNFManager)
+        dnf_manager.get_groups_data.return_value = [data]
+        self.module._dnf_manager = dnf_manager
+
+        assert self.interface.GetGroupsData() == [{
+            'id': get_variant(Str, 'g1'),
+            'name': get_variant(Str, "The 'g1' group"),
+            'description': get_variant(Str, "This is the 'g1' group.")
+        }]
+
     @patch_dbus_publish_object
     def test_validate_packages_selection_with_task(self, publisher):
         """Test the ValidatePackagesSelectionWithTask method."""
@@ -1299,6 +1340,7 @@ class DNFModuleTestCase(unittest.TestCase):
             DownloadPackagesTask,
             InstallPackagesTask,
             CleanUpDownloadLocationTask,
+            CompactDNFManagerTask,
         ])
 
     def test_post_install_with_tasks(self):
@@ -22,6 +22,8 @@ import pytest
 
 from unittest.mock import patch, call, Mock
 
+from blivet.size import Size
+
 from pyanaconda.core.constants import RPM_LANGUAGES_NONE, MULTILIB_POLICY_ALL
 from pyanaconda.core.path import join_paths
 from pyanaconda.modules.common.errors.installation import NonCriticalInstallationError, \
@@ -248,6 +250,18 @@ class DownloadPackagesTaskTestCase(unittest.TestCase):
         callback("Downloaded 50%")
         callback("Downloaded 100%")
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.conf")
+    def test_run_chunks(self, mock_conf):
+        """Run the DownloadPackagesTask class with chunks."""
+        mock_conf.payload.installation_chunk_size = Size("10 MiB")
+        dnf_manager = Mock()
+
+        task = DownloadPackagesTask(dnf_manager)
+        task.run()
+
+        # The packages are downloaded during the installation.
+        dnf_manager.download_packages.assert_not_called()
+
 
 class InstallPackagesTaskTestCase(unittest.TestCase):
 
@@ -278,6 +292,21 @@ class InstallPackagesTaskTestCase(unittest.TestCase):
         callback("Installing p2")
         callback("Installing p3")
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.conf")
+    def test_run_chunks(self, mock_conf):
+        """Run the InstallPackagesTask class with chunks."""
+        mock_conf.payload.installation_chunk_size = Size("10 MiB")
+        dnf_manager = Mock()
+
+        task = InstallPackagesTask(dnf_manager)
+        task.run()
+
+        dnf_manager.install_packages.assert_not_called()
+        dnf_manager.install_packages_in_chunks.assert_called_once_with(
+            task.report_progress,
+            Size("10 MiB")
+        )
+
 
 class PrepareDownloadLocationTaskTestCase(unittest.TestCase):
 
@@ -386,6 +415,55 @@ class ResolvePackagesTaskTestCase(unittest.TestCase):
         )
         dnf_manager.resolve_selection.assert_called_once_with()
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_driver_disk_requirements")
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_platform_requirements")
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_language_requirements")
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_remote_requirements")
+    @patch("pyanaconda.modules.payloads.payload.dnf.validation.get_kernel_package")
+    def test_resolve_validated(self, kernel_getter, req_getter1, req_getter2, req_getter3,
+                               req_getter4):
+        """Test the ResolvePackagesTask task with a validated selection."""
+        kernel_getter.return_value = "kernel"
+        req_getter1.return_value = [Requirement.for_package("r1")]
+        req_getter2.return_value = [Requirement.for_group("r2")]
+        req_getter3.return_value = []
+        req_getter4.return_value = []
+
+        selection = PackagesSelectionData()
+        selection.excluded_packages = ["p1"]
+
+        dnf_manager = Mock()
+        dnf_manager.default_environment = None
+        dnf_manager.get_selection_key.side_effect = lambda **kwargs: tuple(kwargs["include_list"])
+
+        # The validation resolved the selection without the requirements.
+        dnf_manager.resolved_selection = ("@core", "kernel")
+
+        task = ResolvePackagesTask(dnf_manager, selection)
+        task.run()
+
+        dnf_manager.clear_selection.assert_not_called()
+        dnf_manager.disable_modules.assert_not_called()
+        dnf_manager.enable_modules.assert_not_called()
+        dnf_manager.apply_specs.assert_called_once_with(["r1", "@r2"], ["p1"])
+        dnf_manager.resolve_selection.assert_called_once_with()
+        dnf_manager.set_resolved_selection.assert_called_with(
+            ("@core", "kernel", "r1", "@r2")
+        )
+
+        # Nothing is applied without the requirements.
+        dnf_manager.reset_mock()
+        dnf_manager.resolved_selection = ("@core", "kernel")
+        req_getter1.return_value = []
+        req_getter2.return_value = []
+
+        task = ResolvePackagesTask(dnf_manager, selection)
+        task.run()
+
+        dnf_manager.apply_specs.assert_not_called()
+        dnf_manager.resolve_selection.assert_not_called()
+        dnf_manager.set_resolved_selection.assert_not_called()
+
     @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_driver_disk_requirements")
     @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_platform_requirements")
     @patch("pyanaconda.modules.payloads.payload.dnf.installation.collect_language_requirements")
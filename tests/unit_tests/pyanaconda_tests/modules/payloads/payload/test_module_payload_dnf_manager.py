@@ -15,7 +15,10 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import json
+import multiprocessing
 import os.path
+import threading
 import unittest
 from textwrap import dedent
 
@@ -27,9 +30,9 @@ from unittest.mock import patch, Mock, call
 from blivet.size import Size, ROUND_UP
 from dasbus.structure import compare_data
 
-from dnf.callback import STATUS_OK, STATUS_FAILED, PKG_SCRIPTLET
+from dnf.callback import STATUS_OK, STATUS_FAILED, STATUS_ALREADY_EXISTS, PKG_SCRIPTLET
 from dnf.comps import Environment, Comps, Group
-from dnf.exceptions import MarkingErrors, DepsolveError, RepoError
+from dnf.exceptions import MarkingErrors, DepsolveError, RepoError, DownloadError
 from dnf.package import Package
 from dnf.transaction import PKG_INSTALL, TRANS_POST
 from dnf.repo import Repo
@@ -44,7 +47,10 @@ from pyanaconda.modules.common.structures.comps import CompsEnvironmentData, Com
 from pyanaconda.modules.common.structures.packages import PackagesConfigurationData
 from pyanaconda.modules.common.structures.payload import RepoConfigurationData
 from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager, \
-    InvalidSelectionError, BrokenSpecsError, MissingSpecsError, MetadataError
+    InvalidSelectionError, BrokenSpecsError, MissingSpecsError, MetadataError, LoadedMetadata
+from pyanaconda.modules.payloads.payload.dnf.download_progress import DownloadProgress
+from pyanaconda.modules.payloads.payload.dnf.timing_report import TimingReport
+from pyanaconda.modules.payloads.payload.dnf.transaction_worker import run_transaction_worker
 
 
 class DNFManagerTestCase(unittest.TestCase):
@@ -87,11 +93,38 @@ class DNFManagerTestCase(unittest.TestCase):
         """Test the clear_cache method."""
         self.dnf_manager.clear_cache()
 
+    def test_compact(self):
+        """Test the compact method."""
+        base = self.dnf_manager._base
+        base.repos.add(Repo("r1", base.conf))
+        base.fill_sack(load_system_repo=False, load_available_repos=False)
+
+        self.dnf_manager._package_names = Mock()
+        self.dnf_manager._resolved_selection = Mock()
+        self.dnf_manager._comps_data = Mock()
+
+        with self.assertLogs(level="INFO") as cm:
+            self.dnf_manager.compact()
+
+        assert "Released memory of the DNF base:" in "\n".join(cm.output)
+
+        # The package data are released.
+        assert base._sack is None
+        assert base._comps is None
+        assert self.dnf_manager._package_names is None
+        assert self.dnf_manager._resolved_selection is None
+        assert self.dnf_manager._comps_data is None
+
+        # The repositories are kept.
+        assert self.dnf_manager._base == base
+        assert self.dnf_manager.repositories == ["r1"]
+
     def test_set_default_configuration(self):
         """Test the default configuration of the DNF base."""
         self._check_configuration(
             "gpgcheck = 0",
-            "skip_if_unavailable = 0"
+            "skip_if_unavailable = 0",
+            "fastestmirror = 0",
         )
         self._check_configuration(
             "cachedir = /tmp/dnf.cache",
@@ -185,6 +218,24 @@ class DNFManagerTestCase(unittest.TestCase):
         assert self.dnf_manager._ignore_broken_packages is True
         assert self.dnf_manager._ignore_missing_packages is True
 
+    def test_configure_base_downloads(self):
+        """Test the configuration of the package downloads."""
+        data = PackagesConfigurationData()
+        data.max_parallel_downloads = 10
+        data.download_throttle = "1M"
+
+        self.dnf_manager.configure_base(data)
+        self._check_configuration(
+            "max_parallel_downloads = 10",
+        )
+
+        assert self.dnf_manager._base.conf.throttle == 1024 * 1024
+        assert self.dnf_manager._adaptive_downloads is False
+
+        data.max_parallel_downloads = 0
+        self.dnf_manager.configure_base(data)
+        assert self.dnf_manager._adaptive_downloads is True
+
     def test_dump_configuration(self):
         """Test the dump of the DNF configuration."""
         with self.assertLogs(level="DEBUG") as cm:
@@ -217,6 +268,31 @@ class DNFManagerTestCase(unittest.TestCase):
 
         assert size == Size("528 KiB")
 
+    def test_get_installation_size_cached(self):
+        """Test the cached result of the get_installation_size method."""
+        pkg_1 = Mock(installsize=1024 * 100, files=["/file"] * 10)
+        pkg_2 = Mock(installsize=1024 * 200, files=["/file"] * 20)
+
+        # Fake transaction.
+        self.dnf_manager._base.transaction = [Mock(pkg=pkg_1), Mock(pkg=pkg_2)]
+        size = self.dnf_manager.get_installation_size()
+        assert size.round_to_nearest("KiB", ROUND_UP) == Size("528 KiB")
+
+        # The size is cached for the same transaction.
+        pkg_1.installsize = 0
+        assert self.dnf_manager.get_installation_size() == size
+
+        # The number of files is cached for the same package.
+        pkg_1.files = []
+        self.dnf_manager._base.transaction = [Mock(pkg=pkg_1)]
+        size = self.dnf_manager.get_installation_size()
+        assert size.round_to_nearest("KiB", ROUND_UP) == Size("66 KiB")
+
+        # The cache is dropped with the base.
+        self.dnf_manager.reset_base()
+        assert self.dnf_manager._files_numbers == {}
+        assert self.dnf_manager._installation_size == (None, None)
+
     def test_get_download_size(self):
         """Test the get_download_size method."""
         # No transaction.
@@ -235,6 +311,31 @@ class DNFManagerTestCase(unittest.TestCase):
 
         assert size == Size("450 MiB")
 
+    @patch("dnf.base.Base.transaction")
+    def test_get_chunked_download_size(self, transaction):
+        """Test the get_chunked_download_size method."""
+        p1 = Mock(downloadsize=1024 * 1024 * 10)
+        p2 = Mock(downloadsize=1024 * 1024 * 20)
+        p3 = Mock(downloadsize=1024 * 1024 * 50)
+        p4 = Mock(downloadsize=1024 * 1024 * 10)
+
+        # The chunk with cyclic dependencies is bigger than the chunk size.
+        chunks = [[p1, p2], [p3], [p4]]
+        self.dnf_manager.get_installation_chunks = Mock(return_value=chunks)
+
+        size = self.dnf_manager.get_chunked_download_size(Size("30 MiB"))
+        assert size == Size("230 MiB")
+        self.dnf_manager.get_installation_chunks.assert_called_once_with(Size("30 MiB"))
+
+        # One chunk.
+        self.dnf_manager.get_installation_chunks = Mock(return_value=[[p1]])
+        size = self.dnf_manager.get_chunked_download_size(Size("30 MiB"))
+        assert size == Size("160 MiB")
+
+    def test_get_chunked_download_size_no_transaction(self):
+        """Test the get_chunked_download_size method without a transaction."""
+        assert self.dnf_manager.get_chunked_download_size(Size("30 MiB")) == Size(0)
+
     @patch("dnf.module.module_base.ModuleBase.enable")
     def test_enable_modules(self, module_base_enable):
         """Test the enable_modules method."""
@@ -282,6 +383,7 @@ class DNFManagerTestCase(unittest.TestCase):
     @patch("dnf.base.Base.install_specs")
     def test_apply_specs(self, install_specs):
         """Test the apply_specs method."""
+        self.dnf_manager._package_names = Mock()
         self.dnf_manager.apply_specs(
             include_list=["@g1", "p1"],
             exclude_list=["@g2", "p2"]
@@ -293,6 +395,9 @@ class DNFManagerTestCase(unittest.TestCase):
             strict=True
         )
 
+        # The index of package names is dropped.
+        assert self.dnf_manager._package_names is None
+
     @patch("dnf.base.Base.install_specs")
     def test_apply_specs_error(self, install_specs):
         """Test the apply_specs method with an error."""
@@ -412,6 +517,240 @@ class DNFManagerTestCase(unittest.TestCase):
             "p3": 100
         }
 
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_packages_local(self, transaction, download_packages):
+        """Test the download_packages method with local packages."""
+        callback = Mock()
+        transaction.install_set = ["p1", "p2", "p3"]
+        download_packages.side_effect = self._download_packages_local
+
+        self.dnf_manager.download_packages(callback)
+
+        callback.assert_has_calls([
+            call('Downloading 3 RPMs, 100 B / 300 B (33%) done, 1 RPMs found locally.'),
+            call('Downloading 3 RPMs, 200 B / 300 B (66%) done, 2 RPMs found locally.'),
+            call('Downloading 3 RPMs, 300 B / 300 B (100%) done, 2 RPMs found locally.'),
+        ])
+
+    def _download_packages_local(self, packages, progress):
+        """Simulate the download of packages that are partially available locally."""
+        progress.start(total_files=3, total_size=300)
+
+        for name, status in zip(packages, [STATUS_ALREADY_EXISTS, STATUS_ALREADY_EXISTS, STATUS_OK]):
+            payload = Mock()
+            payload.__str__ = Mock(return_value=name)
+            payload.download_size = 100
+
+            progress.last_time = 0
+            progress.end(payload, status, "Message!")
+
+        assert progress.local_files == 2
+        assert progress.local_size == Size(200)
+
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_packages_prefetched(self, transaction, download_packages):
+        """Test the download_packages method with prefetched packages."""
+        callback = Mock()
+        transaction.install_set = ["p1", "p2", "p3"]
+
+        def _download_packages(packages, progress):
+            progress.start(total_files=3, total_size=300)
+
+            for name, status in zip(packages, [STATUS_ALREADY_EXISTS, STATUS_OK, STATUS_OK]):
+                payload = Mock(download_size=100)
+                payload.__str__ = Mock(return_value=name)
+
+                progress.last_time = 0
+                progress.end(payload, status, "Message!")
+
+            assert progress.local_files == 0
+
+        download_packages.side_effect = _download_packages
+
+        # The prefetched packages are reported as downloaded.
+        self.dnf_manager._prefetched_packages = {"p1"}
+        self.dnf_manager.download_packages(callback)
+
+        callback.assert_has_calls([
+            call('Downloading 3 RPMs, 100 B / 300 B (33%) done.'),
+            call('Downloading 3 RPMs, 200 B / 300 B (66%) done.'),
+            call('Downloading 3 RPMs, 300 B / 300 B (100%) done.'),
+        ])
+
+        assert self.dnf_manager._prefetched_packages == set()
+
+    @patch("dnf.base.Base.download_packages")
+    def test_prefetch_packages(self, download_packages):
+        """Test the _prefetch_packages method."""
+        def _download_packages(packages, progress):
+            for name in packages:
+                payload = Mock(download_size=100)
+                payload.__str__ = Mock(return_value=name)
+                progress.end(payload, STATUS_OK, "Message!")
+
+            raise DownloadError({"p3": ["Error!"]})
+
+        download_packages.side_effect = _download_packages
+        self.dnf_manager._prefetch_packages(["p1", "p2"])
+
+        # Remember the downloaded packages.
+        assert self.dnf_manager._prefetched_packages == {"p1", "p2"}
+
+    def _read_timing_report(self, path):
+        """Read records of the timing report."""
+        with open(path, "r") as f:
+            return [json.loads(line) for line in f]
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.TimingReport")
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_packages_timings(self, transaction, download_packages, report_cls):
+        """Test the timing report of the download_packages method."""
+        transaction.install_set = ["p1", "p2", "p3"]
+        download_packages.side_effect = self._download_packages_local
+
+        with TemporaryDirectory() as d:
+            path = os.path.join(d, "report.jsonl")
+            report_cls.side_effect = lambda: TimingReport(path)
+
+            self.dnf_manager.download_packages(Mock())
+            records = self._read_timing_report(path)
+
+        assert [(r["event"], r["package"], r["size"], r["status"]) for r in records] == [
+            ("download", "p1", 100, "found locally"),
+            ("download", "p2", 100, "found locally"),
+            ("download", "p3", 100, "downloaded"),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.download_progress.time.monotonic")
+    def test_download_progress_timings(self, monotonic):
+        """Test the transfer times of the download progress."""
+        report = TimingReport()
+        progress = DownloadProgress(callback=Mock(), report=report)
+        monotonic.side_effect = [10, 12, 13, 14, 17]
+
+        p1 = Mock(download_size=100)
+        p1.__str__ = Mock(return_value="p1")
+
+        p2 = Mock(download_size=100)
+        p2.__str__ = Mock(return_value="p2")
+
+        # The durations are measured from the start of the batch.
+        progress.start(total_files=2, total_size=200)
+        progress.end(p1, STATUS_ALREADY_EXISTS, "Message!")
+        progress.progress(p2, 25)
+        progress.progress(p2, 50)
+        progress.end(p2, STATUS_OK, "Message!")
+
+        assert report.records == [{
+            "event": "download",
+            "duration": 2,
+            "package": "p1",
+            "size": 100,
+            "status": "found locally",
+            "transfer": None,
+        }, {
+            "event": "download",
+            "duration": 7,
+            "package": "p2",
+            "size": 100,
+            "status": "downloaded",
+            "transfer": 4,
+        }]
+
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_packages_adaptive(self, transaction, download_packages):
+        """Test the download_packages method with the adaptive parallelism."""
+        packages = ["p{}".format(i) for i in range(1, 21)]
+        transaction.install_set = packages
+        calls = []
+
+        def _download_packages(batch, progress):
+            calls.append((batch, self.dnf_manager._base.conf.max_parallel_downloads))
+
+            if len(calls) == 1:
+                raise DownloadError({"p1": ["Error!"]})
+
+        download_packages.side_effect = _download_packages
+        self.dnf_manager._adaptive_downloads = True
+
+        with self.assertLogs(level="WARNING") as cm:
+            self.dnf_manager.download_packages(Mock())
+
+        msg = "Failed to download a batch of packages:"
+        assert any(map(lambda x: msg in x, cm.output))
+
+        # The failed batch is downloaded again with a lower parallelism.
+        assert calls == [
+            (packages[0:12], 3),
+            (packages[0:12], 1),
+            (packages[12:16], 1),
+            (packages[16:20], 1),
+        ]
+
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_packages_adaptive_retry(self, transaction, download_packages):
+        """Test the progress of a retried batch of packages."""
+        transaction.install_set = ["p1", "p2"]
+        progresses = []
+
+        def _download_packages(batch, progress):
+            progresses.append(progress)
+            progress.start(total_files=2, total_size=200)
+
+            for name in batch:
+                payload = Mock(download_size=100)
+                payload.__str__ = Mock(return_value=name)
+
+                if len(progresses) == 1 and name == "p2":
+                    raise DownloadError({"p2": ["Error!"]})
+
+                status = STATUS_OK if len(progresses) == 1 or name == "p2" \
+                    else STATUS_ALREADY_EXISTS
+
+                progress.end(payload, status, "")
+
+        download_packages.side_effect = _download_packages
+        self.dnf_manager._adaptive_downloads = True
+
+        with self.assertLogs(level="WARNING"):
+            self.dnf_manager.download_packages(Mock())
+
+        # The retried batch is counted only once and the package
+        # downloaded by the failed batch is not reported as local.
+        progress = progresses[-1]
+        assert len(progresses) == 2
+        assert progress.total_files == 2
+        assert progress.total_size == 200
+        assert progress.local_files == 0
+        assert progress.local_size == 0
+        assert self.dnf_manager._get_downloaded_size(progress) == 200
+
+    def test_import_pool_packages(self):
+        """Test the _import_pool_packages method."""
+        with TemporaryDirectory() as d:
+            p1 = Mock(location="Packages/p/p1-1.0-1.noarch.rpm")
+            p1.localPkg.return_value = os.path.join(d, "p1-1.0-1.noarch.rpm")
+            p1.returnIdSum.return_value = ("sha256", "abc")
+
+            p2 = Mock(location="Packages/p/p2-1.0-1.noarch.rpm")
+            p2.localPkg.return_value = os.path.join(d, "p2-1.0-1.noarch.rpm")
+            p2.returnIdSum.return_value = ("sha256", "def")
+
+            # The p2 package is already downloaded.
+            open(p2.localPkg.return_value, "w").close()
+
+            self.dnf_manager._package_pool = Mock(enabled=True)
+            self.dnf_manager._import_pool_packages([p1, p2])
+
+            self.dnf_manager._package_pool.import_package.assert_called_once_with(
+                "p1-1.0-1.noarch.rpm", "sha256", "abc", os.path.join(d, "p1-1.0-1.noarch.rpm")
+            )
+
     @patch("dnf.base.Base.download_packages")
     @patch("dnf.base.Base.transaction")
     def test_download_packages_failed(self, transaction, download_packages):
@@ -449,6 +788,8 @@ class DNFManagerTestCase(unittest.TestCase):
             "p3": 25
         }
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.transaction_progress."
+           "TRANSACTION_PROGRESS_INTERVAL", 0)
     @patch("dnf.base.Base.do_transaction")
     def test_install_packages(self, do_transaction):
         """Test the install_packages method."""
@@ -470,6 +811,96 @@ class DNFManagerTestCase(unittest.TestCase):
             'Configuring p3.x86_64',
         ]
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.transaction_progress."
+           "TRANSACTION_PROGRESS_INTERVAL", 3600)
+    @patch("dnf.base.Base.do_transaction")
+    def test_install_packages_frames(self, do_transaction):
+        """Test the install_packages method with frames of the progress."""
+        calls = []
+        do_transaction.side_effect = self._install_packages
+
+        # Fake transaction.
+        self.dnf_manager._base.transaction = [Mock(), Mock(), Mock()]
+
+        with self.assertLogs(level="INFO") as cm:
+            self.dnf_manager.install_packages(calls.append)
+
+        # Only the last message of the frame is reported.
+        assert calls == [
+            'Configuring p3.x86_64',
+        ]
+
+        # All messages of the frame are logged.
+        output = "\n".join(cm.output)
+        assert output.count("Installed: ") == 3
+        assert output.count("Configuring (running scriptlet for): ") == 6
+        assert "Post installation setup phase started." in output
+        assert "The peak memory usage of the transaction process was" in output
+        assert "DNF quit" in output
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.TimingReport")
+    @patch("dnf.base.Base.do_transaction")
+    def test_install_packages_timings(self, do_transaction, report_cls):
+        """Test the timing report of the install_packages method."""
+        do_transaction.side_effect = self._install_packages
+
+        # Fake transaction.
+        self.dnf_manager._base.transaction = [Mock(), Mock(), Mock()]
+
+        with TemporaryDirectory() as d:
+            path = os.path.join(d, "report.jsonl")
+            report_cls.side_effect = lambda: TimingReport(path)
+
+            with self.assertLogs(level="INFO") as cm:
+                self.dnf_manager.install_packages(Mock())
+
+            records = self._read_timing_report(path)
+
+        events = [r["event"] for r in records]
+        assert events.count("install") == 3
+        assert events.count("scriptlet") == 6
+        assert events[-2:] == ["post", "transaction"]
+
+        phases = [r["phase"] for r in records if r["event"] == "scriptlet"]
+        assert phases == ["install"] * 3 + ["post"] * 3
+
+        assert "The slowest scriptlets:" in "\n".join(cm.output)
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.conf")
+    def test_create_transaction_process(self, mock_conf):
+        """Test the _create_transaction_process method."""
+        sender = Mock()
+
+        # Fork the payload module by default.
+        mock_conf.payload.transaction_start_method = "fork"
+        process = self.dnf_manager._create_transaction_process(sender)
+
+        assert isinstance(process, multiprocessing.get_context("fork").Process)
+        assert process._target == self.dnf_manager._run_transaction
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.describe_transaction")
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.conf")
+    def test_create_transaction_worker(self, mock_conf, describe):
+        """Test the _create_transaction_process method with a worker."""
+        sender = Mock()
+        description = Mock()
+        describe.return_value = description
+
+        for method in ("spawn", "forkserver"):
+            mock_conf.payload.transaction_start_method = method
+            process = self.dnf_manager._create_transaction_process(sender)
+
+            assert isinstance(process, multiprocessing.get_context(method).Process)
+            assert process._target == run_transaction_worker
+            assert process._args == (description, sender)
+
+        # Fork the payload module if the transaction can't be described.
+        describe.return_value = None
+        process = self.dnf_manager._create_transaction_process(sender)
+
+        assert isinstance(process, multiprocessing.get_context("fork").Process)
+        assert process._target == self.dnf_manager._run_transaction
+
     def _get_package(self, name):
         """Get a mocked package of the specified name."""
         package = Mock(spec=Package)
@@ -496,6 +927,172 @@ class DNFManagerTestCase(unittest.TestCase):
         for ts_done, package in enumerate(packages):
             progress.progress(package, PKG_SCRIPTLET, 100, 100, ts_done + 1, ts_total)
 
+    @patch("dnf.base.Base.transaction")
+    def test_install_packages_in_chunks(self, transaction):
+        """Test the install_packages_in_chunks method."""
+        p1, p2, p3 = Mock(), Mock(), Mock()
+        callback = Mock()
+        manager = Mock()
+        self.dnf_manager._base.conf.install_weak_deps = True
+
+        self.dnf_manager.get_installation_chunks = Mock(return_value=[[p1, p2], [p3]])
+        self.dnf_manager._get_package_key = Mock(side_effect=lambda p: p)
+        self.dnf_manager._find_packages = Mock(side_effect=lambda keys: list(keys))
+
+        for name in ["_select_packages", "download_packages", "install_packages",
+                     "_remove_downloaded_packages", "_load_installed_packages"]:
+            method = Mock()
+            setattr(self.dnf_manager, name, method)
+            manager.attach_mock(method, name)
+
+        self.dnf_manager.install_packages_in_chunks(callback, Size("10 MiB"))
+
+        self.dnf_manager.get_installation_chunks.assert_called_once_with(Size("10 MiB"))
+        assert manager.mock_calls == [
+            call._select_packages([p1, p2]),
+            call.download_packages(callback),
+            call.install_packages(callback, prefetch=[p3]),
+            call._remove_downloaded_packages(),
+            call._load_installed_packages(),
+            call._select_packages([p3]),
+            call.download_packages(callback),
+            call.install_packages(callback, prefetch=None),
+            call._remove_downloaded_packages(),
+            call._load_installed_packages(),
+        ]
+
+        callback.assert_has_calls([
+            call("Installing packages (chunk 1 of 2)"),
+            call("Installing packages (chunk 2 of 2)"),
+        ])
+
+        # The weak dependencies are installed only by the whole transaction.
+        assert self.dnf_manager._base.conf.install_weak_deps is True
+
+    def test_install_packages_in_chunks_weak_deps(self):
+        """Test the weak dependencies of the install_packages_in_chunks method."""
+        self.dnf_manager._base.conf.install_weak_deps = True
+        self.dnf_manager.get_installation_chunks = Mock(return_value=[[Mock()]])
+        self.dnf_manager._get_package_key = Mock(side_effect=lambda p: p)
+
+        def _select_packages(keys):
+            assert self.dnf_manager._base.conf.install_weak_deps is False
+            raise PayloadInstallationError("Fake!")
+
+        self.dnf_manager._select_packages = Mock(side_effect=_select_packages)
+
+        with pytest.raises(PayloadInstallationError):
+            self.dnf_manager.install_packages_in_chunks(Mock(), Size("10 MiB"))
+
+        self.dnf_manager._select_packages.assert_called_once()
+        assert self.dnf_manager._base.conf.install_weak_deps is True
+
+    @patch("dnf.base.Base.transaction")
+    @patch("dnf.base.Base.sack")
+    def test_get_installation_chunks(self, sack, transaction):
+        """Test the file dependencies of the get_installation_chunks method."""
+        p1 = Mock(requires=["/usr/bin/sh", "p2"], downloadsize=1)
+        p2 = Mock(requires=[], downloadsize=1)
+        p3 = Mock(requires=["/usr/bin/sh"], downloadsize=1)
+        p4 = Mock(requires=["p2"], downloadsize=1)
+
+        for p, name in zip([p1, p2, p3, p4], ["p1", "p2", "p3", "p4"]):
+            p.__lt__ = lambda a, b: str(a) < str(b)
+            p.__str__ = Mock(return_value=name)
+
+        def _filter(provides=None, file=None):
+            result = Mock()
+
+            if file:
+                result.__iter__ = Mock(return_value=iter([p3]))
+            else:
+                result.__iter__ = Mock(return_value=iter([p for p in [p2] if "p2" in provides]))
+                result.union = lambda other: list(result) + list(other)
+
+            return result
+
+        transaction.install_set = [p1, p2, p3, p4]
+        query = sack.query.return_value.filterm.return_value
+        query.filter.side_effect = _filter
+
+        chunks = self.dnf_manager.get_installation_chunks(Size(1))
+        assert chunks == [[p2], [p3], [p1], [p4]]
+
+        query.filter.assert_any_call(file=["/usr/bin/sh"])
+
+    @patch("dnf.module.module_base.ModuleBase.disable")
+    @patch("dnf.module.module_base.ModuleBase.enable")
+    @patch("dnf.base.Base.install_specs")
+    def test_select_packages(self, install_specs, enable, disable):
+        """Test the _select_packages method."""
+        p1, p2 = Mock(), Mock()
+        sack = Mock()
+
+        self.dnf_manager.disable_modules(["m1"])
+        self.dnf_manager.enable_modules(["m2:1"])
+        self.dnf_manager.apply_specs(["p1", "p2"], ["p3", "p4*", "@g1"])
+
+        self.dnf_manager._base._sack = sack
+        self.dnf_manager._base.package_install = Mock()
+        self.dnf_manager._find_packages = Mock(return_value=[p1, p2])
+        self.dnf_manager.resolve_selection = Mock()
+        self.dnf_manager._package_names = Mock()
+
+        with patch("dnf.base.Base.reset"):
+            self.dnf_manager._select_packages(["k1", "k2"])
+
+        # The selection settings are applied again.
+        disable.assert_called_with(["m1"])
+        enable.assert_called_with(["m2:1"])
+        sack.query.return_value.filterm.assert_called_once_with(name__glob=["p3", "p4*"])
+        sack.add_excludes.assert_called_once_with(sack.query.return_value.filterm.return_value)
+        assert self.dnf_manager._package_names is None
+
+        self.dnf_manager._find_packages.assert_called_once_with(["k1", "k2"], strict=True)
+        self.dnf_manager._base.package_install.assert_has_calls([
+            call(p1, strict=True),
+            call(p2, strict=True),
+        ])
+        self.dnf_manager.resolve_selection.assert_called_once_with()
+
+    def test_select_missing_packages(self):
+        """Test the _select_packages method with missing packages."""
+        self.dnf_manager._find_packages = Mock(
+            side_effect=RuntimeError("Some packages are not available: p1")
+        )
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            self.dnf_manager._select_packages(["k1"])
+
+        assert str(cm.value) == "Some packages are not available: p1"
+
+    @patch("dnf.base.Base.transaction")
+    def test_remove_downloaded_packages(self, transaction):
+        """Test the _remove_downloaded_packages method."""
+        with TemporaryDirectory() as d:
+            download_location = os.path.join(d, "download")
+            repo_location = os.path.join(d, "repo")
+            os.mkdir(download_location)
+            os.mkdir(repo_location)
+
+            p1 = Mock()
+            p1.localPkg.return_value = os.path.join(download_location, "p1.rpm")
+            p2 = Mock()
+            p2.localPkg.return_value = os.path.join(repo_location, "p2.rpm")
+            p3 = Mock()
+            p3.localPkg.return_value = os.path.join(download_location, "p3.rpm")
+
+            for p in [p1, p2]:
+                open(p.localPkg.return_value, "w").close()
+
+            transaction.install_set = [p1, p2, p3]
+            self.dnf_manager.set_download_location(download_location)
+            self.dnf_manager._remove_downloaded_packages()
+
+            # Packages from local repositories are kept.
+            assert not os.path.exists(p1.localPkg.return_value)
+            assert os.path.exists(p2.localPkg.return_value)
+
     @patch("dnf.base.Base.do_transaction")
     def test_install_packages_failed(self, do_transaction):
         """Test the failed install_packages method."""
@@ -632,7 +1229,10 @@ class DNFManagerTestCase(unittest.TestCase):
     @patch("dnf.subject.Subject.get_best_query")
     def test_is_package_available(self, get_best_query):
         """Test the is_package_available method."""
-        self.dnf_manager._base._sack = Mock()
+        sack = Mock()
+        sack.query.return_value.available.return_value = []
+
+        self.dnf_manager._base._sack = sack
         assert self.dnf_manager.is_package_available("kernel") is True
 
         # No package.
@@ -654,17 +1254,19 @@ class DNFManagerTestCase(unittest.TestCase):
         p2 = self._get_package("langpacks-core-cs")
         p3 = self._get_package("langpacks-core-font-cs")
 
+        p4 = self._get_package("kernel")
+
         sack = Mock()
-        sack.query.return_value.available.return_value.filter.return_value = [
-            p1, p2, p3
+        sack.query.return_value.available.return_value = [
+            p1, p2, p3, p4
         ]
 
         # With metadata.
         self.dnf_manager._base._sack = sack
         assert self.dnf_manager.match_available_packages("langpacks-*") == [
-            "langpacks-cs",
             "langpacks-core-cs",
-            "langpacks-core-font-cs"
+            "langpacks-core-font-cs",
+            "langpacks-cs",
         ]
 
         # No metadata.
@@ -676,6 +1278,61 @@ class DNFManagerTestCase(unittest.TestCase):
         msg = "There is no metadata about packages!"
         assert any(map(lambda x: msg in x, cm.output))
 
+    @patch("dnf.subject.Subject.get_best_query")
+    def test_package_names(self, get_best_query):
+        """Test the index of names of available packages."""
+        sack = Mock()
+        sack.query.return_value.available.return_value = [
+            self._get_package("kernel"),
+            self._get_package("kernel-64k"),
+            self._get_package("kernel"),
+        ]
+
+        self.dnf_manager._base._sack = sack
+        get_best_query.return_value = None
+
+        assert self.dnf_manager.is_package_available("kernel") is True
+        assert self.dnf_manager.is_package_available("kernel-64k") is True
+        assert self.dnf_manager.is_package_available("kernel-rt") is False
+        assert self.dnf_manager.match_available_packages("kernel*") == ["kernel", "kernel-64k"]
+        assert self.dnf_manager.match_available_packages("kernel") == ["kernel"]
+        assert self.dnf_manager.match_available_packages("bash") == []
+
+        # The index is created only once.
+        sack.query.assert_called_once_with()
+
+    def test_resolved_selection(self):
+        """Test the resolved_selection property."""
+        key = self.dnf_manager.get_selection_key(["p1"], ["p2"], ["m1"], ["m2"])
+        assert key == self.dnf_manager.get_selection_key(["p1"], ["p2"], ["m1"], ["m2"])
+        assert key != self.dnf_manager.get_selection_key(["p1"], [], ["m1"], ["m2"])
+        assert key != self.dnf_manager.get_selection_key(["p1"], ["p2"], [], ["m2"])
+
+        assert self.dnf_manager.resolved_selection is None
+        self.dnf_manager.set_resolved_selection(key)
+        assert self.dnf_manager.resolved_selection == key
+
+        # The key depends on the configuration.
+        data = PackagesConfigurationData()
+        data.weakdeps_excluded = True
+        self.dnf_manager.configure_base(data)
+        assert key != self.dnf_manager.get_selection_key(["p1"], ["p2"], ["m1"], ["m2"])
+
+        # The key depends on the metadata.
+        self.dnf_manager._md_hashes = {"r1": b"1"}
+        assert key != self.dnf_manager.get_selection_key(["p1"], ["p2"], ["m1"], ["m2"])
+
+        # The resolved selection is cleared.
+        self.dnf_manager._enabled_modules = ["m1"]
+        self.dnf_manager._disabled_modules = ["m2"]
+        self.dnf_manager._excluded_specs = ["p2"]
+
+        self.dnf_manager.clear_selection()
+        assert self.dnf_manager.resolved_selection is None
+        assert self.dnf_manager._enabled_modules == []
+        assert self.dnf_manager._disabled_modules == []
+        assert self.dnf_manager._excluded_specs == []
+
     @patch("dnf.base.Base.resolve")
     def test_resolve_selection(self, resolve):
         """Test the resolve_selection method."""
@@ -910,6 +1567,36 @@ class DNFManagerCompsTestCase(unittest.TestCase):
         data = self.dnf_manager.get_environment_data("e1")
         assert data.default_groups == ["g1", "g3"]
 
+    def test_get_environments_data(self):
+        """Test the get_environments_data method."""
+        self._add_group("g1")
+        self._add_group("g2", visible=False)
+        self._add_environment("e1", optional=["g1", "g2"], default=["g2"])
+        self._add_environment("e2")
+
+        data = self.dnf_manager.get_environments_data()
+        assert [d.id for d in data] == ["e1", "e2"]
+        assert compare_data(data[0], self.dnf_manager.get_environment_data("e1"))
+        assert compare_data(data[1], self.dnf_manager.get_environment_data("e2"))
+
+        # The data are cached.
+        self._add_environment("e3")
+        assert self.dnf_manager.get_environments_data() == data
+
+    def test_get_groups_data(self):
+        """Test the get_groups_data method."""
+        self._add_group("g1")
+        self._add_group("g2", visible=False)
+
+        data = self.dnf_manager.get_groups_data()
+        assert [d.id for d in data] == ["g1", "g2"]
+        assert compare_data(data[0], self.dnf_manager.get_group_data("g1"))
+        assert compare_data(data[1], self.dnf_manager.get_group_data("g2"))
+
+        # The data are cached.
+        self._add_group("g3")
+        assert self.dnf_manager.get_groups_data() == data
+
     def test_environment_data_available_groups(self):
         """Test the get_available_groups method."""
         data = CompsEnvironmentData()
@@ -1367,6 +2054,138 @@ class DNFManagerReposTestCase(unittest.TestCase):
         repo.load.assert_called_once()
         assert repo.enabled is True
 
+    def test_load_repository_cached(self):
+        """Test the load_repository method with the metadata cache."""
+        repo = self._add_repo("r1")
+        repo.baseurl = ["http://test"]
+        repo.load = Mock()
+        repo.enable()
+
+        self.dnf_manager._metadata_cache = Mock(enabled=True)
+        self.dnf_manager._get_repomd_content = Mock(return_value="Metadata for r1.")
+        self.dnf_manager.load_repository("r1")
+
+        self.dnf_manager._metadata_cache.restore.assert_called_once_with(
+            "r1",
+            b"\x90\xa0\xb7\xce\xc2H\x85#\xa3\xfci"
+            b"\x9e+\xf4\xe2\x19D\xbc\x9b'\xeb\xb7"
+            b"\x90\x1d\xcey\xb3\xd4p\xc3\x1d\xfb",
+            repo._repo.getCachedir(),
+            "/tmp/dnf.cache"
+        )
+        repo.load.assert_called_once()
+
+    def test_load_repository_local_cached(self):
+        """Test the load_repository method with a local repo and the metadata cache."""
+        repo = self._add_repo("r1")
+        repo.baseurl = ["file:///test"]
+        repo.load = Mock()
+        repo.enable()
+
+        self.dnf_manager._metadata_cache = Mock(enabled=True)
+        self.dnf_manager.load_repository("r1")
+
+        self.dnf_manager._metadata_cache.restore.assert_not_called()
+        repo.load.assert_called_once()
+
+    def test_load_repositories(self):
+        """Test the load_repositories method."""
+        r1 = self._add_repo("r1")
+        r1.load = Mock()
+        r1.enable()
+
+        r2 = self._add_repo("r2")
+        r2.load = Mock(side_effect=RepoError("Fake error!"))
+        r2.enable()
+
+        r3 = self._add_repo("r3")
+        r3.load = Mock()
+        r3.disable()
+
+        callback = Mock()
+        errors = self.dnf_manager.load_repositories(["r1", "r2", "r3"], callback)
+
+        assert list(errors.keys()) == ["r1", "r2", "r3"]
+        assert errors["r1"] is None
+        assert isinstance(errors["r2"], MetadataError)
+        assert str(errors["r2"]) == "Fake error!"
+        assert errors["r3"] is None
+
+        r1.load.assert_called_once()
+        r2.load.assert_called_once()
+        r3.load.assert_not_called()
+
+        assert r1.enabled is True
+        assert r2.enabled is False
+        assert r3.enabled is False
+
+        callback.assert_has_calls([
+            call("r1", None),
+            call("r2", errors["r2"]),
+            call("r3", None),
+        ], any_order=True)
+        assert callback.call_count == 3
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.DNF_REPO_LOADING_WORKERS", 1)
+    def test_load_repositories_lock(self):
+        """Test that only the download of the metadata is not serialized."""
+        locked = {}
+
+        def _is_locked():
+            result = []
+            thread = threading.Thread(
+                target=lambda: result.append(not self.dnf_manager._lock.acquire(blocking=False))
+            )
+            thread.start()
+            thread.join()
+
+            if not result[0]:
+                self.dnf_manager._lock.release()
+
+            return result[0]
+
+        def _load(repo_id):
+            locked[repo_id] = _is_locked()
+
+            if repo_id == "r2":
+                raise RepoError("Fake error!")
+
+        def _disable():
+            locked["disable"] = _is_locked()
+
+        r1 = self._add_repo("r1")
+        r1.load = Mock(side_effect=lambda: _load("r1"))
+        r1.enable()
+
+        r2 = self._add_repo("r2")
+        r2.load = Mock(side_effect=lambda: _load("r2"))
+        r2.disable = Mock(side_effect=_disable)
+        r2.enable()
+
+        for repo in (r1, r2):
+            repo.baseurl = ["http://test"]
+
+        self.dnf_manager._get_repomd_content = Mock(
+            side_effect=lambda repo: locked.setdefault("repomd", _is_locked()) or "Metadata"
+        )
+        self.dnf_manager._metadata_cache = Mock(enabled=True)
+        self.dnf_manager._metadata_cache.restore.side_effect = \
+            lambda *args: locked.setdefault("restore", _is_locked())
+
+        self.dnf_manager.load_repositories(["r1", "r2"])
+        assert locked == {
+            "r1": False,
+            "r2": False,
+            "repomd": False,
+            "restore": True,
+            "disable": True
+        }
+
+    def test_load_repositories_unknown(self):
+        """Test the load_repositories method with an unknown repo."""
+        with pytest.raises(UnknownRepositoryError):
+            self.dnf_manager.load_repositories(["r1"])
+
     def test_load_packages_metadata(self):
         """Test the load_packages_metadata method."""
         sack = self.dnf_manager._base.sack
@@ -1393,6 +2212,141 @@ class DNFManagerReposTestCase(unittest.TestCase):
         # Set up the baseurl.
         repo.baseurl.append("file://" + repo_dir)
 
+    def test_loaded_metadata(self):
+        """Test the loaded_metadata property."""
+        assert self.dnf_manager.loaded_metadata is None
+
+        with TemporaryDirectory() as d:
+            r1 = self._add_repo("r1")
+            self._create_repo(r1, d)
+
+            self.dnf_manager.load_repomd_hashes()
+            metadata = self.dnf_manager.loaded_metadata
+
+        assert metadata.repositories == {
+            "r1": (r1._repo.getCachedir(), self.dnf_manager._md_hashes["r1"])
+        }
+        assert metadata.comps_repositories == {}
+        assert metadata.comps is self.dnf_manager._base.comps
+
+        # The metadata survive the reset.
+        self.dnf_manager.reset_base()
+        assert self.dnf_manager.loaded_metadata == metadata
+
+    def test_reuse_metadata(self):
+        """Test the reuse_metadata method."""
+        with TemporaryDirectory() as d:
+            r1 = self._add_repo("r1")
+            self._create_repo(r1, d + "/r1")
+
+            r2 = self._add_repo("r2")
+            self._create_repo(r2, d + "/r2")
+
+            r3 = self._add_repo("r3")
+            r3.baseurl = ["file://nonexistent"]
+
+            self.dnf_manager.load_repomd_hashes()
+            metadata = self.dnf_manager.loaded_metadata
+
+            # Change the r2 repository.
+            with open(os.path.join(d, "r2", "repodata", "repomd.xml"), "w") as f:
+                f.write("Changed metadata.")
+
+            self.dnf_manager._remove_cached_metadata = Mock()
+
+            with self.assertLogs(level="INFO") as cm:
+                self.dnf_manager.reuse_metadata(metadata)
+
+        msg = "Reusing loaded metadata of repositories: r1"
+        assert any(map(lambda x: msg in x, cm.output))
+
+        # Only the metadata of unchanged repositories are kept.
+        self.dnf_manager._remove_cached_metadata.assert_has_calls([call(r2), call(r3)])
+        assert self.dnf_manager._remove_cached_metadata.call_count == 2
+
+    def test_reuse_no_metadata(self):
+        """Test the reuse_metadata method with no metadata."""
+        self.dnf_manager._remove_cached_metadata = Mock()
+        self.dnf_manager.reuse_metadata(None)
+        self.dnf_manager._remove_cached_metadata.assert_not_called()
+
+    def test_reuse_metadata_dropped(self):
+        """Test the reuse_metadata method with dropped repositories."""
+        with TemporaryDirectory() as d:
+            self.dnf_manager._base.conf.cachedir = d
+            r1 = self._add_repo("r1")
+            r1_dir = r1._repo.getCachedir()
+            r2_dir = os.path.join(d, "r2-1234")
+
+            os.makedirs(os.path.join(r1_dir, "repodata"))
+            os.makedirs(os.path.join(r2_dir, "repodata"))
+            open(os.path.join(d, "r1.solv"), "w").close()
+            open(os.path.join(d, "r2.solv"), "w").close()
+
+            metadata = LoadedMetadata(
+                repositories={
+                    "r1": (r1_dir, None),
+                    "r2": (r2_dir, b"hash"),
+                },
+                comps_repositories={},
+                comps=None,
+            )
+
+            self.dnf_manager._remove_cached_metadata = Mock()
+            self.dnf_manager.reuse_metadata(metadata)
+
+            # The metadata of the dropped repository are removed.
+            self.dnf_manager._remove_cached_metadata.assert_called_once_with(r1)
+            assert os.path.exists(r1_dir)
+            assert not os.path.exists(r2_dir)
+            assert sorted(os.listdir(d)) == sorted([os.path.basename(r1_dir), "r1.solv"])
+
+    def test_remove_cached_metadata(self):
+        """Test the _remove_cached_metadata method."""
+        with TemporaryDirectory() as d:
+            self.dnf_manager._base.conf.cachedir = d
+            r1 = self._add_repo("r1")
+
+            repo_dir = r1._repo.getCachedir()
+            os.makedirs(os.path.join(repo_dir, "repodata"))
+            open(os.path.join(d, "r1.solv"), "w").close()
+            open(os.path.join(d, "r1-filenames.solvx"), "w").close()
+            open(os.path.join(d, "r2.solv"), "w").close()
+
+            self.dnf_manager._remove_cached_metadata(r1)
+
+            assert not os.path.exists(repo_dir)
+            assert os.listdir(d) == ["r2.solv"]
+
+    def test_load_comps_reused(self):
+        """Test the reuse of the loaded comps."""
+        comps = Mock()
+        keys = {"r1": ("/cache/r1", b"hash")}
+
+        self.dnf_manager._get_comps_repositories = Mock(return_value=keys)
+        self.dnf_manager._base.read_comps = Mock()
+
+        # The comps are loaded from different repositories.
+        self.dnf_manager._reusable_metadata = LoadedMetadata(
+            repositories={},
+            comps_repositories={"r1": ("/cache/r1", b"other")},
+            comps=comps,
+        )
+        self.dnf_manager._load_comps()
+        self.dnf_manager._base.read_comps.assert_called_once_with(arch_filter=True)
+        assert self.dnf_manager._base.comps is not comps
+
+        # The comps are loaded from the same repositories.
+        self.dnf_manager._base.read_comps.reset_mock()
+        self.dnf_manager._reusable_metadata = LoadedMetadata(
+            repositories={},
+            comps_repositories=keys,
+            comps=comps,
+        )
+        self.dnf_manager._load_comps()
+        self.dnf_manager._base.read_comps.assert_not_called()
+        assert self.dnf_manager._base.comps is comps
+
     def test_load_no_repomd_hashes(self):
         """Test the load_repomd_hashes method with no repositories."""
         self.dnf_manager.load_repomd_hashes()
@@ -1476,3 +2430,32 @@ class DNFManagerReposTestCase(unittest.TestCase):
             # Test the base reset.
             self.dnf_manager.reset_base()
             assert self.dnf_manager.verify_repomd_hashes() is False
+
+    def test_verify_repomd_hashes_repositories(self):
+        """Test the verify_repomd_hashes method with changed repositories."""
+        with TemporaryDirectory() as d:
+            r1 = self._add_repo("r1")
+            self._create_repo(r1, os.path.join(d, "r1"))
+
+            r2 = self._add_repo("r2")
+            self._create_repo(r2, os.path.join(d, "r2"))
+
+            self.dnf_manager.load_repomd_hashes()
+            assert self.dnf_manager.verify_repomd_hashes() is True
+
+            # Test a disabled repository.
+            r2.disable()
+            assert self.dnf_manager.verify_repomd_hashes() is False
+
+            # Test a new repository.
+            r2.enable()
+            r3 = self._add_repo("r3")
+            self._create_repo(r3, os.path.join(d, "r3"))
+            assert self.dnf_manager.verify_repomd_hashes() is False
+
+            # Test an unreachable repository.
+            self.dnf_manager.load_repomd_hashes()
+            assert self.dnf_manager.verify_repomd_hashes() is True
+
+            r3.baseurl = ["file://nonexistent"]
+            assert self.dnf_manager.verify_repomd_hashes() is False
@@ -32,7 +32,7 @@ from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager
 from pyanaconda.modules.payloads.payload.dnf.utils import get_kernel_package, \
     get_product_release_version, get_installation_specs, get_kernel_version_list, \
     pick_download_location, calculate_required_space, get_free_space_map, _pick_mount_points, \
-    collect_installation_devices
+    collect_installation_devices, get_memory_usage, release_memory
 from pyanaconda.modules.payloads.source.cdrom.cdrom import CdromSourceModule
 from pyanaconda.modules.payloads.source.harddrive.harddrive import HardDriveSourceModule
 from pyanaconda.modules.payloads.source.url.url import URLSourceModule
@@ -333,6 +333,37 @@ class DNFUtilsPackagesTestCase(unittest.TestCase):
         msg = "Not enough disk space to download the packages; size 100 B."
         assert str(cm.value) == msg
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.utils.conf")
+    @patch("pyanaconda.modules.payloads.payload.dnf.utils.get_free_space_map")
+    def test_pick_download_location_chunks(self, free_space_getter, mock_conf):
+        """Test the pick_download_location function with chunks."""
+        mock_conf.target.system_root = "/mnt/sysroot"
+        mock_conf.payload.installation_chunk_size = Size(20)
+
+        dnf_manager = Mock()
+        dnf_manager.get_download_size.return_value = Size(100)
+        dnf_manager.get_chunked_download_size.return_value = Size(40)
+        dnf_manager.get_installation_size.return_value = Size(200)
+
+        # There is space only for two chunks.
+        free_space_getter.return_value = {
+            "/var/tmp": Size(40),
+        }
+
+        path = pick_download_location(dnf_manager)
+        assert path == "/var/tmp/dnf.package.cache"
+
+        free_space_getter.return_value = {
+            "/var/tmp": Size(39),
+        }
+
+        with pytest.raises(RuntimeError) as cm:
+            pick_download_location(dnf_manager)
+
+        msg = "Not enough disk space to download the packages; size 40 B."
+        assert str(cm.value) == msg
+        dnf_manager.get_chunked_download_size.assert_called_with(Size(20))
+
     @patch("pyanaconda.modules.payloads.payload.dnf.utils.execWithCapture")
     @patch_dbus_get_proxy_with_cache
     def test_get_combined_free_space(self, proxy_getter, exec_mock):
@@ -416,6 +447,25 @@ class DNFUtilsPackagesTestCase(unittest.TestCase):
         }
         assert calculate_required_space(dnf_manager) == total_size
 
+    def test_get_memory_usage(self):
+        """Test the get_memory_usage function."""
+        assert get_memory_usage() > Size(0)
+
+        with patch("builtins.open", side_effect=OSError("Fake error!")):
+            assert get_memory_usage() is None
+
+    @patch("gc.collect")
+    @patch("ctypes.CDLL")
+    def test_release_memory(self, cdll, collect):
+        """Test the release_memory function."""
+        release_memory()
+        collect.assert_called_once_with()
+        cdll.return_value.malloc_trim.assert_called_once_with(0)
+
+        # Ignore a missing function.
+        cdll.side_effect = OSError("Fake error!")
+        release_memory()
+
     def test_collect_installation_devices(self):
         """Test the collect_installation_devices function."""
         devices = collect_installation_devices([], [])
@@ -17,7 +17,12 @@
 #
 # Red Hat Author(s): Jiri Konecny <jkonecny@redhat.com>
 #
+import hashlib
+import itertools
 import os
+import stat
+import subprocess
+import tarfile
 import tempfile
 import unittest
 import pytest
@@ -25,15 +30,24 @@ import requests
 
 from contextlib import contextmanager
 from requests_file import FileAdapter
-from unittest.mock import call, patch, Mock, MagicMock
+from unittest.mock import call, patch, Mock, MagicMock, ANY, mock_open
 
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.path import join_paths, touch
 from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.common.errors.storage import MountFilesystemError
 from pyanaconda.modules.common.structures.live_image import LiveImageConfigurationData
+from pyanaconda.modules.common.structures.storage import DeviceData, DeviceFormatData
+from pyanaconda.modules.payloads.payload.live_image.block_deployment import BlockDeployment, \
+    MountInfo, get_mount_info, find_mount, get_backing_file, get_subtree_patterns
 from pyanaconda.modules.payloads.payload.live_image.download_progress import DownloadProgress
+from pyanaconda.modules.payloads.payload.live_image.download_state import DownloadState
+from pyanaconda.modules.payloads.payload.live_image.image_copy import ImageCopy
 from pyanaconda.modules.payloads.payload.live_image.installation import VerifyImageChecksumTask, \
-    InstallFromImageTask, InstallFromTarTask, DownloadImageTask, MountImageTask, RemoveImageTask
+    InstallFromImageTask, InstallFromTarTask, DownloadImageTask, MountImageTask, RemoveImageTask, \
+    InstallFromTarStreamTask
+from pyanaconda.modules.payloads.payload.live_image.segmented_download import \
+    SegmentedDownload, get_segments
 from pyanaconda.modules.payloads.payload.live_os.utils import get_kernel_version_list
 
 
@@ -84,6 +98,13 @@ class LiveUtilsTestCase(unittest.TestCase):
 class InstallFromImageTaskTestCase(unittest.TestCase):
     """Test the InstallFromImageTask class."""
 
+    def _create_file(self, path, content=""):
+        """Create a file with the specified content."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
     def _make_reader(self, rc):
         reader = MagicMock()
         reader.__iter__.return_value = []
@@ -158,24 +179,549 @@ class InstallFromImageTaskTestCase(unittest.TestCase):
         msg = "Failed to install image: rsync exited with code 11"
         assert str(cm.value) == msg
 
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
+    def test_install_image_task_parallel(self, os_sync, mock_conf):
+        """Test installation from an image with the parallel copy."""
+        mock_conf.payload.image_block_deployment = False
+        mock_conf.payload.image_copy_method = "parallel"
+        callback = Mock()
 
-class InstallFromTarTaskTestCase(unittest.TestCase):
-    """Test the InstallFromTarTask class."""
+        with tempfile.TemporaryDirectory() as d:
+            mount_point = join_paths(d, "image")
+            sysroot = join_paths(d, "sysroot")
+
+            os.makedirs(join_paths(mount_point, "etc"))
+            os.makedirs(sysroot)
+
+            with open(join_paths(mount_point, "etc", "hosts"), "w") as f:
+                f.write("HOSTS")
+
+            task = InstallFromImageTask(
+                sysroot=sysroot,
+                mount_point=mount_point
+            )
+            task.progress_changed_signal.connect(callback)
+            task.run()
+
+            with open(join_paths(sysroot, "etc", "hosts"), "r") as f:
+                assert f.read() == "HOSTS"
 
+        assert callback.mock_calls == [
+            call(0, "Synchronizing writes to disk"),
+            call(0, "Installing software..."),
+            call(0, "Installing software 100%"),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
     @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_tar_task(self, exec_with_redirect, os_sync):
-        """Test installation from a tarball."""
-        exec_with_redirect.return_value = 0
+    @patch.object(ImageCopy, "run")
+    def test_install_image_task_parallel_failed(self, copy_run, os_sync, mock_conf):
+        """Test a failed installation from an image with the parallel copy."""
+        mock_conf.payload.image_block_deployment = False
+        mock_conf.payload.image_copy_method = "parallel"
+        copy_run.side_effect = OSError("Fake!")
+
+        task = InstallFromImageTask(
+            sysroot="/mnt/root",
+            mount_point="/mnt/image"
+        )
 
-        with tempfile.NamedTemporaryFile("w") as f:
-            task = InstallFromTarTask(
-                sysroot="/mnt/root",
-                tarfile=f.name
+        with pytest.raises(PayloadInstallationError) as cm:
+            task.run()
+
+        assert str(cm.value) == "Failed to install image: Fake!"
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_mount_info")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execReadlines")
+    def test_install_image_task_blocks_fallback(self, exec_readlines, get_mounts, os_sync,
+                                                mock_conf):
+        """Test a fallback of the block deployment."""
+        mock_conf.payload.image_block_deployment = True
+        mock_conf.payload.image_copy_method = "rsync"
+        exec_readlines.return_value = self._make_reader(0)
+        get_mounts.return_value = []
+
+        task = InstallFromImageTask(
+            sysroot="/mnt/root",
+            mount_point="/mnt/image"
+        )
+
+        with self.assertLogs(level="DEBUG") as cm:
+            task.run()
+
+        assert "The image is not a mounted file system." in "\n".join(cm.output)
+        exec_readlines.assert_called_once()
+
+    def _get_device_tree(self, fstype="ext4", size=1024 * 1024):
+        """Get a mocked device tree."""
+        device_data = DeviceData()
+        device_data.path = "/dev/sda2"
+        device_data.size = size
+
+        format_data = DeviceFormatData()
+        format_data.type = fstype
+        format_data.attrs = {"uuid": "1234-5678"}
+
+        device_tree = Mock()
+        device_tree.GetMountPoints.return_value = {"/": "sda2", "/boot": "sda1"}
+        device_tree.GetDeviceData.return_value = DeviceData.to_structure(device_data)
+        device_tree.GetFormatData.return_value = DeviceFormatData.to_structure(format_data)
+        return device_tree
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.STORAGE")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_backing_file")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_mount_info")
+    @patch("pyanaconda.modules.payloads.payload.live_image.block_deployment.execWithRedirect")
+    def test_install_image_task_blocks(self, exec_mock, get_mounts, get_backing, storage,
+                                       os_sync, mock_conf):
+        """Test installation from an image with the block deployment."""
+        mock_conf.payload.image_block_deployment = True
+        mock_conf.payload.image_copy_method = "parallel"
+        exec_mock.return_value = 0
+
+        device_tree = self._get_device_tree()
+        storage.get_proxy.return_value = device_tree
+
+        with tempfile.TemporaryDirectory() as d:
+            image_path = join_paths(d, "rootfs.img")
+            mount_point = join_paths(d, "image")
+            sysroot = join_paths(d, "sysroot")
+
+            with open(image_path, "wb") as f:
+                f.truncate(1024)
+
+            get_backing.return_value = image_path
+            get_mounts.return_value = [
+                MountInfo(10, 1, "/", mount_point, "ext4", "/dev/loop0"),
+                MountInfo(20, 1, "/", sysroot, "ext4", "/dev/sda2"),
+                MountInfo(21, 20, "/", sysroot + "/boot", "ext4", "/dev/sda1"),
+            ]
+
+            # The content of the image on the root device.
+            self._create_file(join_paths(sysroot, "boot", "vmlinuz"))
+            self._create_file(join_paths(sysroot, "etc", "machine-id"))
+            self._create_file(join_paths(sysroot, "etc", "hosts"))
+
+            # The content of the image.
+            self._create_file(join_paths(mount_point, "boot", "vmlinuz"))
+            self._create_file(join_paths(mount_point, "boot", "loader", "entry.conf"))
+
+            task = InstallFromImageTask(
+                sysroot=sysroot,
+                mount_point=mount_point
             )
             task.run()
 
-        exec_with_redirect.assert_called_once_with("tar", [
+            assert os.listdir(join_paths(sysroot, "boot")) == ["vmlinuz"]
+            assert os.listdir(join_paths(sysroot, "etc")) == ["hosts"]
+
+        device_tree.UnmountDevice.assert_called_once_with("sda2", sysroot)
+        device_tree.MountDevice.assert_called_once_with("sda2", sysroot, "")
+
+        assert exec_mock.mock_calls == [
+            call("mount", ["--move", sysroot + "/boot", ANY]),
+            call("e2image", ["-ra", "-p", image_path, "/dev/sda2"]),
+            call("e2fsck", ["-f", "-p", "/dev/sda2"]),
+            call("resize2fs", ["/dev/sda2"]),
+            call("tune2fs", ["-U", "1234-5678", "/dev/sda2"]),
+            call("mount", ["--move", ANY, sysroot + "/boot"]),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.STORAGE")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_backing_file")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_mount_info")
+    @patch("pyanaconda.modules.payloads.payload.live_image.block_deployment.execWithRedirect")
+    def test_install_image_task_blocks_failed(self, exec_mock, get_mounts, get_backing, storage,
+                                              os_sync, mock_conf):
+        """Test a failed installation from an image with the block deployment."""
+        mock_conf.payload.image_block_deployment = True
+        exec_mock.return_value = 0
+
+        device_tree = self._get_device_tree()
+        device_tree.UnmountDevice.side_effect = MountFilesystemError("Fake!")
+        storage.get_proxy.return_value = device_tree
+
+        with tempfile.TemporaryDirectory() as d:
+            image_path = join_paths(d, "rootfs.img")
+            staging = join_paths(d, "staging")
+            sysroot = join_paths(d, "sysroot")
+            os.makedirs(staging)
+
+            with open(image_path, "wb") as f:
+                f.truncate(1024)
+
+            get_backing.return_value = image_path
+            get_mounts.return_value = [
+                MountInfo(10, 1, "/", "/mnt/image", "ext4", "/dev/loop0"),
+                MountInfo(20, 1, "/", sysroot, "ext4", "/dev/sda2"),
+                MountInfo(21, 20, "/", sysroot + "/boot", "ext4", "/dev/sda1"),
+            ]
+
+            task = InstallFromImageTask(
+                sysroot=sysroot,
+                mount_point="/mnt/image"
+            )
+
+            # The tempfile module is shared, so patch it only for the task.
+            with patch("tempfile.mkdtemp", return_value=staging):
+                with pytest.raises(PayloadInstallationError) as cm:
+                    task.run()
+
+            assert str(cm.value) == "Failed to deploy image: Fake!"
+            assert not os.path.exists(staging)
+
+        assert exec_mock.mock_calls == [
+            call("mount", ["--move", sysroot + "/boot", staging + "/2"]),
+            call("mount", ["--move", staging + "/2", sysroot + "/boot"]),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.STORAGE")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.get_backing_file")
+    def test_get_block_layout(self, get_backing, storage):
+        """Test the block layout of the installation."""
+        task = InstallFromImageTask(
+            sysroot="/mnt/sysroot",
+            mount_point="/mnt/image"
+        )
+
+        with tempfile.TemporaryDirectory() as d:
+            image_path = join_paths(d, "rootfs.img")
+
+            with open(image_path, "wb") as f:
+                f.truncate(1024)
+
+            get_backing.return_value = image_path
+            mounts = [
+                MountInfo(10, 1, "/", "/mnt/image", "ext4", "/dev/loop0"),
+                MountInfo(20, 1, "/", "/mnt/sysroot", "ext4", "/dev/sda2"),
+            ]
+
+            storage.get_proxy.return_value = self._get_device_tree()
+            layout = task._get_block_layout(mounts)
+            assert layout.image_path == image_path
+            assert layout.fstype == "ext4"
+            assert layout.device_name == "sda2"
+            assert layout.device_path == "/dev/sda2"
+            assert layout.uuid == "1234-5678"
+
+            storage.get_proxy.return_value = self._get_device_tree(fstype="xfs")
+            assert task._get_block_layout(mounts) is None
+
+            storage.get_proxy.return_value = self._get_device_tree(size=512)
+            assert task._get_block_layout(mounts) is None
+
+            storage.get_proxy.return_value = self._get_device_tree()
+            get_backing.return_value = None
+            assert task._get_block_layout(mounts) is None
+
+            mounts[0] = MountInfo(10, 1, "/", "/mnt/image", "squashfs", "/dev/loop0")
+            assert task._get_block_layout(mounts) is None
+
+
+class BlockDeploymentTestCase(unittest.TestCase):
+    """Test the block deployment of images."""
+
+    MOUNT_INFO = \
+        "22 1 253:0 / / rw,relatime shared:1 - xfs /dev/mapper/root rw\n" \
+        "90 22 7:0 / /mnt/my\\040image ro - ext4 /dev/loop0 ro\n" \
+        "91 22 8:2 / /mnt/sysroot rw - ext4 /dev/sda2 rw\n" \
+        "92 91 8:1 / /mnt/sysroot/boot rw shared:5 master:2 - ext4 /dev/sda1 rw\n"
+
+    def _create_file(self, path, content=""):
+        """Create a file with the specified content."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    @patch("builtins.open", new_callable=mock_open, read_data=MOUNT_INFO)
+    def test_get_mount_info(self, mock_file):
+        """Test the get_mount_info function."""
+        mounts = get_mount_info()
+        mock_file.assert_called_once_with("/proc/self/mountinfo", "r")
+
+        assert mounts[1] == MountInfo(90, 22, "/", "/mnt/my image", "ext4", "/dev/loop0")
+        assert mounts[3] == MountInfo(92, 91, "/", "/mnt/sysroot/boot", "ext4", "/dev/sda1")
+
+        assert find_mount(mounts, "/mnt/sysroot/") == mounts[2]
+        assert find_mount(mounts, "/mnt") is None
+
+    def test_get_backing_file(self):
+        """Test the get_backing_file function."""
+        assert get_backing_file("/dev/sda1") is None
+        assert get_backing_file("/dev/loop12345") is None
+
+        with patch("builtins.open", mock_open(read_data="/images/rootfs.img\n")) as m:
+            assert get_backing_file("/dev/loop1") == "/images/rootfs.img"
+            m.assert_called_once_with("/sys/block/loop1/loop/backing_file", "r")
+
+    def test_get_subtree_patterns(self):
+        """Test the get_subtree_patterns function."""
+        patterns = ["/dev/", "/boot/*rescue*", "/boot/efi/loader/", "/bootx"]
+
+        assert get_subtree_patterns(patterns, "/boot") == ["/*rescue*", "/efi/loader/"]
+        assert get_subtree_patterns(patterns, "/boot/efi") == ["/loader/"]
+        assert get_subtree_patterns(patterns, "/home") == []
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.block_deployment.execWithRedirect")
+    def test_write_xfs(self, exec_mock):
+        """Test the deployment of an xfs image."""
+        exec_mock.return_value = 0
+        deployment = BlockDeployment("/images/rootfs.img", "xfs", "/dev/sda2", "1234")
+        deployment.write()
+        deployment.grow("/mnt/sysroot")
+
+        assert exec_mock.mock_calls == [
+            call("xfs_copy", ["-d", "/images/rootfs.img", "/dev/sda2"]),
+            call("xfs_admin", ["-U", "1234", "/dev/sda2"]),
+            call("xfs_growfs", ["/mnt/sysroot"]),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.block_deployment.execWithRedirect")
+    def test_write_failed(self, exec_mock):
+        """Test a failed deployment of an image."""
+        deployment = BlockDeployment("/images/rootfs.img", "ext4", "/dev/sda2", "1234")
+
+        # The file system was fixed.
+        exec_mock.side_effect = [0, 1, 0, 0]
+        deployment.write()
+
+        exec_mock.side_effect = [0, 4]
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            deployment.write()
+
+        assert str(cm.value) == "Failed to deploy the image: e2fsck exited with code 4"
+
+        exec_mock.side_effect = OSError("Fake!")
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            deployment.write()
+
+        assert str(cm.value) == "Failed to deploy the image: Fake!"
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.block_deployment.execWithRedirect")
+    def test_move_mounts_failed(self, exec_mock):
+        """Test a failed move of mounts."""
+        root_mount = MountInfo(20, 1, "/", "/mnt/sysroot", "ext4", "/dev/sda2")
+        mounts = [
+            root_mount,
+            MountInfo(21, 20, "/", "/mnt/sysroot/dev", "devtmpfs", "devtmpfs"),
+            MountInfo(22, 20, "/", "/mnt/sysroot/run", "tmpfs", "tmpfs"),
+            MountInfo(23, 20, "/", "/mnt/sysroot/boot", "ext4", "/dev/sda1"),
+        ]
+
+        # The third mount cannot be moved.
+        exec_mock.side_effect = [0, 0, 32, 0, 0]
+
+        with tempfile.TemporaryDirectory() as d:
+            with pytest.raises(PayloadInstallationError):
+                BlockDeployment.move_mounts(mounts, root_mount, d)
+
+            BlockDeployment.remove_staging_directory(d)
+            assert not os.path.exists(d)
+
+            assert exec_mock.mock_calls == [
+                call("mount", ["--move", "/mnt/sysroot/dev", d + "/1"]),
+                call("mount", ["--move", "/mnt/sysroot/run", d + "/2"]),
+                call("mount", ["--move", "/mnt/sysroot/boot", d + "/3"]),
+                call("mount", ["--move", d + "/2", "/mnt/sysroot/run"]),
+                call("mount", ["--move", d + "/1", "/mnt/sysroot/dev"]),
+            ]
+
+            os.makedirs(d)
+
+    def test_remove_staging_directory(self):
+        """Test the removal of the staging directory."""
+        with tempfile.TemporaryDirectory() as d:
+            staging = join_paths(d, "staging")
+            self._create_file(join_paths(staging, "1", "file"))
+            os.makedirs(join_paths(staging, "2"))
+
+            # Nothing is removed recursively.
+            BlockDeployment.remove_staging_directory(staging)
+            assert os.path.exists(join_paths(staging, "1", "file"))
+
+            os.unlink(join_paths(staging, "1", "file"))
+            BlockDeployment.remove_staging_directory(staging)
+            assert not os.path.exists(staging)
+
+    def test_remove_excluded(self):
+        """Test the removal of excluded paths."""
+        with tempfile.TemporaryDirectory() as d:
+            self._create_file(join_paths(d, "dev", "null"))
+            self._create_file(join_paths(d, "tmp", "file"))
+            self._create_file(join_paths(d, "boot", "vmlinuz-0-rescue-123"))
+            self._create_file(join_paths(d, "boot", "vmlinuz-123"))
+            self._create_file(join_paths(d, "boot", "loader", "entry.conf"))
+            self._create_file(join_paths(d, "etc", "machine-id"))
+
+            BlockDeployment.remove_excluded(d, [
+                "/dev/", "/tmp/*", "/boot/*rescue*", "/boot/loader/", "/etc/machine-id"
+            ])
+
+            assert os.listdir(join_paths(d, "dev")) == ["null"]
+            assert os.listdir(join_paths(d, "tmp")) == []
+            assert os.listdir(join_paths(d, "boot")) == ["vmlinuz-123"]
+            assert os.listdir(join_paths(d, "etc")) == []
+
+
+class ImageCopyTestCase(unittest.TestCase):
+    """Test the ImageCopy class."""
+
+    def _create_file(self, path, content=""):
+        """Create a file with the specified content."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _list_files(self, path):
+        """List all files in the specified directory."""
+        return sorted(
+            os.path.relpath(join_paths(root, name), path)
+            for root, dirs, files in os.walk(path)
+            for name in dirs + files
+        )
+
+    def test_excluded_paths(self):
+        """Test the excluded paths."""
+        image_copy = ImageCopy("/mnt/image", "/mnt/root")
+
+        assert image_copy._is_excluded("/dev", True)
+        assert not image_copy._is_excluded("/dev", False)
+        assert not image_copy._is_excluded("/tmp", True)
+        assert image_copy._is_excluded("/tmp/file", False)
+        assert image_copy._is_excluded("/boot/vmlinuz-0-rescue-123", False)
+        assert not image_copy._is_excluded("/boot/efi/vmlinuz-0-rescue-123", False)
+        assert image_copy._is_excluded("/etc/machine-id", False)
+        assert not image_copy._is_excluded("/usr/etc/machine-id", False)
+
+    def test_copy(self):
+        """Test the copy of an image."""
+        with tempfile.TemporaryDirectory() as d:
+            source = join_paths(d, "image")
+            target = join_paths(d, "sysroot")
+
+            self._create_file(join_paths(source, "dev", "null"))
+            self._create_file(join_paths(source, "tmp", "file"))
+            self._create_file(join_paths(source, "etc", "machine-id"), "123")
+            self._create_file(join_paths(source, "etc", "hosts"), "HOSTS")
+            self._create_file(join_paths(source, "boot", "vmlinuz-1"), "KERNEL")
+
+            os.chmod(join_paths(source, "etc", "hosts"), 0o640)
+            os.utime(join_paths(source, "etc"), (1000, 2000))
+            os.link(join_paths(source, "boot", "vmlinuz-1"), join_paths(source, "boot", "link"))
+            os.symlink("../etc/hosts", join_paths(source, "boot", "symlink"))
+            os.mkfifo(join_paths(source, "boot", "fifo"))
+
+            # Create a sparse file.
+            with open(join_paths(source, "sparse"), "wb") as f:
+                f.seek(1024 * 1024)
+                f.write(b"END")
+
+            callback = Mock()
+            image_copy = ImageCopy(source, target, workers=2)
+            image_copy.run(callback)
+
+            assert self._list_files(target) == [
+                "boot",
+                "boot/fifo",
+                "boot/link",
+                "boot/symlink",
+                "boot/vmlinuz-1",
+                "etc",
+                "etc/hosts",
+                "sparse",
+                "tmp",
+            ]
+
+            with open(join_paths(target, "etc", "hosts"), "r") as f:
+                assert f.read() == "HOSTS"
+
+            with open(join_paths(target, "sparse"), "rb") as f:
+                assert f.read() == bytes(1024 * 1024) + b"END"
+
+            assert stat.S_IMODE(os.stat(join_paths(target, "etc", "hosts")).st_mode) == 0o640
+            assert os.stat(join_paths(target, "etc")).st_mtime == 2000
+            assert os.stat(join_paths(target, "boot", "link")).st_ino == \
+                os.stat(join_paths(target, "boot", "vmlinuz-1")).st_ino
+            assert os.readlink(join_paths(target, "boot", "symlink")) == "../etc/hosts"
+            assert stat.S_ISFIFO(os.lstat(join_paths(target, "boot", "fifo")).st_mode)
+
+        total_size = len("HOSTS") + len("KERNEL") + 1024 * 1024 + len("END")
+        assert image_copy.total_size == total_size
+        assert image_copy.copied_size == total_size
+        callback.assert_called_with(total_size, total_size)
+
+    def test_copy_failed(self):
+        """Test a failed copy of an image."""
+        with tempfile.TemporaryDirectory() as d:
+            image_copy = ImageCopy(join_paths(d, "image"), join_paths(d, "sysroot"))
+
+            with pytest.raises(OSError):
+                image_copy.run()
+
+
+class InstallFromTarTaskTestCase(unittest.TestCase):
+    """Test the InstallFromTarTask class."""
+
+    def _create_tarball(self, directory, mode):
+        """Create a tarball and return its path."""
+        path = join_paths(directory, "test.tar")
+        touch(join_paths(directory, "f1"))
+
+        with tarfile.open(path, mode) as tar:
+            tar.add(join_paths(directory, "f1"), "f1")
+
+        return path
+
+    def _run_task(self, sysroot, tarball):
+        """Run the task."""
+        callback = Mock()
+
+        task = InstallFromTarTask(
+            sysroot=sysroot,
+            tarfile=tarball
+        )
+        task.CHUNK_SIZE = 100
+        task.progress_changed_signal.connect(callback)
+        task.run()
+
+        return callback
+
+    def test_install_tar_task(self):
+        """Test installation from a tarball."""
+        for mode in ("w", "w:gz", "w:bz2", "w:xz"):
+            with tempfile.TemporaryDirectory() as d:
+                tarball = self._create_tarball(d, mode)
+                sysroot = join_paths(d, "sysroot")
+                os.makedirs(sysroot)
+
+                callback = self._run_task(sysroot, tarball)
+                assert os.listdir(sysroot) == ["f1"]
+
+            assert callback.mock_calls[0] == call(0, "Installing software 0%")
+            assert callback.mock_calls[-1] == call(0, "Installing software 100%")
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_tar_task_arguments(self, start_program):
+        """Test the arguments of the extraction."""
+        start_program.return_value.returncode = 0
+
+        with tempfile.TemporaryDirectory() as d:
+            tarball = self._create_tarball(d, "w:gz")
+            callback = self._run_task("/mnt/root", tarball)
+
+        start_program.assert_called_once_with([
+            "tar",
             "--numeric-owner",
             "--selinux",
             "--acls",
@@ -191,15 +737,20 @@ class InstallFromTarTaskTestCase(unittest.TestCase):
             "--exclude", "./boot/efi/loader",
             "--exclude", "./etc/machine-id",
             "--exclude", "./etc/machine-info",
-            "-xaf", f.name,
+            "--gzip",
+            "-xf", "-",
             "-C", "/mnt/root"
-        ])
+        ], stdin=subprocess.PIPE, stdout=ANY)
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_tar_task_failed_exception(self, exec_with_redirect, os_sync):
+        # The progress is reported for the consumed chunks of the tarball.
+        messages = [c.args[1] for c in callback.mock_calls]
+        assert len(messages) > 2
+        assert messages == sorted(set(messages), key=messages.index)
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_tar_task_failed_exception(self, start_program):
         """Test installation from a tarball with an exception."""
-        exec_with_redirect.side_effect = OSError("Fake!")
+        start_program.side_effect = OSError("Fake!")
 
         with tempfile.NamedTemporaryFile("w") as f:
             task = InstallFromTarTask(
@@ -213,6 +764,138 @@ class InstallFromTarTaskTestCase(unittest.TestCase):
         msg = "Failed to install tar: Fake!"
         assert str(cm.value) == msg
 
+    def test_install_tar_task_missing(self):
+        """Test installation from a missing tarball."""
+        task = InstallFromTarTask(
+            sysroot="/mnt/root",
+            tarfile="/nonexistent/test.tar"
+        )
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            task.run()
+
+        assert str(cm.value).startswith("Failed to install tar: [Errno 2]")
+
+    def test_install_tar_task_failed(self):
+        """Test installation from an invalid tarball."""
+        with tempfile.TemporaryDirectory() as d:
+            tarball = join_paths(d, "test.tar")
+
+            with open(tarball, "wb") as f:
+                f.write(b"\x1f\x8bINVALID")
+
+            with pytest.raises(PayloadInstallationError) as cm:
+                self._run_task(d, tarball)
+
+        assert str(cm.value).startswith("Failed to install tar: tar exited with code")
+
+
+@patch("pyanaconda.modules.payloads.payload.live_image.installation.requests_session")
+class InstallFromTarStreamTaskTestCase(unittest.TestCase):
+    """Test the InstallFromTarStreamTask class."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.data = LiveImageConfigurationData()
+        self.data.url = "http://source"
+        self.callback = Mock()
+
+    def _set_up_response(self, session_getter, content, content_length=True):
+        """Set up a response with the specified content."""
+        session = session_getter.return_value.__enter__.return_value
+        response = session.get.return_value
+        response.headers = {"content-length": str(len(content))} if content_length else {}
+        response.iter_content.return_value = [content[i:i + 100] for i in range(0, len(content), 100)]
+        return session
+
+    def _create_tarball(self, directory, mode):
+        """Create a tarball and return its content."""
+        path = join_paths(directory, "test.tar")
+        touch(join_paths(directory, "f1"))
+
+        with tarfile.open(path, mode) as tar:
+            tar.add(join_paths(directory, "f1"), "f1")
+
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _run_task(self, sysroot):
+        """Run the task."""
+        task = InstallFromTarStreamTask(
+            sysroot=sysroot,
+            configuration=self.data
+        )
+        task.progress_changed_signal.connect(self.callback)
+        return task.run()
+
+    def test_install_stream(self, session_getter):
+        """Test installation from a compressed tarball stream."""
+        self.data.checksum = "abc"
+
+        with tempfile.TemporaryDirectory() as d:
+            content = self._create_tarball(d, "w:gz")
+            session = self._set_up_response(session_getter, content)
+
+            sysroot = join_paths(d, "sysroot")
+            os.makedirs(sysroot)
+
+            checksum = self._run_task(sysroot)
+            assert os.listdir(sysroot) == ["f1"]
+
+        assert checksum == hashlib.sha256(content).hexdigest()
+        assert session.get.call_args.kwargs["stream"] is True
+        assert self.callback.mock_calls[0] == call(0, 'Downloading http://source (0%)')
+        assert self.callback.mock_calls[-1] == call(0, 'Downloading http://source (100%)')
+
+    def test_install_stream_no_checksum(self, session_getter):
+        """Test installation from a tarball stream without a checksum."""
+        with tempfile.TemporaryDirectory() as d:
+            content = self._create_tarball(d, "w")
+            self._set_up_response(session_getter, content, content_length=False)
+
+            sysroot = join_paths(d, "sysroot")
+            os.makedirs(sysroot)
+
+            assert self._run_task(sysroot) is None
+            assert os.listdir(sysroot) == ["f1"]
+
+        self.callback.assert_called_once_with(0, 'Downloading http://source')
+
+    def test_install_stream_failed(self, session_getter):
+        """Test installation from an invalid tarball stream."""
+        self._set_up_response(session_getter, b"\x1f\x8bINVALID")
+
+        with tempfile.TemporaryDirectory() as d:
+            with pytest.raises(PayloadInstallationError) as cm:
+                self._run_task(d)
+
+        assert str(cm.value).startswith("Failed to install tar: tar exited with code")
+
+    def test_download_failed(self, session_getter):
+        """Test installation from a failed tarball stream."""
+        session = self._set_up_response(session_getter, b"")
+        session.get.return_value.iter_content.side_effect = requests.ConnectionError("Fake!")
+
+        with tempfile.TemporaryDirectory() as d:
+            with pytest.raises(PayloadInstallationError) as cm:
+                self._run_task(d)
+
+        assert str(cm.value) == "Error while downloading the tarball: Fake!"
+
+    def test_compression_arguments(self, session_getter):
+        """Test the detection of the tarball compression."""
+        task = InstallFromTarStreamTask(sysroot="/mnt/root", configuration=self.data)
+        assert task._get_compression_arguments(b"") == []
+        assert task._get_compression_arguments(b"tarball") == []
+        assert task._get_compression_arguments(b"\x1f\x8b\x08") == ["--gzip"]
+        assert task._get_compression_arguments(b"BZh91AY") == ["--bzip2"]
+        assert task._get_compression_arguments(b"\xfd7zXZ\x00\x00") == ["--xz"]
+        assert task._get_compression_arguments(b"\x28\xb5\x2f\xfd\x00") == ["--zstd"]
+        assert task._get_compression_arguments(b"LZIP\x01") == ["--lzip"]
+        assert task._get_compression_arguments(b"\x5d\x00\x00\x80") == ["--lzma"]
+        assert task._get_compression_arguments(b"\x89LZO\x00\r\n") == ["--lzop"]
+        assert task._get_compression_arguments(b"\x1f\x9d\x90") == ["--uncompress"]
+
 
 class VerifyImageChecksumTestCase(unittest.TestCase):
     """Test the VerifyImageChecksumTask class."""
@@ -261,6 +944,40 @@ class VerifyImageChecksumTestCase(unittest.TestCase):
         msg = "Checksum of the image does match."
         assert msg in "\n".join(cm.output)
 
+    @patch.object(VerifyImageChecksumTask, "_calculate_checksum")
+    def test_verify_calculated_checksum(self, calculate_checksum):
+        """Test the verification of a checksum calculated during the download."""
+        self.data.checksum = \
+            "7190E29480A9081FD917E33990F00098" \
+            "DD9FBD348BC52B0775780348BDA3A617"
+
+        task = VerifyImageChecksumTask(
+            configuration=self.data,
+            image_path="/nonexistent",
+            calculated_checksum="7190e29480a9081fd917e33990f00098"
+                                "dd9fbd348bc52b0775780348bda3a617"
+        )
+
+        with self.assertLogs(level="DEBUG") as cm:
+            task.run()
+
+        calculate_checksum.assert_not_called()
+
+        msg = "Checksum of the image does match."
+        assert msg in "\n".join(cm.output)
+
+        # The calculated checksum doesn't match.
+        task = VerifyImageChecksumTask(
+            configuration=self.data,
+            image_path="/nonexistent",
+            calculated_checksum="incorrect"
+        )
+
+        with pytest.raises(PayloadInstallationError):
+            task.run()
+
+        calculate_checksum.assert_not_called()
+
     def test_verify_wrong_checksum(self):
         """Test the verification of a wrong checksum."""
         self.data.checksum = "incorrect"
@@ -306,6 +1023,188 @@ class DownloadProgressTestCase(unittest.TestCase):
         ]
 
 
+def _get_ranged_downloader(content, status_code=206):
+    """Get a fake downloader of ranges of the specified content."""
+    def _download(headers=None):
+        start, end = map(int, headers["Range"].removeprefix("bytes=").split("-"))
+        data = content[start:end + 1]
+
+        response = MagicMock(status_code=status_code)
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [data[i:i + 7] for i in range(0, len(data), 7)]
+        return response
+
+    return _download
+
+
+@patch("pyanaconda.modules.payloads.payload.live_image.segmented_download.MIN_SEGMENT_SIZE", 10)
+class SegmentedDownloadTestCase(unittest.TestCase):
+    """Test the SegmentedDownload class."""
+
+    def test_get_segments(self):
+        """Test the get_segments function."""
+        assert get_segments(0, 4) == [(0, -1)]
+        assert get_segments(5, 4) == [(0, 4)]
+        assert get_segments(25, 4) == [(0, 11), (12, 24)]
+        assert get_segments(100, 4) == [(0, 24), (25, 49), (50, 74), (75, 99)]
+        assert get_segments(100, 1) == [(0, 99)]
+
+    def test_download(self):
+        """Test a download in segments."""
+        content = bytes(range(100)) * 3
+        progress = Mock()
+        checksum = hashlib.sha256()
+
+        with tempfile.TemporaryDirectory() as d:
+            path = join_paths(d, "image")
+
+            download = SegmentedDownload(
+                downloader=_get_ranged_downloader(content),
+                path=path,
+                total_size=len(content),
+                segments=get_segments(len(content), 4),
+            )
+            download.run(progress, checksum)
+
+            with open(path, "rb") as f:
+                assert f.read() == content
+
+        assert download.downloaded_size == len(content)
+        assert download.contiguous_size == len(content)
+        assert checksum.hexdigest() == hashlib.sha256(content).hexdigest()
+        progress.update.assert_called_with(len(content))
+
+    def test_download_failed(self):
+        """Test a failed download in segments."""
+        content = bytes(range(100))
+
+        with tempfile.TemporaryDirectory() as d:
+            download = SegmentedDownload(
+                downloader=_get_ranged_downloader(content, status_code=200),
+                path=join_paths(d, "image"),
+                total_size=len(content),
+                segments=get_segments(len(content), 4),
+            )
+
+            with pytest.raises(requests.RequestException) as cm:
+                download.run(Mock())
+
+        assert str(cm.value) == "Unexpected response to a ranged request: 200"
+
+    def test_download_incomplete(self):
+        """Test an incomplete download in segments."""
+        content = bytes(range(100))
+
+        with tempfile.TemporaryDirectory() as d:
+            download = SegmentedDownload(
+                downloader=_get_ranged_downloader(content[:90]),
+                path=join_paths(d, "image"),
+                total_size=len(content),
+                segments=get_segments(len(content), 4),
+            )
+
+            with pytest.raises(requests.RequestException) as cm:
+                download.run(Mock())
+
+        assert str(cm.value) == "The segment 75-99 is incomplete."
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.segmented_download.xprogressive_delay",
+           lambda: itertools.repeat(0))
+    def test_download_retry(self):
+        """Test a download in segments with a failed segment."""
+        content = bytes(range(100))
+        downloader = _get_ranged_downloader(content)
+        ranges = []
+
+        def _download(headers):
+            ranges.append(headers["Range"])
+            response = downloader(headers)
+
+            def _fail(*args):
+                yield content[:7]
+                raise requests.ConnectionError("Fake!")
+
+            if ranges.count("bytes=0-24") == 1 and headers["Range"] == "bytes=0-24":
+                response.iter_content.side_effect = _fail
+
+            return response
+
+        with tempfile.TemporaryDirectory() as d:
+            path = join_paths(d, "image")
+
+            download = SegmentedDownload(
+                downloader=_download,
+                path=path,
+                total_size=len(content),
+                segments=get_segments(len(content), 4),
+                retries=1,
+            )
+            download.run(Mock())
+
+            with open(path, "rb") as f:
+                assert f.read() == content
+
+        assert sorted(ranges) == [
+            "bytes=0-24", "bytes=25-49", "bytes=50-74", "bytes=7-24", "bytes=75-99"
+        ]
+
+
+class DownloadStateTestCase(unittest.TestCase):
+    """Test the DownloadState class."""
+
+    def test_save_and_load(self):
+        """Test the save and load methods."""
+        with tempfile.TemporaryDirectory() as d:
+            path = join_paths(d, "image")
+            state = DownloadState(path)
+            assert state.path == path + ".state"
+            assert state.load("http://source") == (0, None)
+
+            with open(path, "wb") as f:
+                f.write(b"IMAGE")
+
+            state.save("http://source", '"1"', 5)
+            assert state.load("http://source") == (5, '"1"')
+            assert state.load("http://other") == (0, None)
+
+            # The partial file is too short.
+            state.save("http://source", '"1"', 10)
+            assert state.load("http://source") == (0, None)
+
+            # The partial file cannot be validated.
+            state.save("http://source", None, 5)
+            assert state.load("http://source") == (0, None)
+
+            state.remove()
+            assert not os.path.exists(state.path)
+            state.remove()
+
+    def test_invalid_state(self):
+        """Test an invalid sidecar file."""
+        with tempfile.TemporaryDirectory() as d:
+            path = join_paths(d, "image")
+            state = DownloadState(path)
+
+            with open(state.path, "w") as f:
+                f.write("invalid")
+
+            assert state.load("http://source") == (0, None)
+
+
+def _get_response(data, status_code=200, headers=None, failure=None):
+    """Get a fake response with the specified data."""
+    response = Mock(status_code=status_code, headers=headers or {})
+
+    def _iter_content(*args):
+        yield data
+
+        if failure:
+            raise failure
+
+    response.iter_content.side_effect = _iter_content
+    return response
+
+
 class DownloadImageTaskTestCase(unittest.TestCase):
     """Test the DownloadImageTask class."""
 
@@ -366,7 +1265,10 @@ class DownloadImageTaskTestCase(unittest.TestCase):
                 ))
                 session_getter.return_value = session
 
-                assert self._run_task() == self.download_path
+                result = self._run_task()
+
+            assert result.image_path == self.download_path
+            assert result.checksum is None
 
             # Check the target image.
             with open(self.image_path, "rb") as f1:
@@ -377,7 +1279,11 @@ class DownloadImageTaskTestCase(unittest.TestCase):
         """Download a local file."""
         with self._create_directory():
             self.data.url = "file://{}".format(self.image_path)
-            assert self._run_task() == self.image_path
+            self.data.checksum = "abc"
+
+            result = self._run_task()
+            assert result.image_path == self.image_path
+            assert result.checksum is None
 
     def test_local_file_as_remote_direct(self):
         """Download a local file as a remote file directly."""
@@ -432,6 +1338,309 @@ class DownloadImageTaskTestCase(unittest.TestCase):
             0, 'Downloading http://source'
         )
 
+    @patch_requests()
+    def test_remote_file_checksum(self, session_getter):
+        """Mock download of a remote file with a checksum."""
+        # Set up the response.
+        session = session_getter.return_value.__enter__.return_value
+        response = session.get.return_value
+        response.headers = {"content-length": "13"}
+        response.iter_content.return_value = [b"IMAGE ", b"", b"CONTENT"]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+            result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+            assert result.image_path == self.download_path
+
+        assert result.checksum == \
+            "7190e29480a9081fd917e33990f00098" \
+            "dd9fbd348bc52b0775780348bda3a617"
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.segmented_download.MIN_SEGMENT_SIZE", 10)
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch_requests()
+    def test_remote_file_segments(self, session_getter, mock_conf):
+        """Mock download of a remote file in segments."""
+        mock_conf.payload.image_download_segments = 3
+        content = bytes(range(100))
+        downloader = _get_ranged_downloader(content)
+
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        response = Mock(headers={"content-length": "100", "accept-ranges": "bytes"})
+
+        def _get(headers=None, **kwargs):
+            return downloader(headers) if headers else response
+
+        session.get.side_effect = _get
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+            result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == content
+
+        assert result.checksum == hashlib.sha256(content).hexdigest()
+        assert session.get.call_count == 4
+        response.close.assert_called_once_with()
+
+        ranges = [c.kwargs["headers"]["Range"] for c in session.get.call_args_list[1:]]
+        assert sorted(ranges) == ["bytes=0-32", "bytes=33-65", "bytes=66-99"]
+
+        assert self.callback.mock_calls[0] == call(0, 'Downloading http://source (0%)')
+        assert self.callback.mock_calls[-1] == call(0, 'Downloading http://source (100%)')
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    @patch_requests()
+    def test_remote_file_no_ranges(self, session_getter, mock_conf):
+        """Mock download of a remote file without ranges."""
+        mock_conf.payload.image_download_segments = 3
+
+        # Set up the response.
+        session = session_getter.return_value.__enter__.return_value
+        response = session.get.return_value
+        response.headers = {"content-length": "13"}
+        response.iter_content.return_value = [b"IMAGE CONTENT"]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+        session.get.assert_called_once()
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.time.sleep")
+    @patch_requests()
+    def test_remote_file_resumed(self, session_getter, sleep):
+        """Mock a resumed download of a remote file."""
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = [
+            _get_response(
+                data=b"IMAGE ",
+                headers={"content-length": "13", "etag": '"1"'},
+                failure=requests.ConnectionError("Fake!"),
+            ),
+            _get_response(
+                data=b"CONTENT",
+                status_code=206,
+                headers={"content-length": "7", "content-range": "bytes 6-12/13"},
+            ),
+        ]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+
+            with self.assertLogs(level="WARNING") as cm:
+                result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+            assert not os.path.exists(self.download_path + ".state")
+
+        msg = "Failed to download the image at 6 bytes (attempt 1/5): Fake!"
+        assert any(map(lambda x: msg in x, cm.output))
+
+        assert result.checksum == hashlib.sha256(b"IMAGE CONTENT").hexdigest()
+        assert session.get.call_args_list[1].kwargs["headers"] == {
+            "Range": "bytes=6-",
+            "If-Range": '"1"',
+        }
+        sleep.assert_called_once_with(0.5)
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.time.sleep")
+    @patch_requests()
+    def test_remote_file_restarted(self, session_getter, sleep):
+        """Mock a restarted download of a remote file."""
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = [
+            _get_response(
+                data=b"IMAGE ",
+                headers={"content-length": "13"},
+                failure=requests.ConnectionError("Fake!"),
+            ),
+            _get_response(
+                data=b"IMAGE CONTENT",
+                headers={"content-length": "13"},
+            ),
+        ]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+            result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+        assert result.checksum == hashlib.sha256(b"IMAGE CONTENT").hexdigest()
+        assert session.get.call_args_list[1].kwargs["headers"] == {"Range": "bytes=6-"}
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.time.sleep")
+    @patch.object(DownloadImageTask, "MAX_DOWNLOAD_RETRIES", 2)
+    @patch_requests()
+    def test_remote_file_resume_failed(self, session_getter, sleep):
+        """Mock a download of a remote file that cannot be resumed."""
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = [
+            _get_response(
+                data=b"IMAGE ",
+                headers={"content-length": "13", "etag": '"1"'},
+                failure=requests.ConnectionError("Fake!"),
+            ),
+            requests.ConnectionError("Fake!"),
+            requests.ConnectionError("Fake!"),
+        ]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+
+            with pytest.raises(PayloadInstallationError) as cm:
+                self._run_task()
+
+            assert str(cm.value) == "Error while downloading the image: Fake!"
+
+            # The partial download can be resumed later.
+            state = DownloadState(self.download_path)
+            assert state.load("http://source") == (6, '"1"')
+
+        assert sleep.mock_calls == [call(0.5), call(1.0)]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.time.sleep")
+    @patch.object(DownloadImageTask, "MAX_DOWNLOAD_RETRIES", 1)
+    @patch_requests()
+    def test_remote_file_resumed_repeatedly(self, session_getter, sleep):
+        """Mock a download of a remote file that fails repeatedly with progress."""
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = [
+            _get_response(
+                data=b"IMAGE",
+                headers={"content-length": "13", "etag": '"1"'},
+                failure=requests.ConnectionError("Fake!"),
+            ),
+            _get_response(
+                data=b" CON",
+                status_code=206,
+                headers={"content-length": "8", "content-range": "bytes 5-12/13"},
+                failure=requests.ConnectionError("Fake!"),
+            ),
+            _get_response(
+                data=b"TENT",
+                status_code=206,
+                headers={"content-length": "4", "content-range": "bytes 9-12/13"},
+            ),
+        ]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+        # The retries and the delay are reset after a progress.
+        assert sleep.mock_calls == [call(0.5), call(0.5)]
+
+    @patch.object(DownloadState, "load", return_value=(6, '"1"'))
+    @patch_requests()
+    def test_remote_file_partial_short(self, session_getter, state_loader):
+        """Mock a download of a partially downloaded remote file that is too short."""
+        # Set up the responses.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = [
+            _get_response(
+                data=b"CONTENT",
+                status_code=206,
+                headers={
+                    "content-length": "7",
+                    "content-range": "bytes 6-12/13",
+                    "etag": '"1"',
+                },
+            ),
+            _get_response(
+                data=b" CONTENT",
+                status_code=206,
+                headers={"content-length": "8", "content-range": "bytes 5-12/13"},
+            ),
+        ]
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+
+            # The partial image was truncated after the state was loaded.
+            with open(self.download_path, "wb") as f:
+                f.write(b"IMAGE")
+
+            result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+        assert result.checksum == hashlib.sha256(b"IMAGE CONTENT").hexdigest()
+        assert session.get.call_args.kwargs["headers"] == {
+            "Range": "bytes=5-",
+            "If-Range": '"1"',
+        }
+
+    @patch_requests()
+    def test_remote_file_partial(self, session_getter):
+        """Mock a download of a partially downloaded remote file."""
+        # Set up the response.
+        session = session_getter.return_value.__enter__.return_value
+        session.get.return_value = _get_response(
+            data=b"CONTENT",
+            status_code=206,
+            headers={"content-length": "7", "content-range": "bytes 6-12/13"},
+        )
+
+        # Run the task.
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = "abc"
+
+            with open(self.download_path, "wb") as f:
+                f.write(b"IMAGE XX")
+
+            state = DownloadState(self.download_path)
+            state.save("http://source", '"1"', 6)
+
+            result = self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == b"IMAGE CONTENT"
+
+            assert not os.path.exists(state.path)
+
+        assert result.checksum == hashlib.sha256(b"IMAGE CONTENT").hexdigest()
+        session.get.assert_called_once()
+        assert session.get.call_args.kwargs["headers"] == {
+            "Range": "bytes=6-",
+            "If-Range": '"1"',
+        }
+
     @patch_requests()
     def test_remote_file_failed(self, session_getter):
         """Mock a failed download of a remote file."""
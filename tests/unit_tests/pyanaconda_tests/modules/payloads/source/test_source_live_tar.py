@@ -15,6 +15,7 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import hashlib
 import os.path
 import tarfile
 import tempfile
@@ -185,3 +186,40 @@ class LiveTarInstallationTestCase(unittest.TestCase):
             '5.8.16-200.fc32.x86_64',
             '5.8.18-200.fc32.x86_64',
         ]
+
+    @patch("pyanaconda.modules.payloads.source.live_tar.installation.conf")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.requests_session")
+    def test_install_stream(self, session_getter, mock_conf):
+        """Install a remote tarball stream with kernels."""
+        mock_conf.payload.stream_remote_tarballs = True
+
+        files = [
+            "/boot/vmlinuz-0-rescue-dbe69c1b88f94a67b689e3f44b0550c8",
+            "/boot/vmlinuz-5.8.15-201.fc32.x86_64",
+            "/boot/vmlinuz-5.8.16-200.fc32.x86_64",
+        ]
+
+        with self._create_directory():
+            self._create_tar(files)
+
+            with open(self.tarball, "rb") as f:
+                content = f.read()
+
+            session = session_getter.return_value.__enter__.return_value
+            response = session.get.return_value
+            response.headers = {"content-length": str(len(content))}
+            response.iter_content.return_value = [content]
+
+            self.data.url = "http://source"
+            self.data.checksum = hashlib.sha256(content).hexdigest()
+
+            result = self._run_task()
+            self._check_content(files[1:])
+
+            # The tarball is not stored.
+            assert os.listdir(self.sysroot) == ["boot"]
+
+        assert result == [
+            '5.8.15-201.fc32.x86_64',
+            '5.8.16-200.fc32.x86_64',
+        ]
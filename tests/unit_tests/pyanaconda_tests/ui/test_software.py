@@ -141,15 +141,45 @@ class SoftwareSelectionCacheTestCase(unittest.TestCase):
         self.dnf_manager.get_environment_data.return_value = self.environment_data
         self.dnf_manager.get_group_data.side_effect = self._get_group_data
         self.dnf_manager.resolve_group.return_value = True
+        self.dnf_manager.get_environments_data.side_effect = self._get_environments_data
+        self.dnf_manager.get_groups_data.side_effect = self._get_groups_data
 
         self.cache = SoftwareSelectionCache(get_dnf_proxy(self.dnf_manager))
 
+    def _get_environments_data(self):
+        """Mock the get_environments_data method of the DNF manager."""
+        return [self.environment_data]
+
+    def _get_groups_data(self):
+        """Mock the get_groups_data method of the DNF manager."""
+        return list(map(self._get_group_data, self.environment_data.optional_groups))
+
     def _get_group_data(self, group):
         """Mock the get_group_data method of the DNF manager."""
         data = CompsGroupData()
         data.id = group
         return data
 
+    def test_comps_data(self):
+        """Test the get_environment_data and get_group_data methods."""
+        self.cache.select_environment("e1")
+        self.cache.select_group("g1")
+        self.cache.select_group("g2")
+        self.cache.deselect_group("g3")
+
+        assert self.cache.get_environment_data("e1").id == "e1"
+        assert self.cache.get_group_data("g4").id == "g4"
+
+        # The data are requested only once.
+        self.dnf_manager.get_environments_data.assert_called_once_with()
+        self.dnf_manager.get_groups_data.assert_called_once_with()
+        self.dnf_manager.get_environment_data.assert_not_called()
+        self.dnf_manager.get_group_data.assert_not_called()
+
+        # Unknown groups are requested separately.
+        assert self.cache.get_group_data("g7").id == "g7"
+        self.dnf_manager.get_group_data.assert_called_once_with("g7")
+
     def test_available_environments(self):
         """Test the available_environments property."""
         self.dnf_manager.environments = []